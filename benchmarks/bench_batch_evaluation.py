@@ -0,0 +1,56 @@
+"""
+So sánh thông lượng (cặp/giây) khi chấm một lớp 40 bản dịch:
+gọi evaluate_translation lần lượt cho từng cặp so với evaluate_translations một lượt.
+
+Cache tham chiếu được xóa trước mỗi lần đo để cả hai cách đều phải dịch câu gốc.
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_batch_evaluation
+"""
+import time
+from services.translate import (
+    evaluate_translation, evaluate_translations, get_reference_cache,
+    load_translation_model, load_bert_scorer,
+)
+
+SOURCES = [
+    "The weather is beautiful today.",
+    "I would like to book a table for two.",
+    "She has been studying English for three years.",
+    "Could you tell me the way to the station?",
+    "Reading books is a good habit.",
+]
+CANDIDATES = [
+    "Hôm nay thời tiết đẹp.",
+    "Tôi muốn đặt bàn cho hai người.",
+    "Cô ấy đã học tiếng Anh được ba năm.",
+    "Bạn có thể chỉ đường tới nhà ga không?",
+    "Đọc sách là một thói quen tốt.",
+    "Thời tiết hôm nay rất đẹp.",
+    "Tôi muốn đặt một bàn hai người.",
+    "Cô ấy học tiếng Anh ba năm rồi.",
+]
+CLASS_SIZE = 40
+
+def main():
+    load_translation_model()
+    load_bert_scorer()
+    # 40 bài làm, mỗi câu gốc được nhiều học sinh dịch
+    pairs = [(SOURCES[i % len(SOURCES)], CANDIDATES[i % len(CANDIDATES)]) for i in range(CLASS_SIZE)]
+
+    get_reference_cache().clear()
+    start = time.perf_counter()
+    for source, candidate in pairs:
+        evaluate_translation(source, candidate)
+    sequential = time.perf_counter() - start
+
+    get_reference_cache().clear()
+    start = time.perf_counter()
+    evaluate_translations(pairs)
+    batched = time.perf_counter() - start
+
+    print(f"Tuần tự: {sequential:6.2f}s  {CLASS_SIZE / sequential:6.1f} cặp/giây")
+    print(f"Theo lô: {batched:6.2f}s  {CLASS_SIZE / batched:6.1f} cặp/giây  ({sequential / batched:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Đo độ trễ mỗi lần đánh giá bằng BERTScore: gọi bert_score.score (khởi tạo lại mô hình
+mỗi lần, như trước đây) so với scorer thường trú load_bert_scorer (lần đầu/cold và các lần sau/warm).
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_bert_score
+"""
+import time
+from bert_score import score
+from services.translate import load_bert_scorer, score_translations, BERT_SCORE_MODEL
+
+PAIRS = [
+    ("Xin chào thế giới!", "Chào thế giới!"),
+    ("Tôi thích học tiếng Anh.", "Tôi thích học tiếng Anh mỗi ngày."),
+    ("Con mèo đang ngủ trên ghế.", "Con mèo ngủ trên chiếc ghế."),
+    ("Hôm nay trời đẹp.", "Thời tiết hôm nay rất đẹp."),
+    ("Anh ấy đi làm bằng xe buýt.", "Anh ấy đi xe buýt đến chỗ làm."),
+]
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return 1000 * (time.perf_counter() - start)
+
+def main():
+    per_call = [
+        timed(lambda: score([candidate], [reference], lang="vi", model_type=BERT_SCORE_MODEL))
+        for candidate, reference in PAIRS
+    ]
+    cold = timed(lambda: score_translations([PAIRS[0][0]], [PAIRS[0][1]]))
+    warm = [timed(lambda: score_translations([candidate], [reference])) for candidate, reference in PAIRS]
+
+    candidates, references = zip(*PAIRS)
+    batched = timed(lambda: score_translations(list(candidates), list(references)))
+
+    print(f"bert_score.score mỗi lần:   {sum(per_call) / len(per_call):8.1f} ms/lượt")
+    print(f"scorer thường trú (cold):  {cold:8.1f} ms")
+    print(f"scorer thường trú (warm):  {sum(warm) / len(warm):8.1f} ms/lượt")
+    print(f"scorer thường trú (batch): {batched / len(PAIRS):8.1f} ms/lượt ({len(PAIRS)} cặp/lần)")
+    assert load_bert_scorer() is load_bert_scorer()
+
+if __name__ == "__main__":
+    main()
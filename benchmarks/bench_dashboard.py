@@ -0,0 +1,127 @@
+"""
+Đo thời gian tải số liệu trang Tài khoản khi từ điển và lịch sử làm bài lớn dần: bốn truy vấn
+tổng hợp trực tiếp trên vocabulary/flashcards/flashcard_history (cách cũ) so với một truy vấn
+get_dashboard_stats đọc các bộ đếm user_stats/user_daily_stats. Sau khi ghi qua các service,
+bộ đếm được so với số liệu đếm lại từ bảng gốc.
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_dashboard
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import time
+import uuid
+from databases.connection import db_connection
+from services.flashcard import create_flashcard, delete_flashcard, update_flashcard_score
+from services.user_stats import get_dashboard_stats
+from services.vocab import add_vocab, delete_vocab, update_vocab_status
+
+# (số từ, số lần làm flashcard)
+SIZES = [(1_000, 1_000), (10_000, 10_000), (100_000, 50_000)]
+REPEAT = 20
+
+OLD_QUERIES = [
+    """SELECT date_added AS date, COUNT(*) AS count FROM vocabulary
+       WHERE user_id = %(u)s AND date_added >= CURRENT_DATE - 6 GROUP BY date ORDER BY date""",
+    "SELECT status, COUNT(*) AS count FROM vocabulary WHERE user_id = %(u)s GROUP BY status",
+    "SELECT status, COUNT(*) AS count FROM flashcards WHERE user_id = %(u)s GROUP BY status",
+    """SELECT flashcard_name, score, time_updated FROM flashcard_history
+       WHERE user_id = %(u)s ORDER BY time_updated DESC""",
+]
+
+def seed(user_id: str, words: int, attempts: int):
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            for table in ("vocabulary", "flashcards", "flashcard_history", "user_stats", "user_daily_stats"):
+                c.execute(f"DELETE FROM {table} WHERE user_id = %s", (user_id,))
+            c.execute("""
+                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                SELECT %s || '-' || i, %s, 'word' || i, 'nghĩa ' || i, 'Danh từ', '[]', NULL,
+                       CASE WHEN i %% 3 = 0 THEN 'Đã nhớ' ELSE 'Đang học' END, CURRENT_DATE - (i %% 365)
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, words))
+            c.execute("""
+                INSERT INTO flashcards (test_id, user_id, name, status, score, date_updated, vocabs)
+                SELECT %s || '-t' || i, %s, 'test ' || i, 'Đã làm', 50, now(), '[]' FROM generate_series(1, 100) i
+            """, (user_id, user_id))
+            c.execute("""
+                INSERT INTO flashcard_history (history_id, user_id, flashcard_name, score, time_updated)
+                SELECT %s || '-h' || i, %s, 'test ' || (i %% 100), i %% 101, now() - i * interval '1 minute'
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, attempts))
+            # Cùng câu lệnh backfill như migration 4
+            c.execute("""
+                INSERT INTO user_stats (user_id, kind, status, count)
+                SELECT user_id, 'vocab', status, COUNT(*) FROM vocabulary WHERE user_id = %(u)s GROUP BY user_id, status
+                UNION ALL
+                SELECT user_id, 'flashcard', status, COUNT(*) FROM flashcards WHERE user_id = %(u)s GROUP BY user_id, status
+            """, {"u": user_id})
+            c.execute("""
+                INSERT INTO user_daily_stats (user_id, day, vocab_added)
+                SELECT user_id, date_added, COUNT(*) FROM vocabulary WHERE user_id = %s GROUP BY user_id, date_added
+            """, (user_id,))
+            c.execute("ANALYZE")
+        conn.commit()
+
+def old_dashboard(user_id: str):
+    # Cách cũ: mỗi biểu đồ mượn một kết nối và chạy truy vấn tổng hợp riêng
+    for query in OLD_QUERIES:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute(query, {"u": user_id})
+                c.fetchall()
+
+def timed(fn) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return 1000 * (time.perf_counter() - start) / REPEAT
+
+def check_counters(user_id: str):
+    # Ghi qua các service rồi so bộ đếm với số liệu đếm lại từ bảng gốc
+    ok, vocab_id = add_vocab(user_id, "counter check", "kiểm tra", "Danh từ", [], None)
+    update_vocab_status(vocab_id, "Đã nhớ")
+    add_vocab(user_id, "counter check 2", "kiểm tra", "Danh từ", [], None)
+    delete_vocab(vocab_id)
+    ok, test_id = create_flashcard(user_id, "counter check", "[]")
+    update_flashcard_score(test_id, 80.0, user_id, "counter check")
+    ok, other_id = create_flashcard(user_id, "counter check 2", "[]")
+    delete_flashcard(other_id)
+
+    stats = get_dashboard_stats(user_id)
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            for key, query in (("vocab_status", OLD_QUERIES[1]), ("flashcard_status", OLD_QUERIES[2])):
+                c.execute(query, {"u": user_id})
+                expected = {row["status"]: row["count"] for row in c.fetchall()}
+                actual = dict(zip(stats[key]["status"], stats[key]["count"]))
+                assert actual == expected, f"{key}: {actual} != {expected}"
+            c.execute(OLD_QUERIES[0], {"u": user_id})
+            expected = {row["date"]: row["count"] for row in c.fetchall()}
+            actual = {day: count for day, count in zip(stats["vocab_daily"]["date"], stats["vocab_daily"]["count"]) if count}
+            assert actual == expected, f"vocab_daily: {actual} != {expected}"
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        print(f"{'words':>7} {'attempts':>9} {'4 queries':>10} {'1 query':>8}  (ms)")
+        for words, attempts in SIZES:
+            seed(user_id, words, attempts)
+            old = timed(lambda: old_dashboard(user_id))
+            new = timed(lambda: get_dashboard_stats(user_id))
+            print(f"{words:>7} {attempts:>9} {old:>10.1f} {new:>8.1f}")
+        check_counters(user_id)
+        print("counters match a full recount after add/update/delete")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Đo thời gian phía server của một lần chạy lại trang flashcard (chế độ cổ điển, một lần cho mỗi thẻ)
+với bộ đề 500 thẻ: cách cũ (get_flashcard_test tải lại cả bộ đề, đọc index.html từ đĩa
+rồi replace) so với bộ thẻ giữ trong session (mảng song song) và template biên dịch sẵn.
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_flashcard_rerun
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import os
+import time
+import uuid
+from databases.connection import db_connection
+from services.flashcard import create_flashcard, get_flashcard_test
+from components.flashcard_ui import CARD_TEMPLATE_PATH, load_deck, render_card
+
+CARDS = 500
+
+def old_rerun(test_id: str, index: int) -> str:
+    # Giống do_flashcard trước đây: tải lại bộ đề và đọc lại template ở mỗi lần chạy lại
+    test = get_flashcard_test(test_id)
+    word = test["words"][index]
+    with open(CARD_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        html_content = f.read()
+    html_content = html_content.replace("__FRONT__", word["en"])
+    return html_content.replace("__BACK__", word["vi"])
+
+def new_rerun(session: dict, test_id: str, index: int) -> str:
+    # session thay cho st.session_state: bộ thẻ chỉ được tải ở lần đầu
+    deck = session.get("flashcard_deck")
+    if deck is None or deck.test_id != test_id:
+        deck = session["flashcard_deck"] = load_deck(test_id)
+    return render_card(deck.en[index], deck.vi[index])
+
+def per_card(fn) -> float:
+    start = time.perf_counter()
+    for index in range(CARDS):
+        fn(index)
+    return 1000 * (time.perf_counter() - start) / CARDS
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("""
+                    INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                    SELECT %s || '-' || i, %s, 'word ' || i, 'nghĩa của từ ' || i || ' <b>&</b>', 'Danh từ', '[]', NULL,
+                           'Đang học', CURRENT_DATE
+                    FROM generate_series(0, %s - 1) i
+                """, (user_id, user_id, CARDS))
+            conn.commit()
+        ok, test_id = create_flashcard(user_id, "bench rerun", [f"{user_id}-{i}" for i in range(CARDS)])
+        assert ok, test_id
+
+        old_rerun(test_id, 0)  # Làm nóng pool kết nối
+        old = per_card(lambda index: old_rerun(test_id, index))
+        session = {}
+        new = per_card(lambda index: new_rerun(session, test_id, index))
+        print(f"{CARDS} cards, template {os.path.getsize(CARD_TEMPLATE_PATH)} bytes")
+        print(f"  before: {old:.3f} ms per card rerun")
+        print(f"  after:  {new:.3f} ms per card rerun (first card loads the deck)")
+        print(f"  speed-up: {old / new:.0f}x")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Đo chỉ mục lemma dùng cho gợi ý tra cứu: thời gian xây dựng, bộ nhớ (tracemalloc)
+và độ trễ gợi ý trên một tập từ gõ sai sinh ngẫu nhiên từ các lemma WordNet
+(xóa, chèn, thay thế hoặc hoán đổi một ký tự), kèm tỉ lệ từ đúng nằm trong top-k.
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_lemma_index
+"""
+import time
+import random
+import string
+import tracemalloc
+from utils import nltk_config
+from nltk.corpus import wordnet
+from services.lemma_index import LemmaIndex
+
+TYPO_COUNT = 2000
+TOP_K = 5
+
+def make_typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    operation = rng.choice(["delete", "insert", "replace", "swap"])
+    if operation == "delete":
+        return word[:i] + word[i + 1:]
+    if operation == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if operation == "replace":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def measure(fn, queries) -> tuple:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return 1000 * sum(latencies) / len(latencies), 1000 * latencies[int(0.99 * (len(latencies) - 1))]
+
+def main():
+    lemmas = list(wordnet.all_lemma_names())  # Không tính thời gian tải WordNet
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = LemmaIndex(lemmas)
+    build_time = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Lemmas: {len(index)}, build: {build_time:.2f}s, memory: {current / 2**20:.1f} MB (peak {peak / 2**20:.1f} MB)")
+
+    rng = random.Random(0)
+    words = rng.sample([word for word in index.words if len(word) >= 4 and word.isalpha()], TYPO_COUNT)
+    typos = [(make_typo(word, rng), word) for word in words]
+    queries = [typo for typo, _ in typos]
+    recall = sum(word in index.suggest(typo, TOP_K) for typo, word in typos) / len(typos)
+
+    print(f"{'operation':<10} {'mean (ms)':>10} {'p99 (ms)':>9}")
+    for name, fn in [
+        ("exact", lambda q: q in index),
+        ("prefix", lambda q: index.prefix(q[:3], TOP_K)),
+        ("fuzzy", lambda q: index.fuzzy(q, TOP_K)),
+        ("suggest", lambda q: index.suggest(q, TOP_K)),
+    ]:
+        mean, p99 = measure(fn, queries)
+        print(f"{name:<10} {mean:>10.3f} {p99:>9.3f}")
+    print(f"Correct word in top-{TOP_K} for {len(typos)} typos: {recall:.1%}")
+
+if __name__ == "__main__":
+    main()
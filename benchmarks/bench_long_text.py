@@ -0,0 +1,51 @@
+"""
+Đo thời gian dịch văn bản dài (~1k và ~10k token) với translate_long_text.
+
+So sánh dịch từng câu một (batch_size=1) với dịch theo batch đã sắp xếp theo độ dài,
+với số luồng song song khác nhau, và đo cả cấu hình mặc định mà ứng dụng dùng
+(tham số mặc định của translate_long_text, có scheduler dùng chung).
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_long_text
+"""
+import time
+from utils import nltk_config
+from nltk.corpus import wordnet
+from services.translate import translate_long_text, load_translation_model
+
+def build_document(tokenizer, target_tokens: int) -> str:
+    """Ghép các định nghĩa WordNet thành đoạn văn cho tới khi đủ số token."""
+    sentences = []
+    total = 0
+    for synset in wordnet.all_synsets("n"):
+        sentence = synset.definition().capitalize() + "."
+        sentences.append(sentence)
+        total += len(tokenizer(sentence, add_special_tokens=False)["input_ids"])
+        if total >= target_tokens:
+            break
+    # Mỗi đoạn văn 8 câu
+    return "\n".join(" ".join(sentences[i:i + 8]) for i in range(0, len(sentences), 8))
+
+CONFIGS = [
+    ("mặc định", dict()),
+    ("từng câu", dict(batch_size=1, max_workers=1, use_scheduler=False)),
+    ("batch", dict(batch_size=16, max_workers=1, use_scheduler=False)),
+    ("batch, 2 luồng", dict(batch_size=16, max_workers=2, use_scheduler=False)),
+    ("batch, 512 token", dict(batch_size=16, max_workers=1, max_batch_tokens=512, use_scheduler=False)),
+]
+
+def main():
+    tokenizer, _ = load_translation_model()
+    translate_long_text("Warm up.", use_cache=False, use_scheduler=False)
+
+    for target in (1_000, 10_000):
+        document = build_document(tokenizer, target)
+        print(f"--- ~{target} token, {len(document.splitlines())} đoạn ---")
+        for name, kwargs in CONFIGS:
+            start = time.perf_counter()
+            translate_long_text(document, use_cache=False, **kwargs)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<18} {elapsed:8.2f}s  {target / elapsed:8.1f} token/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+So sánh các chế độ suy luận của mô hình dịch (fp32, int8, bf16) trên CPU:
+độ trễ, bộ nhớ tối đa (peak RSS) và chất lượng so với bản dịch fp32
+trên một tập câu cố định (chrF và tỉ lệ trùng khớp hoàn toàn).
+
+Mỗi chế độ chạy trong một process riêng để đo bộ nhớ chính xác.
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_quantization
+"""
+import sys
+import json
+import time
+import resource
+import subprocess
+import tempfile
+from services.metrics import chrf_score
+
+SENTENCE_COUNT = 100
+
+def fixed_sentences() -> list:
+    """Tập câu cố định: các câu ví dụ đầu tiên của WordNet."""
+    from utils import nltk_config
+    from nltk.corpus import wordnet
+    sentences = []
+    for synset in wordnet.all_synsets():
+        sentences.extend(synset.examples())
+        if len(sentences) >= SENTENCE_COUNT:
+            break
+    return sentences[:SENTENCE_COUNT]
+
+def worker(precision: str, output_path: str):
+    import torch
+    from services.translate import load_translation_model, resolve_precision, GENERATION_KWARGS, MAX_INPUT_LENGTH
+
+    sentences = fixed_sentences()
+    load_start = time.perf_counter()
+    tokenizer, model = load_translation_model(precision)
+    load_time = time.perf_counter() - load_start
+
+    outputs, latencies = [], []
+    for sentence in sentences:
+        start = time.perf_counter()
+        inputs = tokenizer([sentence], return_tensors="pt", padding=True, truncation=True, max_length=MAX_INPUT_LENGTH)
+        with torch.no_grad():
+            generated = model.generate(**inputs, **GENERATION_KWARGS)
+        outputs.append(tokenizer.decode(generated[0], skip_special_tokens=True))
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "precision": resolve_precision(precision),
+            "load_s": load_time,
+            "mean_ms": 1000 * sum(latencies) / len(latencies),
+            "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "outputs": outputs,
+        }, f, ensure_ascii=False)
+
+def main():
+    results = {}
+    for precision in ("fp32", "int8", "bf16"):
+        with tempfile.NamedTemporaryFile(suffix=".json") as tmp:
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_quantization", "--worker", precision, tmp.name], check=True)
+            with open(tmp.name, encoding="utf-8") as f:
+                results[precision] = json.load(f)
+
+    reference = results["fp32"]["outputs"]
+    print(f"{'mode':<6} {'used':<6} {'load (s)':>9} {'mean (ms)':>10} {'p95 (ms)':>9} {'peak RSS (MB)':>14} {'chrF':>6} {'exact':>6}")
+    for precision, result in results.items():
+        outputs = result["outputs"]
+        score = sum(chrf_score(o, r) for o, r in zip(outputs, reference)) / len(reference)
+        exact = sum(o == r for o, r in zip(outputs, reference)) / len(reference)
+        print(f"{precision:<6} {result['precision']:<6} {result['load_s']:>9.1f} {result['mean_ms']:>10.1f} "
+              f"{result['p95_ms']:>9.1f} {result['peak_rss_mb']:>14.0f} {score:>6.1f} {exact:>6.0%}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,41 @@
+"""
+Mô phỏng nhiều phiên Streamlit dịch đồng thời: so sánh gọi model trực tiếp
+với việc gom batch qua TranslationScheduler.
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_scheduler
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils import nltk_config
+from nltk.corpus import wordnet
+from services.translate import translate_batch, load_translation_model, get_translation_scheduler
+
+SESSIONS = (1, 4, 16, 32)
+REQUESTS_PER_SESSION = 4
+
+def run(sentences, sessions: int, use_scheduler: bool) -> float:
+    def session(offset):
+        for i in range(REQUESTS_PER_SESSION):
+            translate_batch([sentences[offset * REQUESTS_PER_SESSION + i]], use_cache=False, use_scheduler=use_scheduler)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        list(executor.map(session, range(sessions)))
+    return time.perf_counter() - start
+
+def main():
+    load_translation_model()
+    sentences = [s.definition() for s in list(wordnet.all_synsets("v"))[:max(SESSIONS) * REQUESTS_PER_SESSION]]
+    scheduler = get_translation_scheduler()
+    translate_batch(["Warm up."], use_cache=False, use_scheduler=False)
+
+    print(f"{'sessions':>8} {'direct (s)':>11} {'scheduler (s)':>14} {'avg batch':>10} {'avg wait (ms)':>14}")
+    for sessions in SESSIONS:
+        direct = run(sentences, sessions, use_scheduler=False)
+        batched = run(sentences, sessions, use_scheduler=True)
+        stats = scheduler.stats() if scheduler else {}
+        print(f"{sessions:>8} {direct:>11.2f} {batched:>14.2f} {stats.get('avg_batch_size', 0):>10.1f} {stats.get('avg_wait_ms', 0):>14.1f}")
+
+if __name__ == "__main__":
+    main()
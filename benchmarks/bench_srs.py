@@ -0,0 +1,82 @@
+"""
+Đo bộ lập lịch ôn tập (SM-2) với một người dùng có 100k từ: chọn các thẻ đến hạn bằng
+get_due_cards (index (user_id, due_at) + LIMIT), đếm số thẻ đến hạn, các thao tác heap của
+ReviewSession và ghi lịch ôn theo lô bằng save_reviews so với ghi từng thẻ một.
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_srs
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import time
+import uuid
+from datetime import datetime
+from databases.connection import db_connection
+from services.srs import QUALITY_AGAIN, QUALITY_GOOD, ReviewSession, count_due_cards, get_due_cards, save_reviews
+
+WORDS = 100_000
+REPEAT = 50
+LIMIT = 50
+
+def seed(user_id: str):
+    # Khoảng 10% số từ đã đến hạn, phần còn lại rải đều trong 90 ngày tới
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("""
+                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added,
+                                        srs_interval, srs_ease, srs_repetitions, due_at)
+                SELECT %s || '-' || i, %s, 'word' || i, 'nghĩa ' || i, 'Danh từ', '[]', NULL, 'Đang học', CURRENT_DATE,
+                       i %% 30, 2.5, i %% 5, now() + ((i %% 100) - 10) * interval '0.9 day'
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, WORDS))
+            c.execute("ANALYZE vocabulary")
+        conn.commit()
+
+def timed(fn, repeat: int = REPEAT) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+def save_one_by_one(user_id: str, schedules: dict):
+    for vocab_id, new in schedules.items():
+        save_reviews(user_id, {vocab_id: new})
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        seed(user_id)
+        print(f"{WORDS} words, {count_due_cards(user_id, cap=WORDS)} due")
+        print(f"  get_due_cards (limit {LIMIT}):  {timed(lambda: get_due_cards(user_id, LIMIT)):.2f} ms")
+        print(f"  count_due_cards (cap 101):   {timed(lambda: count_due_cards(user_id, cap=101)):.2f} ms")
+
+        cards = get_due_cards(user_id, LIMIT)
+        now = datetime.now()
+
+        def run_session():
+            # flush_every lớn để chỉ đo phần heap, không ghi xuống cơ sở dữ liệu
+            session = ReviewSession(user_id, cards, flush_every=len(cards) + 1)
+            while session.current() is not None:
+                card = session.current()
+                lapsed = card["srs_repetitions"] == 0 and card["vocab_id"].endswith("7")
+                session.answer(QUALITY_AGAIN if lapsed else QUALITY_GOOD, now)
+            return session.pending
+
+        print(f"  session of {len(cards)} cards (heap): {timed(run_session):.3f} ms")
+        pending = run_session()
+        batched = timed(lambda: save_reviews(user_id, pending), repeat=10)
+        single = timed(lambda: save_one_by_one(user_id, pending), repeat=3)
+        print(f"  save {len(pending)} reviews: batched {batched:.2f} ms, one by one {single:.2f} ms")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
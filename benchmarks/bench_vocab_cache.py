@@ -0,0 +1,113 @@
+"""
+Đo độ trễ đọc từ điển qua cache theo người dùng so với truy vấn trực tiếp, và tỉ lệ hit của cache
+khi các lần đọc xen kẽ với ghi (thêm từ, đổi trạng thái, xóa từ).
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_vocab_cache
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import time
+import uuid
+import random
+from databases.connection import db_connection
+from services.vocab import add_vocab, delete_vocab, get_user_vocabulary, get_vocabulary_page, update_vocab_status
+from services.vocab_cache import get_vocab_cache
+
+SIZES = [1_000, 10_000]
+REPEAT = 50
+# Số lần đọc cho mỗi lần ghi trong phần đo hỗn hợp
+READS_PER_WRITE = 10
+MIXED_OPERATIONS = 500
+
+def seed(user_id: str, rows: int):
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("DELETE FROM vocabulary WHERE user_id = %s", (user_id,))
+            c.execute("""
+                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                SELECT %s || '-' || i, %s, 'word' || i, 'nghĩa của từ ' || i, 'Danh từ',
+                       jsonb_build_array('an example with word' || i), 'synonym' || i, 'Đang học', CURRENT_DATE - (i %% 365)
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, rows))
+        conn.commit()
+    get_vocab_cache().patch(user_id)
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return 1000 * (time.perf_counter() - start) / REPEAT
+
+def uncached(user_id: str, fn):
+    # Xóa từ điển khỏi cache trước mỗi lần đọc để luôn truy vấn cơ sở dữ liệu
+    def run():
+        get_vocab_cache().patch(user_id)
+        return fn()
+    return run
+
+def mixed(user_id: str) -> dict:
+    cache = get_vocab_cache()
+    before = cache.stats()
+    rng = random.Random(0)
+    for i in range(MIXED_OPERATIONS):
+        if i % READS_PER_WRITE:
+            get_user_vocabulary(user_id)
+            get_vocabulary_page(user_id, 20)
+            continue
+        action = rng.choice(["add", "status", "delete"])
+        if action == "add":
+            add_vocab(user_id, f"mixed{i}", f"nghĩa {i}", "Danh từ", [], None)
+        else:
+            vocab_id = rng.choice(get_user_vocabulary(user_id))["vocab_id"]
+            if action == "status":
+                update_vocab_status(vocab_id, "Đã nhớ")
+            else:
+                delete_vocab(vocab_id)
+    after = cache.stats()
+    return {
+        name: (after[name]["hits"] - before[name]["hits"],
+               after[name]["misses"] - before[name]["misses"])
+        for name in ("rows", "pages")
+    }
+
+def check_fresh(user_id: str):
+    # Sau các lần ghi, dữ liệu trong cache phải khớp với cơ sở dữ liệu
+    cached = {row["vocab_id"]: row["status"] for row in get_user_vocabulary(user_id)}
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("SELECT vocab_id, status FROM vocabulary WHERE user_id = %s", (user_id,))
+            stored = {row["vocab_id"]: row["status"] for row in c.fetchall()}
+    assert cached == stored, "cache is stale"
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        print(f"{'words':>7} {'list db':>9} {'list hit':>9} {'page db':>9} {'page hit':>9}  (ms)")
+        for size in SIZES:
+            seed(user_id, size)
+            list_db = timed(uncached(user_id, lambda: get_user_vocabulary(user_id)))
+            list_hit = timed(lambda: get_user_vocabulary(user_id))
+            page_db = timed(uncached(user_id, lambda: get_vocabulary_page(user_id, 20)))
+            page_hit = timed(lambda: get_vocabulary_page(user_id, 20))
+            print(f"{size:>7} {list_db:>9.2f} {list_hit:>9.3f} {page_db:>9.2f} {page_hit:>9.3f}")
+
+        counts = mixed(user_id)
+        check_fresh(user_id)
+        print(f"\n{MIXED_OPERATIONS} operations, 1 write per {READS_PER_WRITE}:")
+        for name, (hits, misses) in counts.items():
+            print(f"  {name:<6} hits={hits} misses={misses} hit rate={hits / max(hits + misses, 1):.1%}")
+        print("  cache matches the database after the writes")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+        get_vocab_cache().patch(user_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Kiểm tra xuất từ điển với một người dùng giả có 1 triệu từ: thời gian, kích thước file và
+bộ nhớ Python tối đa (tracemalloc) khi xuất CSV/JSONL/Anki qua server-side cursor, so với
+đọc toàn bộ bằng get_user_vocabulary (fetchall). Bộ nhớ khi xuất ra file (export_to_file)
+phải gần như không đổi theo số dòng; nút tải xuống thì luôn giữ toàn bộ file trong RAM.
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_vocab_export
+Người dùng giả được tạo riêng và xóa khi kết thúc.
+"""
+import os
+import time
+import uuid
+import tracemalloc
+from databases.connection import db_connection
+from services.vocab import get_user_vocabulary
+from services.vocab_export import export_to_file
+
+ROWS = [100_000, 1_000_000]
+
+def seed(user_id: str, rows: int):
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("DELETE FROM vocabulary WHERE user_id = %s", (user_id,))
+            c.execute("""
+                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                SELECT %s || '-' || i, %s, 'word' || i, 'nghĩa của từ ' || i, 'Danh từ',
+                       jsonb_build_array('an example with word' || i), 'synonym' || i, 'Đang học', CURRENT_DATE - (i %% 365)
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, rows))
+        conn.commit()
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        print(f"{'rows':>9} {'method':<10} {'time (s)':>9} {'size (MB)':>10} {'peak Python mem (MB)':>21}")
+        for rows in ROWS:
+            seed(user_id, rows)
+            for fmt in ("csv", "jsonl", "anki"):
+                file, elapsed, peak = measure(lambda: export_to_file(user_id, fmt))
+                size = file.seek(0, os.SEEK_END) / 2**20
+                file.close()
+                print(f"{rows:>9} {fmt:<10} {elapsed:>9.2f} {size:>10.1f} {peak:>21.1f}")
+            _, elapsed, peak = measure(lambda: len(get_user_vocabulary(user_id)))
+            print(f"{rows:>9} {'fetchall':<10} {elapsed:>9.2f} {'':>10} {peak:>21.1f}")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Đo tốc độ nhập từ vựng hàng loạt (COPY vào bảng tạm rồi INSERT ... ON CONFLICT trong một
+transaction) với 10k và 100k dòng CSV, so với gọi add_vocab cho từng từ trên một mẫu nhỏ.
+Mỗi kích thước được nhập hai lần: lần hai đo trường hợp toàn bộ từ đã có (chỉ bỏ qua trùng).
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_vocab_import
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import io
+import csv
+import time
+import uuid
+from databases.connection import db_connection
+from services.vocab import add_vocab
+from services.vocab_import import iter_import_rows, import_vocabulary
+
+SIZES = [10_000, 100_000]
+BASELINE_ROWS = 500
+
+def make_csv(rows: int) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["en", "vi", "class", "examples"])
+    for i in range(rows):
+        writer.writerow([f"word{i}", f"nghĩa của từ {i}", "Danh từ", f"an example with word{i}|another one"])
+    return buffer.getvalue().encode("utf-8")
+
+def create_user() -> str:
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    return user_id
+
+def delete_user(user_id: str):
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+        conn.commit()
+
+def main():
+    user_id = create_user()
+    try:
+        start = time.perf_counter()
+        for i in range(BASELINE_ROWS):
+            add_vocab(user_id, f"baseline{i}", f"nghĩa {i}", "Danh từ", [], "")
+        baseline_rate = BASELINE_ROWS / (time.perf_counter() - start)
+        print(f"add_vocab per word: {baseline_rate:,.0f} rows/s ({BASELINE_ROWS} rows)")
+
+        print(f"{'rows':>8} {'run':<10} {'time (s)':>9} {'rows/s':>10} {'inserted':>9} {'duplicates':>11}")
+        for size in SIZES:
+            data = make_csv(size)
+            for run in ("new", "duplicate"):
+                start = time.perf_counter()
+                ok, summary = import_vocabulary(user_id, iter_import_rows(io.BytesIO(data), "bench.csv"))
+                elapsed = time.perf_counter() - start
+                if not ok:
+                    raise SystemExit(f"Import failed: {summary}")
+                print(f"{size:>8} {run:<10} {elapsed:>9.2f} {size / elapsed:>10,.0f} "
+                      f"{summary['inserted']:>9} {summary['duplicates']:>11}")
+            with db_connection() as conn:
+                with conn.cursor() as c:
+                    c.execute("DELETE FROM vocabulary WHERE user_id = %s AND en LIKE 'word%%'", (user_id,))
+                conn.commit()
+    finally:
+        delete_user(user_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Đo thời gian tải dữ liệu cho một lần chạy lại trang Từ điển khi từ điển lớn dần (1k, 10k, 50k từ):
+cách cũ (đọc toàn bộ get_user_vocabulary rồi tạo DataFrame) so với phân trang keyset
+get_vocabulary_page (trang đầu, trang sâu, lọc theo trạng thái và tìm kiếm).
+
+Cần cơ sở dữ liệu đã chạy migration qua DATABASE_URL:
+    python -m benchmarks.bench_vocab_page
+Người dùng thử được tạo riêng và xóa khi kết thúc.
+"""
+import time
+import uuid
+import pandas as pd
+from databases.connection import db_connection
+from services.vocab import get_user_vocabulary, get_vocabulary_page
+
+SIZES = [1_000, 10_000, 50_000]
+REPEAT = 20
+PAGE_SIZE = 20
+
+def seed(user_id: str, rows: int):
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("DELETE FROM vocabulary WHERE user_id = %s", (user_id,))
+            c.execute("""
+                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                SELECT %s || '-' || i, %s, 'word' || i, 'nghĩa của từ ' || i, 'Danh từ',
+                       jsonb_build_array('an example with word' || i, 'another example'), 'synonym' || i,
+                       CASE WHEN i %% 3 = 0 THEN 'Đã nhớ' ELSE 'Đang học' END, CURRENT_DATE - (i %% 365)
+                FROM generate_series(1, %s) i
+            """, (user_id, user_id, rows))
+            c.execute("ANALYZE vocabulary")
+        conn.commit()
+
+def timed(fn) -> float:
+    fn()  # Lần đầu để làm nóng pool và cache của PostgreSQL
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return 1000 * (time.perf_counter() - start) / REPEAT
+
+def deep_page(user_id: str, pages: int = 50):
+    # Khóa của trang thứ `pages`, để đo một trang nằm sâu trong từ điển
+    after = None
+    for _ in range(pages):
+        after = get_vocabulary_page(user_id, PAGE_SIZE, after=after)["next"]
+    return after
+
+def main():
+    user_id = str(uuid.uuid4())
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("INSERT INTO users (user_id, username, password, email) VALUES (%s, %s, 'x', %s)",
+                      (user_id, f"bench_{user_id}", f"bench_{user_id}@example.com"))
+        conn.commit()
+    try:
+        print(f"{'words':>7} {'full load':>10} {'page 1':>8} {'page 50':>8} {'status':>8} {'search':>8}  (ms)")
+        for size in SIZES:
+            seed(user_id, size)
+            after = deep_page(user_id)
+            full = timed(lambda: pd.DataFrame(get_user_vocabulary(user_id)))
+            first = timed(lambda: get_vocabulary_page(user_id, PAGE_SIZE))
+            deep = timed(lambda: get_vocabulary_page(user_id, PAGE_SIZE, after=after))
+            status = timed(lambda: get_vocabulary_page(user_id, PAGE_SIZE, status="Đã nhớ"))
+            search = timed(lambda: get_vocabulary_page(user_id, PAGE_SIZE, sort_by="en", descending=False, search="word12"))
+            print(f"{size:>7} {full:>10.1f} {first:>8.1f} {deep:>8.1f} {status:>8.1f} {search:>8.1f}")
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+So sánh thời gian dịch định nghĩa WordNet theo từng synset và theo batch.
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_word_info
+"""
+import time
+from utils import nltk_config
+from nltk.corpus import wordnet
+from services.translate import translate_text, translate_batch, load_translation_model
+from services.word_info import standardize_definition_for_translation
+
+# Các từ đa nghĩa có nhiều synset nhất
+WORDS = ["run", "set", "take", "break", "make", "go"]
+
+def main():
+    load_translation_model()  # Không tính thời gian tải mô hình
+    translate_text("warm up")
+
+    print(f"{'word':<8} {'synsets':>8} {'per-synset (s)':>15} {'batched (s)':>12} {'speedup':>8}")
+    for word in WORDS:
+        definitions = [standardize_definition_for_translation(s.definition()) for s in wordnet.synsets(word)]
+
+        start = time.perf_counter()
+        for definition in definitions:
+            translate_batch([definition], use_cache=False, use_scheduler=False)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        translate_batch(definitions, use_cache=False, use_scheduler=False)
+        batched = time.perf_counter() - start
+
+        print(f"{word:<8} {len(definitions):>8} {sequential:>15.2f} {batched:>12.2f} {sequential / batched:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+So sánh thời gian khởi động WordNet trong một process mới: nạp NLTK (lười) so với
+nạp snapshot dựng sẵn, tính đến khi có kết quả tra cứu đầu tiên. Đồng thời kiểm tra
+snapshot trả về đúng các synset như NLTK trên một tập từ (kể cả dạng chia/số nhiều).
+
+Cần dựng snapshot trước:
+    python -m services.wordnet_snapshot
+
+Chạy từ thư mục gốc của project:
+    python -m benchmarks.bench_wordnet_snapshot
+"""
+import sys
+import json
+import time
+import resource
+import subprocess
+from utils.config import get_setting
+
+RUNS = 3
+FIRST_WORD = "run"
+PARITY_WORDS = ["run", "running", "ran", "geese", "better", "mice", "ice cream", "ice_cream", "friendly", "was", "xyzzy",
+                "dogss", "runss", "glassess", "boxess"]
+
+def worker(mode: str):
+    # Import trước khi bấm giờ: chỉ đo phần nạp dữ liệu và lần tra cứu đầu tiên
+    from utils import nltk_config
+    from nltk.corpus import wordnet
+    from services.wordnet_snapshot import load_snapshot, DEFAULT_SNAPSHOT_PATH
+    path = get_setting("WORDNET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+
+    start = time.perf_counter()
+    if mode == "nltk":
+        synsets = wordnet.synsets(FIRST_WORD)
+    else:
+        snapshot = load_snapshot(path)
+        if snapshot is None:
+            sys.exit("WordNet snapshot missing or stale: run python -m services.wordnet_snapshot")
+        synsets = snapshot.synsets(FIRST_WORD)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "first_lookup_s": elapsed,
+        "synsets": len(synsets),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+def check_parity():
+    from utils import nltk_config
+    from nltk.corpus import wordnet
+    from services.wordnet_snapshot import load_snapshot, record_from_synset, DEFAULT_SNAPSHOT_PATH
+    snapshot = load_snapshot(get_setting("WORDNET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
+    mismatches = [
+        word for word in PARITY_WORDS
+        if snapshot.synsets(word) != [record_from_synset(s) for s in wordnet.synsets(word)]
+    ]
+    print(f"Parity on {len(PARITY_WORDS)} words: {'OK' if not mismatches else 'MISMATCH ' + ', '.join(mismatches)}")
+
+def main():
+    print(f"{'mode':<9} {'first lookup (s)':>17} {'synsets':>8} {'peak RSS (MB)':>14}")
+    for mode in ("nltk", "snapshot"):
+        results = []
+        for _ in range(RUNS):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_wordnet_snapshot", "--worker", mode],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        best = min(results, key=lambda r: r["first_lookup_s"])
+        print(f"{mode:<9} {best['first_lookup_s']:>17.2f} {best['synsets']:>8} {best['peak_rss_mb']:>14.0f}")
+    check_parity()
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        worker(sys.argv[2])
+    else:
+        main()
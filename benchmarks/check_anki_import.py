@@ -0,0 +1,41 @@
+"""
+Kiểm tra nhập file xuất "Notes in Plain Text" của Anki có header: đọc các file mẫu trong
+benchmarks/fixtures bằng iter_import_rows (tự nhận dạng định dạng) và so với kết quả mong đợi.
+Các file mẫu có cột guid/notetype/deck/tags khai báo bằng "#... column" (đánh số từ 1, tính
+trên toàn bộ cột) và header #columns đặt tên cột. Script thoát với mã 1 nếu có file không khớp.
+
+Không cần cơ sở dữ liệu:
+    python -m benchmarks.check_anki_import
+"""
+import os
+import sys
+from services.vocab_import import iter_import_rows
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+EXPECTED = {
+    "anki_notes_export.txt": [
+        ("apple", "quả táo"),
+        ("ice cream", "kem (món tráng miệng)"),
+        ("run; sprint", "chạy"),
+    ],
+    "anki_notes_columns.txt": [
+        ("book", "quyển sách"),
+        ("read; study", "đọc"),
+    ],
+}
+
+def main():
+    failures = 0
+    for name, expected in EXPECTED.items():
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            rows = [(row["en"], row["vi"]) for row in iter_import_rows(f, name)]
+        ok = rows == expected
+        failures += not ok
+        print(f"{'OK' if ok else 'MISMATCH':<9} {name}")
+        if not ok:
+            print(f"          expected {expected}\n          got      {rows}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
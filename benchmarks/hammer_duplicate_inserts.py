@@ -0,0 +1,79 @@
+"""
+Kiểm tra chống trùng khi ghi đồng thời: nhiều thread cùng lúc gọi add_vocab, create_flashcard
+và register_user với cùng dữ liệu. Mỗi thao tác phải thành công đúng một lần, các lần còn lại
+nhận thông báo trùng, và trong cơ sở dữ liệu chỉ có đúng một bản ghi.
+
+Cần cơ sở dữ liệu đã chạy migration (python -m databases.migrations) qua DATABASE_URL:
+    python -m benchmarks.hammer_duplicate_inserts
+Dữ liệu thử (một người dùng ngẫu nhiên) được xóa khi kết thúc.
+"""
+import sys
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from databases.connection import db_connection, get_pool
+from services.auth import register_user
+from services.vocab import add_vocab
+from services.flashcard import create_flashcard
+
+THREADS = 32
+ROUNDS = 5
+
+def hammer(fn, *args) -> list:
+    barrier = threading.Barrier(THREADS)
+
+    def call(_):
+        barrier.wait()  # Tất cả thread gửi yêu cầu cùng lúc
+        return fn(*args)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(call, range(THREADS)))
+
+def count(query: str, params: tuple) -> int:
+    with db_connection() as conn:
+        with conn.cursor() as c:
+            c.execute(query, params)
+            return c.fetchone()["count"]
+
+def check(name: str, results: list, rows: int) -> bool:
+    successes = sum(1 for ok, _ in results if ok)
+    messages = sorted({str(message) for ok, message in results if not ok})
+    passed = successes == 1 and rows == 1
+    print(f"{'ok  ' if passed else 'FAIL'} {name}: {successes} success(es), {rows} row(s), rejected with {messages}")
+    return passed
+
+def main() -> int:
+    passed = True
+    user_ids = []
+    try:
+        for _ in range(ROUNDS):
+            tag = uuid.uuid4().hex[:12]
+            username, email = f"hammer_{tag}", f"hammer_{tag}@example.com"
+
+            results = hammer(register_user, username, "hammer-password", email)
+            rows = count("SELECT COUNT(*) AS count FROM users WHERE username = %s OR email = %s", (username, email))
+            passed &= check("register_user", results, rows)
+
+            with db_connection() as conn:
+                with conn.cursor() as c:
+                    c.execute("SELECT user_id FROM users WHERE username = %s", (username,))
+                    user_id = c.fetchone()["user_id"]
+            user_ids.append(user_id)
+
+            results = hammer(add_vocab, user_id, "hammer", "cái búa", "Danh từ", [], "")
+            rows = count("SELECT COUNT(*) AS count FROM vocabulary WHERE user_id = %s", (user_id,))
+            passed &= check("add_vocab", results, rows)
+
+            results = hammer(create_flashcard, user_id, "hammer test", [])
+            rows = count("SELECT COUNT(*) AS count FROM flashcards WHERE user_id = %s", (user_id,))
+            passed &= check("create_flashcard", results, rows)
+    finally:
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                c.execute("DELETE FROM users WHERE user_id = ANY(%s)", (user_ids,))
+            conn.commit()
+        print(f"Pool: {get_pool().stats()}")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
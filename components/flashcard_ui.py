@@ -1,8 +1,97 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import os
+import re
+import html
 import random
-from services.flashcard import get_flashcard_test, update_flashcard_score
+from typing import NamedTuple
+from services.flashcard import get_flashcard_test, get_weakest_cards, update_flashcard_score
+from services.srs import ReviewSession, QUALITY_AGAIN, QUALITY_HARD, QUALITY_GOOD, QUALITY_EASY
+
+CARD_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
+
+# Component hai chiều: nhận cả bộ thẻ một lần, lật/trộn/chấm điểm trong trình duyệt
+# và chỉ gửi kết quả về server khi làm xong
+_flashcard_deck = components.declare_component(
+    "flashcard_deck", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "flashcard_deck")
+)
+
+DECK_MODE = "Nhanh (trong trình duyệt)"
+CLASSIC_MODE = "Cổ điển"
+
+class Deck(NamedTuple):
+    """A flashcard test held in the session: parallel tuples instead of one dict per card."""
+    test_id: str
+    name: str
+    ids: tuple
+    en: tuple
+    vi: tuple
+
+def load_deck(test_id: str):
+    """
+    Loads a flashcard test from the database into a Deck, or returns None if it does not exist.
+    """
+    test = get_flashcard_test(test_id)
+    if not test:
+        return None
+    words = test["words"]
+    return Deck(
+        test_id=test_id,
+        name=test["name"],
+        ids=tuple(word["vocab_id"] for word in words),
+        en=tuple(word["en"] for word in words),
+        vi=tuple(word["vi"] for word in words),
+    )
+
+def get_session_deck(test_id: str):
+    """
+    Returns the deck of test_id, loaded once per test session and kept in session_state.
+    """
+    deck = st.session_state.get("flashcard_deck")
+    if deck is None or deck.test_id != test_id:
+        deck = load_deck(test_id)
+        st.session_state.flashcard_deck = deck
+    return deck
+
+class CardTemplate(NamedTuple):
+    """index.html split around its placeholders: parts[0] field[0] parts[1] field[1] ... parts[-1]."""
+    parts: tuple
+    fields: tuple
+
+@st.cache_resource
+def get_card_template() -> CardTemplate:
+    """
+    Reads and splits the flip-card template once per process.
+    """
+    with open(CARD_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        chunks = re.split(r"(__FRONT__|__BACK__)", f.read())
+    return CardTemplate(parts=tuple(chunks[0::2]), fields=tuple(chunks[1::2]))
+
+def render_card(front: str, back: str) -> str:
+    """
+    Fills the flip-card template with the front and back text, HTML-escaped.
+    """
+    template = get_card_template()
+    values = {"__FRONT__": html.escape(front), "__BACK__": html.escape(back)}
+    out = [template.parts[0]]
+    for field, part in zip(template.fields, template.parts[1:]):
+        out.append(values[field])
+        out.append(part)
+    return "".join(out)
+
+def flashcard_deck(deck: Deck, key: str = None):
+    """
+    Renders the client-side flashcard deck.
+
+    Args:
+        deck (Deck): The deck; the browser starts a new attempt when its test_id changes.
+        key (str): Streamlit widget key.
+
+    Returns:
+        dict: None until an attempt is finished, then {"attempt", "total", "remembered",
+            "outcomes": [{"vocab_id", "remembered"}]}.
+    """
+    return _flashcard_deck(deck_id=deck.test_id, ids=deck.ids, en=deck.en, vi=deck.vi, key=key, default=None)
 
 def do_flashcard(test_id):
     """Display and manage the flashcard UI for a given test"""
@@ -12,11 +101,12 @@ def do_flashcard(test_id):
         reset_flashcard_state()
         st.session_state.current_test_id = test_id
     
-    # Get test details
-    test = get_flashcard_test(test_id)
-    if not test:
+    # Get test details (loaded once per test session)
+    deck = get_session_deck(test_id)
+    if not deck:
         st.error("Không tìm thấy đề thi!")
         return
+    total_words = len(deck.en)
     
     # Initialize session state for flashcards (only if not already set)
     if "flashcard_index" not in st.session_state:
@@ -25,12 +115,10 @@ def do_flashcard(test_id):
         st.session_state.remembered_count = 0
     if "completed" not in st.session_state:
         st.session_state.completed = False
-    if "words" not in st.session_state or st.session_state.words is None:
-        st.session_state.words = test["words"]
-        st.session_state.original_words = test["words"].copy()  # Keep original order
-    
-    words = st.session_state.words
-    total_words = len(words)
+    if "flashcard_order" not in st.session_state:
+        st.session_state.flashcard_order = list(range(total_words))  # Positions in the deck, in study order
+    if "flashcard_outcomes" not in st.session_state:
+        st.session_state.flashcard_outcomes = []  # Per-card results, saved together at the end
     
     # Safety check to prevent division by zero
     if total_words == 0:
@@ -42,18 +130,72 @@ def do_flashcard(test_id):
         return
     
     # Display test name and progress
-    st.title(f"Flashcard: {test['name']}")
-    
+    st.title(f"Flashcard: {deck.name}")
+    mode = st.radio("Chế độ", [DECK_MODE, CLASSIC_MODE], horizontal=True, key="flashcard_mode")
+    if mode == DECK_MODE:
+        do_flashcard_deck(test_id, deck)
+    else:
+        do_flashcard_classic(test_id, deck)
+
+def do_flashcard_deck(test_id, deck):
+    """Practice a test with the client-side deck: one rerun per finished attempt instead of one per card"""
+    if st.button("Quay lại danh sách", key="back_button", icon="🔙"):
+        reset_flashcard_state()
+        st.session_state.doing_flashcard = False
+        st.rerun()
+
+    result = flashcard_deck(deck, key=f"flashcard_deck_{test_id}")
+    if not result or not result["outcomes"]:
+        return
+
+    outcomes = result["outcomes"]
+    remembered = sum(1 for outcome in outcomes if outcome["remembered"])
+    score = (remembered / len(outcomes)) * 100
+
+    # Giá trị của component được giữ qua các lần chạy lại, nên mỗi lượt chỉ lưu điểm một lần
+    saved_attempts = st.session_state.setdefault("deck_saved_attempts", set())
+    if result["attempt"] not in saved_attempts:
+        update_flashcard_score(test_id, score, user_id=st.session_state.user_id, flashcard_name=deck.name,
+                               outcomes=outcomes)
+        saved_attempts.add(result["attempt"])
+
+    st.success(f"Đã lưu kết quả: {remembered}/{len(outcomes)} từ ({score:.1f}%)")
+    position = {vocab_id: i for i, vocab_id in enumerate(deck.ids)}
+    missed = [position[outcome["vocab_id"]] for outcome in outcomes
+              if not outcome["remembered"] and outcome["vocab_id"] in position]
+    if missed:
+        with st.expander(f"Từ cần ôn lại ({len(missed)})"):
+            for i in missed:
+                st.write(f"**{deck.en[i]}** – {deck.vi[i]}")
+    show_weakest_cards(test_id)
+
+def show_weakest_cards(test_id):
+    """List the cards of the test that were missed most often over all sessions"""
+    weakest = get_weakest_cards(test_id, limit=10)
+    if weakest:
+        with st.expander("Các thẻ hay quên nhất của bộ đề"):
+            for card in weakest:
+                st.write(f"**{card['en']}** – {card['vi']} (quên {card['times_missed']}/{card['times_seen']} lần)")
+
+def do_flashcard_classic(test_id, deck):
+    """Practice a test one card per rerun, with the ✔/✖ buttons handled by Streamlit"""
+    order = st.session_state.flashcard_order
+    total_words = len(order)
+
     # If we've gone through all words, show completion screen
     if st.session_state.flashcard_index >= total_words:
         st.session_state.completed = True
     
     if st.session_state.completed:
-        # Calculate and save score
+        # Calculate and save score (once, not on every rerun of the completion screen)
         score = (st.session_state.remembered_count / total_words) * 100
-        update_flashcard_score(test_id, score, user_id=st.session_state.user_id, flashcard_name=test["name"])
+        if not st.session_state.get("flashcard_saved"):
+            update_flashcard_score(test_id, score, user_id=st.session_state.user_id, flashcard_name=deck.name,
+                                   outcomes=st.session_state.flashcard_outcomes)
+            st.session_state.flashcard_saved = True
         
         st.info(f"Hoàn thành! Bạn đã ghi nhớ {st.session_state.remembered_count}/{total_words} từ ({score:.1f}%)")
+        show_weakest_cards(test_id)
         
         # Buttons to restart or returnfg
         pass_col, blank_1, blank_2, fail_col = st.columns([1.5,1,1,1])
@@ -62,7 +204,9 @@ def do_flashcard(test_id):
                 st.session_state.flashcard_index = 0
                 st.session_state.remembered_count = 0
                 st.session_state.completed = False
-                st.session_state.words = st.session_state.original_words.copy()  # Reset to original order
+                st.session_state.flashcard_order = list(range(total_words))  # Reset to original order
+                st.session_state.flashcard_outcomes = []
+                st.session_state.flashcard_saved = False
                 st.rerun()
         with pass_col:
             if st.button("Quay lại danh sách", key="back_button", use_container_width=True, icon="🔙"): # icon danh sách
@@ -73,9 +217,9 @@ def do_flashcard(test_id):
         back_col1, blank_3, blank_4, shuffle_col  = st.columns([1.5, 1, 1, 1])
         with shuffle_col:
             if st.button("TRỘN THẺ", key="shuffle_button", disabled=(st.session_state.flashcard_index != 0), use_container_width=True, icon="🔀"):
-                shuffled = st.session_state.words.copy()
+                shuffled = order.copy()
                 random.shuffle(shuffled)
-                st.session_state.words = shuffled
+                st.session_state.flashcard_order = shuffled
                 st.rerun()
         with back_col1:
             if st.button("Quay lại danh sách", key="back_button", use_container_width=True, icon="🔙"):  # icon danh sách
@@ -90,31 +234,22 @@ def do_flashcard(test_id):
         st.write(f"Tiến độ: {st.session_state.flashcard_index + 1}/{total_words}")
         
         # Get current word
-        current_word = words[st.session_state.flashcard_index]
-        
-        # Display flashcard using components.html
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        html_path = os.path.join(current_dir, "index.html")
+        current = order[st.session_state.flashcard_index]
         
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        # Replace placeholders with actual content
-        html_content = html_content.replace("__FRONT__", current_word["en"])
-        html_content = html_content.replace("__BACK__", current_word["vi"])
-        
-        # Display the component
-        components.html(html_content, height=270)
+        # Display flashcard using components.html (template is read once per process)
+        components.html(render_card(deck.en[current], deck.vi[current]), height=270)
         
         # Add buttons for navigation using Streamlit
         left_blank_col, pass_col, fail_col, right_blank_col = st.columns([1,1,1,1])
         with pass_col:
             if st.button("✔", key=f"remembered_{st.session_state.flashcard_index}", use_container_width=True):
+                st.session_state.flashcard_outcomes.append({"vocab_id": deck.ids[current], "remembered": True})
                 st.session_state.remembered_count += 1
                 st.session_state.flashcard_index += 1
                 st.rerun()
         with fail_col:
             if st.button("✖", key=f"learning_{st.session_state.flashcard_index}", use_container_width=True):
+                st.session_state.flashcard_outcomes.append({"vocab_id": deck.ids[current], "remembered": False})
                 st.session_state.flashcard_index += 1
                 st.rerun()
 
@@ -128,11 +263,50 @@ def reset_flashcard_state():
         "flashcard_index", 
         "remembered_count", 
         "completed", 
-        "words", 
-        "original_words"
+        "flashcard_order",
+        "flashcard_outcomes",
+        "flashcard_saved",
+        "flashcard_deck",
+        "deck_saved_attempts"
     ]
     
     # Delete keys from session_state if they exist
     for key in flashcard_keys:
         if key in st.session_state:
-            del st.session_state[key]
\ No newline at end of file
+            del st.session_state[key]
+
+# (nhãn nút, mức đánh giá SM-2)
+REVIEW_ANSWERS = [("Quên", QUALITY_AGAIN), ("Khó", QUALITY_HARD), ("Nhớ", QUALITY_GOOD), ("Dễ", QUALITY_EASY)]
+
+def do_review():
+    """Review the user's due cards with the spaced-repetition scheduler"""
+    if "review_session" not in st.session_state:
+        st.session_state.review_session = ReviewSession.start(st.session_state.user_id)
+    session = st.session_state.review_session
+
+    st.title("Ôn tập từ đến hạn")
+
+    def back_to_list():
+        session.flush()
+        del st.session_state.review_session
+        st.session_state.doing_review = False
+
+    card = session.current()
+    if card is None:
+        session.flush()
+        if session.reviewed:
+            st.info(f"Hoàn thành! Bạn đã ôn {session.reviewed} lượt, quên {session.lapses} lần.")
+        else:
+            st.info("Không có từ nào đến hạn ôn tập.")
+        st.button("Quay lại danh sách", key="review_back_button", icon="🔙", on_click=back_to_list)
+        return
+
+    st.button("Quay lại danh sách", key="review_back_button", icon="🔙", on_click=back_to_list)
+    st.write(f"Còn lại: {len(session)} thẻ")
+    components.html(render_card(card["en"], card["vi"]), height=270)
+
+    for col, (label, quality) in zip(st.columns(len(REVIEW_ANSWERS)), REVIEW_ANSWERS):
+        with col:
+            # Mỗi câu trả lời chỉ cập nhật heap trong session; lịch ôn được ghi theo lô
+            st.button(label, key=f"review_{label}_{session.reviewed}", use_container_width=True,
+                      on_click=session.answer, args=(quality,))
@@ -1,21 +1,227 @@
-import os
+import time
+import threading
 import streamlit as st
 import psycopg2
+from collections import deque
+from contextlib import contextmanager
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from psycopg2.extras import RealDictCursor
-# from dotenv import load_dotenv
+from utils.config import get_setting
 
-# # Load biến môi trường từ .env
-# load_dotenv()
+DATABASE_URL = get_setting("DATABASE_URL")
 
-# # Đọc connection string từ biến môi trường
-# DATABASE_URL = os.getenv("DATABASE_URL")
-DATABASE_URL = st.secrets.get("DATABASE_URL", os.getenv("DATABASE_URL"))
+POOL_MIN_SIZE = int(get_setting("DB_POOL_MIN_SIZE", 1))
+POOL_MAX_SIZE = int(get_setting("DB_POOL_MAX_SIZE", 10))
+# Kết nối cũ hơn thời gian này (giây) sẽ được đóng và mở lại
+POOL_MAX_LIFETIME = float(get_setting("DB_POOL_MAX_LIFETIME", 1800))
+# Thời gian chờ tối đa (giây) để lấy kết nối khi pool đã dùng hết
+POOL_TIMEOUT = float(get_setting("DB_POOL_TIMEOUT", 30))
+# Kết nối nhàn rỗi lâu hơn thời gian này (giây) được kiểm tra bằng SELECT 1 trước khi dùng
+POOL_CHECK_AFTER = float(get_setting("DB_POOL_CHECK_AFTER", 5))
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection becomes available within the pool timeout."""
 
-# @st.cache_resource
 def get_connection():
+    """
+    Opens a new, unpooled connection. Service code should use db_connection() instead.
+    """
     try:
         conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
         return conn
     except psycopg2.Error as e:
         print(f"[ERROR] Không thể kết nối tới cơ sở dữ liệu: {e}")
         raise
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool shared by every Streamlit session of the process.
+
+    Idle connections are reused most-recently-used first. On checkout a connection is discarded
+    if it is closed, older than max_lifetime, or fails a SELECT 1 after being idle longer than
+    check_after seconds. When max_size connections are in use, checkout waits up to timeout seconds.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10, max_lifetime: float = 1800,
+                 timeout: float = 30, check_after: float = 5):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_after = check_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, thời điểm trả về pool)
+        self._created = {}  # id(conn) -> thời điểm mở
+        self._size = 0
+        self._opened = 0
+        self._reused = 0
+        self._discarded = 0
+        self._waits = 0
+
+        for _ in range(min_size):
+            try:
+                conn = self._open()
+            except psycopg2.Error:
+                break
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, time.monotonic()))
+
+    def _open(self):
+        conn = get_connection()
+        with self._cond:
+            self._created[id(conn)] = time.monotonic()
+            self._opened += 1
+        return conn
+
+    def _close(self, conn):
+        # Gọi khi đang giữ self._cond
+        self._created.pop(id(conn), None)
+        self._size -= 1
+        self._discarded += 1
+        self._cond.notify()
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _expired(self, conn) -> bool:
+        return time.monotonic() - self._created.get(id(conn), 0) > self.max_lifetime
+
+    def _healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed or self._expired(conn):
+            return False
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            print(f"[LOG] Discarding broken pooled connection: {e}")
+            return False
+
+    def getconn(self, timeout: float = None):
+        """
+        Checks a healthy connection out of the pool, opening a new one if the pool is not full.
+        Raises:
+            PoolTimeout: If no connection is available within timeout seconds.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No database connection available after {self.timeout:.0f}s")
+                    self._waits += 1
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    self._size += 1
+                    conn = None
+
+            if conn is None:
+                try:
+                    return self._open()
+                except psycopg2.Error:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            # Kiểm tra sức khỏe ngoài lock để không chặn các thread khác
+            if self._healthy(conn, idle_since):
+                with self._cond:
+                    self._reused += 1
+                return conn
+            with self._cond:
+                self._close(conn)
+
+    def putconn(self, conn, discard: bool = False):
+        """
+        Returns a connection to the pool. Uncommitted work is rolled back; broken or expired
+        connections are closed instead of being kept.
+        """
+        if not discard and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        with self._cond:
+            if discard or conn.closed or self._expired(conn):
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and always returns it to the pool,
+        rolling back anything not committed. Callers still commit explicitly.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        except psycopg2.InterfaceError:
+            self.putconn(conn, discard=True)
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        else:
+            self.putconn(conn)
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close(conn)
+
+    def stats(self) -> dict:
+        """
+        Returns the number of open, idle and in-use connections and the pool counters.
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "opened": self._opened,
+                "reused": self._reused,
+                "discarded": self._discarded,
+                "waits": self._waits,
+            }
+
+@st.cache_resource
+def get_pool() -> ConnectionPool:
+    """
+    Returns the connection pool of this process.
+    """
+    return ConnectionPool(
+        DATABASE_URL,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_lifetime=POOL_MAX_LIFETIME,
+        timeout=POOL_TIMEOUT,
+        check_after=POOL_CHECK_AFTER,
+    )
+
+@contextmanager
+def db_connection():
+    """
+    Borrows a pooled connection:
+
+        with db_connection() as conn:
+            with conn.cursor() as c:
+                ...
+            conn.commit()
+    """
+    with get_pool().connection() as conn:
+        yield conn
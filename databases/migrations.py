@@ -0,0 +1,213 @@
+"""
+Migration schema cơ sở dữ liệu có đánh số phiên bản.
+
+Mỗi migration là (phiên bản, tên, danh sách câu lệnh) và chỉ được chạy một lần; các phiên bản
+đã áp dụng được ghi trong bảng schema_migrations. Migration 1 dùng CREATE TABLE IF NOT EXISTS
+nên cũng áp dụng được cho cơ sở dữ liệu đã tạo bảng bằng tay trước đây.
+
+Áp dụng các migration còn thiếu (chạy khi triển khai):
+    python -m databases.migrations
+Xem trạng thái:
+    python -m databases.migrations --status
+"""
+import argparse
+from databases.connection import db_connection
+
+# Khóa advisory để nhiều process không chạy migration cùng lúc
+_MIGRATION_LOCK_ID = 0x656E7669
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS vocabulary (
+            vocab_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            en TEXT NOT NULL,
+            vi TEXT NOT NULL,
+            class TEXT,
+            examples JSONB NOT NULL DEFAULT '[]',
+            synonyms TEXT,
+            status TEXT NOT NULL DEFAULT 'Đang học',
+            date_added DATE NOT NULL DEFAULT CURRENT_DATE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS flashcards (
+            test_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Chưa làm',
+            score DOUBLE PRECISION NOT NULL DEFAULT 0,
+            date_updated TIMESTAMP NOT NULL DEFAULT now(),
+            vocabs TEXT NOT NULL DEFAULT '[]'
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS flashcard_history (
+            history_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            flashcard_name TEXT NOT NULL,
+            score DOUBLE PRECISION NOT NULL,
+            time_updated TIMESTAMP NOT NULL DEFAULT now()
+        )
+        """,
+    ]),
+    (2, "indexes and unique constraints for service queries", [
+        # Xóa các bản ghi trùng do kiểm tra SELECT-rồi-INSERT trước đây không chống được truy cập đồng thời
+        """
+        DELETE FROM vocabulary a USING vocabulary b
+        WHERE a.user_id = b.user_id AND a.en = b.en AND a.vi = b.vi AND a.ctid > b.ctid
+        """,
+        """
+        DELETE FROM flashcards a USING flashcards b
+        WHERE a.user_id = b.user_id AND a.name = b.name AND a.ctid > b.ctid
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS users_username_key ON users (username)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users (email)",
+        # md5(vi): định nghĩa có thể dài hơn giới hạn kích thước một khóa B-tree
+        "CREATE UNIQUE INDEX IF NOT EXISTS vocabulary_user_en_vi_key ON vocabulary (user_id, en, md5(vi))",
+        "CREATE INDEX IF NOT EXISTS vocabulary_user_date_added_idx ON vocabulary (user_id, date_added)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS flashcards_user_name_key ON flashcards (user_id, name)",
+        "CREATE INDEX IF NOT EXISTS flashcards_user_date_updated_idx ON flashcards (user_id, date_updated DESC)",
+        "CREATE INDEX IF NOT EXISTS flashcard_history_user_time_idx ON flashcard_history (user_id, time_updated DESC)",
+    ]),
+    (3, "keyset pagination indexes for the dictionary grid", [
+        # (sort column, vocab_id) khớp với khóa phân trang của get_vocabulary_page
+        "CREATE INDEX IF NOT EXISTS vocabulary_user_date_id_idx ON vocabulary (user_id, date_added, vocab_id)",
+        "DROP INDEX IF EXISTS vocabulary_user_date_added_idx",
+        "CREATE INDEX IF NOT EXISTS vocabulary_user_en_id_idx ON vocabulary (user_id, en, vocab_id)",
+        "CREATE INDEX IF NOT EXISTS vocabulary_user_lower_en_idx ON vocabulary (user_id, lower(en) text_pattern_ops)",
+    ]),
+    (4, "per-user stats counters for the account dashboard", [
+        # Số từ vựng/flashcard theo trạng thái, được cập nhật cùng transaction với mỗi lần ghi
+        """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id TEXT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, kind, status)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_daily_stats (
+            user_id TEXT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            vocab_added BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        )
+        """,
+        """
+        INSERT INTO user_stats (user_id, kind, status, count)
+        SELECT user_id, 'vocab', status, COUNT(*) FROM vocabulary GROUP BY user_id, status
+        UNION ALL
+        SELECT user_id, 'flashcard', status, COUNT(*) FROM flashcards GROUP BY user_id, status
+        ON CONFLICT DO NOTHING
+        """,
+        """
+        INSERT INTO user_daily_stats (user_id, day, vocab_added)
+        SELECT user_id, date_added, COUNT(*) FROM vocabulary GROUP BY user_id, date_added
+        ON CONFLICT DO NOTHING
+        """,
+    ]),
+    (5, "normalized flashcard items with per-card results", [
+        # Mỗi thẻ của bộ đề là một dòng; en/vi lấy từ vocabulary nên xóa từ cũng xóa thẻ
+        """
+        CREATE TABLE IF NOT EXISTS flashcard_items (
+            test_id TEXT NOT NULL REFERENCES flashcards (test_id) ON DELETE CASCADE,
+            vocab_id TEXT NOT NULL REFERENCES vocabulary (vocab_id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            last_result BOOLEAN,
+            times_seen INTEGER NOT NULL DEFAULT 0,
+            times_missed INTEGER NOT NULL DEFAULT 0,
+            last_reviewed TIMESTAMP,
+            PRIMARY KEY (test_id, vocab_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS flashcard_items_test_position_idx ON flashcard_items (test_id, position)",
+        "CREATE INDEX IF NOT EXISTS flashcard_items_test_missed_idx ON flashcard_items (test_id, times_missed DESC, position)",
+        "CREATE INDEX IF NOT EXISTS flashcard_items_vocab_idx ON flashcard_items (vocab_id)",
+        # Chuyển các bộ đề cũ từ snapshot JSON trong flashcards.vocabs (bỏ qua từ đã bị xóa)
+        """
+        INSERT INTO flashcard_items (test_id, vocab_id, position)
+        SELECT f.test_id, v.vocab_id, item.ordinality - 1
+        FROM flashcards f
+        CROSS JOIN LATERAL jsonb_array_elements(f.vocabs::jsonb) WITH ORDINALITY AS item(value, ordinality)
+        JOIN vocabulary v ON v.vocab_id = item.value->>'vocab_id' AND v.user_id = f.user_id
+        ON CONFLICT DO NOTHING
+        """,
+    ]),
+    (6, "spaced-repetition schedule per vocabulary item", [
+        # Lịch ôn SM-2: khoảng cách (ngày), hệ số dễ, số lần nhớ liên tiếp và thời điểm đến hạn
+        "ALTER TABLE vocabulary ADD COLUMN IF NOT EXISTS srs_interval DOUBLE PRECISION NOT NULL DEFAULT 0",
+        "ALTER TABLE vocabulary ADD COLUMN IF NOT EXISTS srs_ease DOUBLE PRECISION NOT NULL DEFAULT 2.5",
+        "ALTER TABLE vocabulary ADD COLUMN IF NOT EXISTS srs_repetitions INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE vocabulary ADD COLUMN IF NOT EXISTS due_at TIMESTAMP NOT NULL DEFAULT now()",
+        "CREATE INDEX IF NOT EXISTS vocabulary_user_due_idx ON vocabulary (user_id, due_at)",
+    ]),
+]
+
+def _ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+def applied_versions() -> set:
+    """
+    Returns the versions already recorded in schema_migrations.
+    """
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            _ensure_migrations_table(cur)
+            cur.execute("SELECT version FROM schema_migrations")
+            versions = {row["version"] for row in cur.fetchall()}
+        conn.commit()
+    return versions
+
+def migrate() -> list:
+    """
+    Applies every pending migration, each in its own transaction.
+    Returns:
+        list: The versions applied by this call.
+    """
+    applied = []
+    with db_connection() as conn:
+        for version, name, statements in MIGRATIONS:
+            with conn.cursor() as cur:
+                _ensure_migrations_table(cur)
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (_MIGRATION_LOCK_ID,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone():
+                    conn.commit()
+                    continue
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append(version)
+            print(f"[LOG] Applied migration {version}: {name}")
+    return applied
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the database schema migrations.")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations only.")
+    args = parser.parse_args()
+    if args.status:
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':<8} {name}")
+    else:
+        applied = migrate()
+        print(f"[LOG] {len(applied)} migration(s) applied." if applied else "[LOG] Schema is up to date.")
@@ -1,11 +1,11 @@
 import streamlit as st
-from services.translate import translate_text
+from services.translate import translate_long_text
 from services.vocab import add_vocab
 from utils.session import is_logged_in
-from services.translate import load_translation_model
-from services.word_info import get_word_info
+from services.translate import warm_up_translation_model
+from services.word_info import get_word_info, suggest_words
 
-tokenizer, model = load_translation_model()
+warm_up_translation_model()
 
 # Giới thiệu về trang web envichan
 st.title("Chào mừng đến với Envichan!")
@@ -19,9 +19,13 @@ with translate_col:
     translate = st.button("Dịch", use_container_width=True, icon = "🌐")
         
 if translate: 
-    result = translate_text(text)
+    with st.spinner("Đang dịch..."):
+        result = translate_long_text(text)
     st.success(result)
 
+def use_suggestion(word):
+    st.session_state.word_lookup_input = word
+
 # Hiển thị phần tra cứu từ vựng mới
 st.subheader("Phát hiện từ vựng mới ? Tra cứu ngay!")
 word_to_lookup = st.text_input("Nhập từ tiếng Anh cần tra cứu:", key="word_lookup_input", placeholder="Ví dụ: map")
@@ -61,4 +65,10 @@ if word_to_lookup:
                         else: 
                             st.toast(f"Lỗi: {message}", icon="❌")
     else:
-        st.error("Không tìm thấy thông tin cho từ này. Vui lòng thử lại với từ khác.")
\ No newline at end of file
+        st.error("Không tìm thấy thông tin cho từ này. Vui lòng thử lại với từ khác.")
+        suggestions = suggest_words(word_to_lookup)
+        if suggestions:
+            st.write("Có phải bạn muốn tìm:")
+            suggestion_cols = st.columns(len(suggestions))
+            for col, suggestion in zip(suggestion_cols, suggestions):
+                col.button(suggestion, key=f"suggest_{suggestion}", on_click=use_suggestion, args=(suggestion,), use_container_width=True)
\ No newline at end of file
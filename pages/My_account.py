@@ -3,7 +3,7 @@ import time
 from services.auth import register_user, login_user
 from utils.session import is_logged_in
 from services.charts import *
-from services.flashcard import get_flashcard_hisrory
+from services.user_stats import get_dashboard_stats
 
 # --- Callback Functions cho trang Tài khoản của tôi---
 def show_register():
@@ -43,26 +43,27 @@ if is_logged_in():
     st.sidebar.title(f"Xin chào {st.session_state.username}!")
 
     user_id = st.session_state.get("user_id")
-    
+    # Toàn bộ số liệu của trang được đọc bằng một truy vấn
+    stats = get_dashboard_stats(user_id)
 
     st.subheader("Lịch sử thêm từ")
-    fig = plot_vocab_added_last_7_days(user_id)
+    fig = plot_vocab_added_last_7_days(stats["vocab_daily"])
     st.plotly_chart(fig, use_container_width=True)
 
     col1, col2 = st.columns([1, 1])
     with col1:
         st.subheader("Biểu đồ từ vựng")
-        fig = plot_vocab_status_distribution(user_id=user_id)
+        fig = plot_vocab_status_distribution(stats["vocab_status"])
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Biểu đồ flashcard")
-        fig = plot_flashcard_status_distribution(user_id=user_id)
+        fig = plot_flashcard_status_distribution(stats["flashcard_status"])
         st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Biểu đồ điểm số flashcard")
     tab1, tab2 = st.tabs(["Biểu đồ", "Bảng dữ liệu"])
-    history = get_flashcard_hisrory(user_id)
+    history = stats["history"]
     with tab1:
         fig = plot_single_score_line(history)
         st.plotly_chart(fig, use_container_width=True)
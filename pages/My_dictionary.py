@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
-from services.vocab import get_user_vocabulary, delete_vocab, update_vocab_status
+from services.vocab import get_vocabulary_page, get_vocab, delete_vocab, update_vocab_status
+from services.vocab_import import iter_import_rows, import_vocabulary
+from services.vocab_export import export_vocabulary
 from services.translate import translate_text
 from utils.session import is_logged_in
 from components.feedback import confirm_modal, toast
@@ -15,6 +17,11 @@ if "deleting_id" not in st.session_state:
     st.session_state.deleting_id = None
 if "grid_key_vocabulary" not in st.session_state:
     st.session_state.grid_key_vocabulary = "vocabulary_table"
+# keyset cursors of the pages before the current one, and the filters they were computed for
+if "vocab_page_cursors" not in st.session_state:
+    st.session_state.vocab_page_cursors = [None]
+if "vocab_page_filters" not in st.session_state:
+    st.session_state.vocab_page_filters = None
 
 
 # page title
@@ -27,32 +34,115 @@ if not is_logged_in():
 
 st.sidebar.title(f"Xin chào {st.session_state.username}!")
 
+## ------------------- BULK IMPORT ------------------
+with st.expander("📥 Nhập từ vựng hàng loạt (CSV, TSV, Anki, danh sách từ)"):
+    st.caption(
+        "CSV/TSV: cần cột `en` (hoặc `english`, `word`) và `vi` (hoặc `definition`), có thể thêm `class`, `examples`, `synonyms`. "
+        "Anki: xuất bằng *Notes in Plain Text*. Danh sách từ: mỗi dòng một từ tiếng Anh."
+    )
+    import_file = st.file_uploader("Chọn file", type=["csv", "tsv", "txt"], key="vocab_import_file")
+    fill_missing = st.checkbox("Tự dịch nghĩa cho các từ chưa có định nghĩa", value=True)
+    if st.button("Nhập từ vựng", icon="📥", disabled=(import_file is None)):
+        progress_bar = st.progress(0.0, text="Đang nhập từ vựng...")
+
+        def report_progress(rows_read):
+            fraction = min(import_file.tell() / max(import_file.size, 1), 1.0)
+            progress_bar.progress(fraction, text=f"Đã đọc {rows_read} dòng...")
+
+        import_file.seek(0)
+        rows = iter_import_rows(import_file, import_file.name)
+        result, summary = import_vocabulary(st.session_state["user_id"], rows, fill_missing=fill_missing, progress=report_progress)
+        progress_bar.empty()
+        if result:
+            message = (
+                f"Đã thêm {summary['inserted']} từ mới "
+                f"(bỏ qua {summary['duplicates']} từ đã có, {summary['skipped']} dòng thiếu dữ liệu)."
+            )
+            if summary["translated"]:
+                message += f" Đã tự dịch {summary['translated']} định nghĩa."
+            st.success(message)
+            st.session_state.grid_key_vocabulary = str(uuid.uuid4())
+        else:
+            st.error(f"Lỗi khi nhập từ vựng: {summary}")
+
+## ------------------- EXPORT ------------------
+with st.expander("📤 Xuất từ điển (CSV, JSONL, Anki)"):
+    export_formats = {"CSV": "csv", "JSON Lines": "jsonl", "Anki (Notes in Plain Text)": "anki"}
+    export_label = st.selectbox("Định dạng", list(export_formats), key="vocab_export_format")
+    if st.button("Tạo file xuất", icon="📤"):
+        try:
+            with st.spinner("Đang xuất từ điển..."):
+                export_data, export_name, export_mime = export_vocabulary(st.session_state["user_id"], export_formats[export_label])
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.download_button("Tải file xuống", data=export_data, file_name=export_name, mime=export_mime, icon="⬇️")
+
 ## ------------------- USER VOCABULARY TABLE ------------------
 st.subheader("Danh sách từ vựng của tôi")
 
-data = get_user_vocabulary(st.session_state["user_id"])
-columns = ["vocab_id", "user_id", "en", "vi", "class", "examples", "synonyms", "status", "date_added"]
-vocabulary_df = pd.DataFrame(data, columns=columns)
+SORT_OPTIONS = {
+    "Mới thêm gần đây": ("date_added", True),
+    "Thêm lâu nhất": ("date_added", False),
+    "A → Z": ("en", False),
+    "Z → A": ("en", True),
+}
+STATUS_OPTIONS = ["Tất cả", "Đang học", "Đã nhớ"]
+CLASS_OPTIONS = ["Tất cả", "Danh từ", "Động từ", "Tính từ", "Trạng từ", "Tính từ ngắn"]
+
+search_col, status_col, class_col, sort_col, size_col = st.columns([3, 2, 2, 2, 1])
+search = search_col.text_input("Tìm từ", placeholder="Bắt đầu bằng...", key="vocab_search")
+status_filter = status_col.selectbox("Trạng thái", STATUS_OPTIONS, key="vocab_status_filter")
+class_filter = class_col.selectbox("Loại từ", CLASS_OPTIONS, key="vocab_class_filter")
+sort_label = sort_col.selectbox("Sắp xếp", list(SORT_OPTIONS), key="vocab_sort")
+page_size = size_col.selectbox("Số dòng", [10, 20, 50], index=1, key="vocab_page_size")
+
+# Đổi bộ lọc thì quay về trang đầu
+filters = (search.strip(), status_filter, class_filter, sort_label, page_size)
+if filters != st.session_state.vocab_page_filters:
+    st.session_state.vocab_page_filters = filters
+    st.session_state.vocab_page_cursors = [None]
+
+sort_by, descending = SORT_OPTIONS[sort_label]
+page = get_vocabulary_page(
+    st.session_state["user_id"],
+    page_size=page_size,
+    sort_by=sort_by,
+    descending=descending,
+    status=None if status_filter == "Tất cả" else status_filter,
+    word_class=None if class_filter == "Tất cả" else class_filter,
+    search=search.strip() or None,
+    after=st.session_state.vocab_page_cursors[-1],
+)
+columns = ["vocab_id", "en", "vi", "class", "status", "date_added"]
+vocabulary_df = pd.DataFrame(page["rows"], columns=columns)
 
-# Xây dựng cấu hình bảng
+# Xây dựng cấu hình bảng (chỉ một trang, phân trang ở phía server)
 gb_vocabulary = GridOptionsBuilder.from_dataframe(vocabulary_df)
 gb_vocabulary.configure_selection(selection_mode="single", use_checkbox=True)
-gb_vocabulary.configure_pagination(paginationAutoPageSize=False, paginationPageSize=10)
-gb_vocabulary.configure_default_column(editable=False, resizable=True)
-gb_vocabulary.configure_column("user_id", hide=True)  # Ẩn cột user_id
-gb_vocabulary.configure_column("synonyms", hide=True)  # Ẩn cột synonyms
-# gb_vocabulary.configure_column("date_added", hide=True)  # Ẩn cột vocab_id
-gb_vocabulary.configure_column("examples", hide=True)  # Ẩn cột examples
+gb_vocabulary.configure_default_column(editable=False, resizable=True, sortable=False)
+gb_vocabulary.configure_column("vocab_id", hide=True)  # Ẩn cột vocab_id
 gb_vocabulary.configure_grid_options(rowHeight=32)
 vocabulary_table = AgGrid(
     vocabulary_df,
     gridOptions=gb_vocabulary.build(),
     update_mode=GridUpdateMode.SELECTION_CHANGED,
     fit_columns_on_grid_load=True,
-    height=min(300, (len(vocabulary_df) + 2) * 32 + 32),
-    key=st.session_state.grid_key_vocabulary
+    height=min(400, (len(vocabulary_df) + 2) * 32 + 32),
+    # Mỗi trang/bộ lọc dùng key riêng để AgGrid vẽ lại dữ liệu mới
+    key=f"{st.session_state.grid_key_vocabulary}_{abs(hash(filters))}_{len(st.session_state.vocab_page_cursors)}"
 )
 
+page_number = len(st.session_state.vocab_page_cursors)
+prev_col, page_col, next_col = st.columns([1, 4, 1])
+if prev_col.button("← Trang trước", use_container_width=True, disabled=(page_number == 1)):
+    st.session_state.vocab_page_cursors.pop()
+    st.rerun()
+page_col.markdown(f"<div style='text-align: center'>Trang {page_number}</div>", unsafe_allow_html=True)
+if next_col.button("Trang sau →", use_container_width=True, disabled=(page["next"] is None)):
+    st.session_state.vocab_page_cursors.append(page["next"])
+    st.rerun()
+
 # get selected word
 selected_row = vocabulary_table["selected_rows"]
 
@@ -80,11 +170,13 @@ def delete_vocab_callback():
 
 # when 1 row is selected, show edit and delete buttons
 if selected_row is not None:
+    # Bảng chỉ chứa các cột hiển thị: lấy ví dụ và từ đồng nghĩa của từ được chọn
+    selected_vocab = get_vocab(selected_row["vocab_id"].values[0]) or {}
     # Hiển thị thông tin chi tiết từ
     st.markdown(f"### Từ vựng: **{selected_row['en'].values[0]}**")
     st.markdown(f"- **Định nghĩa:** {selected_row['vi'].values[0]}")
     st.markdown(f"- **Loại từ:** {selected_row['class'].values[0]}")
-    examples = selected_row["examples"].values[0]
+    examples = selected_vocab.get("examples")
     if examples:
         st.markdown(f"- **Ví dụ:**")
         blank_col, example_col = st.columns([1, 9])
@@ -94,7 +186,7 @@ if selected_row is not None:
                     st.write(f"Tạm dịch: {translate_text(example)}")
     else: 
         st.markdown("- **Ví dụ:** Không có ví dụ nào được cung cấp.")
-    st.markdown(f"- **Từ đồng nghĩa:** {selected_row['synonyms'].values[0]}")
+    st.markdown(f"- **Từ đồng nghĩa:** {selected_vocab.get('synonyms')}")
 
 left_blank_col, col1, col2, right_blank_col = st.columns([1, 2, 2, 1])
 with col1:
@@ -4,7 +4,8 @@ import time
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 from services.flashcard import *
 from services.vocab import get_user_vocabulary
-from components.flashcard_ui import do_flashcard
+from components.flashcard_ui import do_flashcard, do_review
+from services.srs import count_due_cards
 from utils.session import is_logged_in
 from streamlit_modal import Modal
 from components.feedback import confirm_modal, toast
@@ -15,6 +16,8 @@ if "show_create_form" not in st.session_state:
     st.session_state.show_create_form = False
 if "doing_flashcard" not in st.session_state:
     st.session_state.doing_flashcard = False
+if "doing_review" not in st.session_state:
+    st.session_state.doing_review = False
 if "current_test_id" not in st.session_state:
     st.session_state.current_test_id = None
 if "delete_flashcard" not in st.session_state:
@@ -28,6 +31,12 @@ if st.session_state.doing_flashcard and st.session_state.current_test_id:
     st.sidebar.title(f"Xin chào {st.session_state.username}!")
     st.stop()
 
+# Check if we're reviewing due cards
+if st.session_state.doing_review and is_logged_in():
+    do_review()
+    st.sidebar.title(f"Xin chào {st.session_state.username}!")
+    st.stop()
+
 # page title
 st.title("FLASHCARD CỦA TÔI")
 
@@ -72,7 +81,7 @@ def delete_flashcard_callback():
         st.session_state.grid_key = str(uuid.uuid4())
     return result, message
 
-left_blank_col, create_col, doing_col, remove_col, right_blank_col = st.columns([0.3,1,1,1,0.3])
+left_blank_col, create_col, doing_col, remove_col, review_col, right_blank_col = st.columns([0.3,1,1,1,1,0.3])
 
 with create_col:
     if st.button("Tạo flashcard mới",use_container_width=True, icon="➕"):
@@ -90,6 +99,13 @@ with remove_col:
         st.session_state.delete_flashcard = True
         delete_flashcard_modal.open()
 
+with review_col:
+    due_count = count_due_cards(st.session_state["user_id"], cap=101)
+    due_label = f"Ôn tập ({'100+' if due_count > 100 else due_count} từ)"
+    if st.button(due_label, disabled=(due_count == 0), use_container_width=True, icon="🧠"):
+        st.session_state.doing_review = True
+        st.rerun()
+
 if delete_flashcard_modal.is_open() and st.session_state.delete_flashcard:
     st.session_state.delete_flashcard = False
     flashcard_name = selected_row["name"].values[0]
@@ -138,8 +154,7 @@ if st.session_state.show_create_form:
             elif selected_rows.empty:
                 st.warning("Bạn cần chọn ít nhất một từ để tạo bộ đề.", icon="⚠️")
             else:
-                vocabs_json = selected_rows[["vocab_id", "en", "vi"]].to_json(orient="records")
-                result, message = create_flashcard(st.session_state.user_id, flashcard_name, vocabs_json)
+                result, message = create_flashcard(st.session_state.user_id, flashcard_name, selected_ids)
                 if result:
                     st.toast("Đã tạo bộ đề thành công!", icon="✅")
                     st.session_state.show_create_form = False
@@ -1,5 +1,7 @@
 import streamlit as st
-from services.translate import evaluate_translation, get_wordnet_info
+import time
+import pandas as pd
+from services.translate import evaluate_translation, evaluate_translations, get_wordnet_info
 from utils.session import is_logged_in
 
 # # Tải dữ liệu WordNet (chỉ chạy lần đầu)
@@ -9,9 +11,9 @@ from utils.session import is_logged_in
 # nltk.data.path.append('./nltk_data')
 
 # Khởi tạo biến session
-for key in ["percentage_correct", "model_translation", "show_result"]:
+for key in ["percentage_correct", "model_translation", "evaluation_details", "show_result", "force_bertscore"]:
     if key not in st.session_state:
-        st.session_state[key] = None if key != "show_result" else False
+        st.session_state[key] = False if key in ("show_result", "force_bertscore") else None
 
 # Tiêu đề trang
 st.title("Đánh giá khả năng dịch của bạn")
@@ -23,57 +25,132 @@ if not is_logged_in():
 
 st.sidebar.title(f"Xin chào {st.session_state.username}!")
 
-# Nhập văn bản
-english_text = st.text_area("Nhập văn bản tiếng Anh:", "hello world!")
-
-# # Kiểm tra xem văn bản có phải là từ đơn để thêm WordNet
-# if len(english_text.split()) == 1:  # Nếu là từ đơn
-#     wordnet_info = get_wordnet_info(english_text)
-#     if wordnet_info:
-#         with st.expander("Thông tin từ điển (WordNet)"):
-#             st.write(f"**Định nghĩa (English):** {wordnet_info['definition']}")
-#             st.write(f"**Ví dụ (English):** {wordnet_info['examples']}")
-#             st.write(f"**Từ đồng nghĩa (English):** {wordnet_info['synonyms']}")
-
-# Nếu chưa có kết quả, cho nhập bản dịch
-# if not st.session_state.show_result:
-user_input = st.text_area("Nhập bản dịch của bạn:")
-
-blank_col, eval_col = st.columns([3, 1])
-with eval_col:
-    if st.button("Đánh giá", use_container_width=True, icon="🔍", disabled=(not user_input.strip())):
-        st.session_state.show_result = True
-
-if st.session_state.show_result:
-    with st.spinner("Đang đánh giá bản dịch..."):  # Thêm spinner
-        percent, translation = evaluate_translation(english_text, user_input)
-        st.session_state.percentage_correct = percent
-        st.session_state.model_translation = translation
-        #st.session_state.show_result = False
-
-# Kết quả sau khi đánh giá
-if st.session_state.show_result:
-    st.session_state.show_result = False
-    percent = st.session_state.percentage_correct
-    if percent >= 80:
-        st.info(f"Bản dịch của bạn có độ chính xác cao với độ phù hợp {percent:.2f}%")
-    elif percent >= 50:
-        st.info(f"Bạn dịch của bạn có thể chấp nhận được với độ phù hợp {percent:.2f}%")
-    else:
-        st.info(f"Bản dịch của bạn chỉ chính xác {percent:.2f}%.")
-
-    # Nút thử lại
-    col_left, col_right = st.columns([3, 1])
-    with col_left:
-        st.write("Bạn có muốn thử lại không?")
-    with col_right:
-        if st.button("🔁 Thử lại"):
-            st.session_state.percentage_correct = None
-            st.session_state.model_translation = None
-            st.session_state.show_result = False
-            st.session_state.comparison = None
-            st.rerun()
-
-    # Hiển thị bản dịch hệ thống
-    with st.expander("👁 Xem bản dịch của hệ thống?"):
-        st.info(st.session_state.model_translation)
+def request_bertscore():
+    """Chấm lại bản dịch hiện tại bằng BERTScore ở lần chạy kế tiếp."""
+    st.session_state.force_bertscore = True
+    st.session_state.show_result = True
+
+def show_batch_results(pairs: list):
+    """Chấm nhiều bản dịch trong một lượt và hiển thị kết quả cùng thông lượng."""
+    with st.spinner(f"Đang đánh giá {len(pairs)} bản dịch..."):
+        start = time.perf_counter()
+        results = evaluate_translations(pairs)
+        elapsed = time.perf_counter() - start
+
+    result_df = pd.DataFrame({
+        "Văn bản tiếng Anh": [source for source, _ in pairs],
+        "Bản dịch": [candidate for _, candidate in pairs],
+        "Độ phù hợp (%)": [round(percent, 2) for percent, _, _ in results],
+        "Cách chấm": [details["tier"] for _, _, details in results],
+        "chrF": [details["chrf"] for _, _, details in results],
+        "BERTScore": [details["bertscore"] for _, _, details in results],
+        "Bản dịch của hệ thống": [translation for _, translation, _ in results],
+    })
+    st.success(f"Đã chấm {len(pairs)} bản dịch trong {elapsed:.2f} giây ({len(pairs) / max(elapsed, 1e-6):.1f} bản dịch/giây).")
+    st.metric("Độ phù hợp trung bình", f"{result_df['Độ phù hợp (%)'].mean():.2f}%")
+    st.dataframe(result_df, use_container_width=True)
+    st.download_button(
+        "Tải kết quả (CSV)", result_df.to_csv(index=False).encode("utf-8-sig"),
+        file_name="ket_qua_danh_gia.csv", mime="text/csv", icon="📥"
+    )
+
+single_tab, upload_tab, quiz_tab = st.tabs(["Đánh giá một câu", "Chấm theo lô", "Làm bài"])
+
+with single_tab:
+    # Nhập văn bản
+    english_text = st.text_area("Nhập văn bản tiếng Anh:", "hello world!")
+
+    # # Kiểm tra xem văn bản có phải là từ đơn để thêm WordNet
+    # if len(english_text.split()) == 1:  # Nếu là từ đơn
+    #     wordnet_info = get_wordnet_info(english_text)
+    #     if wordnet_info:
+    #         with st.expander("Thông tin từ điển (WordNet)"):
+    #             st.write(f"**Định nghĩa (English):** {wordnet_info['definition']}")
+    #             st.write(f"**Ví dụ (English):** {wordnet_info['examples']}")
+    #             st.write(f"**Từ đồng nghĩa (English):** {wordnet_info['synonyms']}")
+
+    # Nếu chưa có kết quả, cho nhập bản dịch
+    # if not st.session_state.show_result:
+    user_input = st.text_area("Nhập bản dịch của bạn:")
+
+    blank_col, eval_col = st.columns([3, 1])
+    with eval_col:
+        if st.button("Đánh giá", use_container_width=True, icon="🔍", disabled=(not user_input.strip())):
+            st.session_state.show_result = True
+
+    if st.session_state.show_result:
+        with st.spinner("Đang đánh giá bản dịch..."):  # Thêm spinner
+            percent, translation, details = evaluate_translation(english_text, user_input, force_bertscore=st.session_state.force_bertscore)
+            st.session_state.percentage_correct = percent
+            st.session_state.model_translation = translation
+            st.session_state.evaluation_details = details
+            st.session_state.force_bertscore = False
+            #st.session_state.show_result = False
+
+    # Kết quả sau khi đánh giá
+    if st.session_state.show_result:
+        st.session_state.show_result = False
+        percent = st.session_state.percentage_correct
+        if percent >= 80:
+            st.info(f"Bản dịch của bạn có độ chính xác cao với độ phù hợp {percent:.2f}%")
+        elif percent >= 50:
+            st.info(f"Bạn dịch của bạn có thể chấp nhận được với độ phù hợp {percent:.2f}%")
+        else:
+            st.info(f"Bản dịch của bạn chỉ chính xác {percent:.2f}%.")
+
+        details = st.session_state.evaluation_details
+        if details and details["tier"] == "chrf":
+            st.caption(f"Đánh giá nhanh bằng chrF ({details['chrf']:.2f}%).")
+            # Dùng callback: show_result đã được xóa ở trên, nên nút sẽ không được vẽ lại
+            # ở lần chạy tiếp theo và giá trị trả về của st.button sẽ bị mất
+            st.button("Đánh giá chi tiết bằng BERTScore", icon="🔬", on_click=request_bertscore)
+        elif details:
+            st.caption(f"BERTScore: {details['bertscore']:.2f}% · chrF: {details['chrf']:.2f}%")
+
+        # Nút thử lại
+        col_left, col_right = st.columns([3, 1])
+        with col_left:
+            st.write("Bạn có muốn thử lại không?")
+        with col_right:
+            if st.button("🔁 Thử lại"):
+                st.session_state.percentage_correct = None
+                st.session_state.model_translation = None
+                st.session_state.evaluation_details = None
+                st.session_state.show_result = False
+                st.session_state.comparison = None
+                st.rerun()
+
+        # Hiển thị bản dịch hệ thống
+        with st.expander("👁 Xem bản dịch của hệ thống?"):
+            st.info(st.session_state.model_translation)
+
+# Chấm theo lô: tải lên file CSV gồm câu tiếng Anh và bản dịch (ví dụ bài làm của cả lớp)
+with upload_tab:
+    st.write("Tải lên file CSV có 2 cột: câu tiếng Anh (`english`) và bản dịch (`translation`).")
+    uploaded = st.file_uploader("Chọn file CSV", type=["csv"], key="evaluation_upload")
+    if uploaded is not None:
+        upload_df = pd.read_csv(uploaded, dtype=str).fillna("")
+        if {"english", "translation"}.issubset(upload_df.columns):
+            upload_df = upload_df[["english", "translation"]]
+        if len(upload_df.columns) < 2:
+            st.error("File cần có ít nhất 2 cột: câu tiếng Anh và bản dịch.")
+        else:
+            st.write(f"Đã đọc {len(upload_df)} dòng.")
+            if st.button("Chấm tất cả", use_container_width=True, icon="🔍", key="evaluate_upload"):
+                show_batch_results(list(upload_df.iloc[:, :2].itertuples(index=False, name=None)))
+
+# Làm bài: dịch một danh sách câu rồi chấm tất cả trong một lượt
+with quiz_tab:
+    quiz_sources = st.text_area("Danh sách câu tiếng Anh (mỗi dòng một câu):", key="quiz_sources")
+    sources = [line.strip() for line in quiz_sources.splitlines() if line.strip()]
+    if sources:
+        quiz_df = st.data_editor(
+            pd.DataFrame({"english": sources, "translation": [""] * len(sources)}),
+            column_config={
+                "english": st.column_config.TextColumn("Câu tiếng Anh", disabled=True),
+                "translation": st.column_config.TextColumn("Bản dịch của bạn"),
+            },
+            hide_index=True, use_container_width=True, key="quiz_editor"
+        )
+        if st.button("Nộp bài", use_container_width=True, icon="📝", key="submit_quiz"):
+            show_batch_results(list(quiz_df[["english", "translation"]].itertuples(index=False, name=None)))
@@ -1,33 +1,45 @@
 import uuid
 from psycopg2 import Error
 from utils.password import hash_password, verify_password
-from databases.connection import get_connection
+from databases.connection import db_connection
 
-def add_user_to_db(conn, username: str, hashed_password: str, email: str) -> bool:
+# Các câu SQL ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+ADD_USER_SQL = """
+    WITH taken AS (
+        SELECT bool_or(username = %(username)s) AS username_taken,
+               bool_or(email = %(email)s) AS email_taken
+        FROM users
+        WHERE username = %(username)s OR email = %(email)s
+    ), inserted AS (
+        INSERT INTO users (user_id, username, password, email)
+        VALUES (%(user_id)s, %(username)s, %(password)s, %(email)s)
+        ON CONFLICT DO NOTHING
+        RETURNING user_id
+    )
+    SELECT (SELECT user_id FROM inserted) AS user_id,
+           COALESCE(taken.username_taken, FALSE) AS username_taken,
+           COALESCE(taken.email_taken, FALSE) AS email_taken
+    FROM taken
+"""
+LOGIN_USER_SQL = "SELECT user_id, password FROM users WHERE username = %s"
+
+def add_user_to_db(conn, username: str, hashed_password: str, email: str) -> dict:
     """
-    Adds a new user to the database.
+    Inserts a new user in a single statement. The unique indexes on username and email reject
+    duplicates (ON CONFLICT DO NOTHING); the same statement reports which of them was taken.
     
     Args:
-        conn (sqlite3.Connection): The connection object to the database.
+        conn (psycopg2.extensions.connection): The connection object to the database.
         username (str): The username of the new user.
         hashed_password (str): The hashed password of the new user.
         email (str): The email of the new user.
     
     Returns:
-        bool: True if the user was added successfully, False otherwise.
+        dict: user_id (None if nothing was inserted), username_taken and email_taken.
     """
-    user_id = str(uuid.uuid4())
-    
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO users (user_id, username, password, email)
-                VALUES (%s, %s, %s, %s)
-            """, (user_id, username, hashed_password, email))
-        return True
-    except Exception as e:
-        print(f"[ERROR] Failed to add user: {e}")
-        return False
+    with conn.cursor() as cur:
+        cur.execute(ADD_USER_SQL, {"user_id": str(uuid.uuid4()), "username": username, "password": hashed_password, "email": email})
+        return cur.fetchone()
 
 def register_user(username: str, password: str, email: str) -> str:
     """
@@ -42,38 +54,30 @@ def register_user(username: str, password: str, email: str) -> str:
         bool: True if registration is successful, False otherwise.
     """
 
-    conn = get_connection()
     message = ""
     result = False
 
     try:
-        with conn.cursor() as cur:
-            # Kiểm tra username
-            cur.execute("SELECT 1 FROM users WHERE username = %s", (username,))
-            if cur.fetchone():
-                message = "Tên người dùng đã tồn tại! Vui lòng chọn tên khác."
-                return False, message
+        # Hash password rồi thêm vào DB trong một lần truy vấn
+        hashed_password = hash_password(password)
+        with db_connection() as conn:
+            row = add_user_to_db(conn, username, hashed_password, email)
+            conn.commit()
 
-            # Kiểm tra email
-            cur.execute("SELECT 1 FROM users WHERE email = %s", (email,))
-            if cur.fetchone():
-                message = "Email đã được sử dụng! Vui lòng sử dụng email khác."
-                return False, message
-
-            # Hash password và thêm vào DB
-            hashed_password = hash_password(password)
-            if add_user_to_db(conn, username, hashed_password, email):
-                conn.commit()
-                result = True
-                message = "success"
-            else:
-                message = "Không thể thêm người dùng vào cơ sở dữ liệu."
+        if row["user_id"] is not None:
+            result = True
+            message = "success"
+        elif row["username_taken"]:
+            message = "Tên người dùng đã tồn tại! Vui lòng chọn tên khác."
+        elif row["email_taken"]:
+            message = "Email đã được sử dụng! Vui lòng sử dụng email khác."
+        else:
+            # Một phiên khác vừa đăng ký cùng username/email sau khi câu lệnh bắt đầu
+            message = "Tên người dùng hoặc email vừa được đăng ký! Vui lòng chọn tên khác."
 
     except Error as e:
         message = f"Lỗi khi đăng ký người dùng: {e}"
         print(f"[ERROR] {message}")
-    finally:
-        conn.close()
 
     return result, message
 
@@ -90,13 +94,11 @@ def login_user(username: str, password: str):
             - success (bool): True if login successful, else False.
             - result (str | None): user_id if success, else error message.
     """
-    conn = get_connection()
-    c = conn.cursor()
-
-    # Kiểm tra tồn tại username
-    c.execute("SELECT user_id, password FROM users WHERE username = %s", (username,))
-    row = c.fetchone()
-    conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        # Kiểm tra tồn tại username
+        c.execute(LOGIN_USER_SQL, (username,))
+        row = c.fetchone()
     result = False
     message = ""
 
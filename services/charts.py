@@ -1,7 +1,5 @@
 import plotly.graph_objects as go
 import plotly.express as px
-from services.vocab import get_vocab_status_count, get_vocab_count_last_7_days
-from services.flashcard import get_flashcard_status_count
 
 def plot_empty_donut(labels: list, colors: list, title="Chưa có dữ liệu"):
     # đếm số phần từ từ labels và tạo một danh sách values với các giá trị rất nhỏ
@@ -37,7 +35,7 @@ def plot_empty_donut(labels: list, colors: list, title="Chưa có dữ liệu"):
     )
     return fig
 
-def plot_vocab_added_last_7_days(user_id: str):
+def plot_vocab_added_last_7_days(df):
     """
     Vẽ biểu đồ cột thể hiện số lượng từ vựng được thêm trong 7 ngày gần đây.
     
@@ -47,8 +45,6 @@ def plot_vocab_added_last_7_days(user_id: str):
     Returns:
         plotly.graph_objects.Figure: Biểu đồ cột.
     """
-    df = get_vocab_count_last_7_days(user_id=user_id)
-
     fig = go.Figure(data=[
         go.Bar(
             x=df["date"].apply(lambda x: x.strftime("%d/%m")),  # định dạng ngày tháng
@@ -80,11 +76,10 @@ def plot_vocab_added_last_7_days(user_id: str):
         )
     return fig
 
-def plot_vocab_status_distribution(user_id: str):
+def plot_vocab_status_distribution(df):
     """
-    Vẽ pie chart số lượng từ theo status từ DataFrame.
+    Vẽ pie chart số lượng từ theo status từ DataFrame (cột 'status', 'count').
     """
-    df = get_vocab_status_count(user_id=user_id)
     if df.empty:
         return plot_empty_donut(labels=["Đang học", "Đã nhớ"], colors=["#f39c12", "#2ecc71"], title="Tỉ lệ từ vựng theo trạng thái")
 
@@ -106,12 +101,10 @@ def plot_vocab_status_distribution(user_id: str):
     )
     return fig
 
-def plot_flashcard_status_distribution(user_id: str):
+def plot_flashcard_status_distribution(df):
     """
-    Vẽ pie chart số lượng flashcard theo status từ DataFrame.
+    Vẽ pie chart số lượng flashcard theo status từ DataFrame (cột 'status', 'count').
     """
-
-    df = get_flashcard_status_count(user_id=user_id)
     if df.empty:
         return plot_empty_donut(labels=["Chưa làm", "Đã làm"], colors=["#e74c3c", "#8e44ad"], title="Tỉ lệ flashcard theo trạng thái")
     
@@ -1,10 +1,79 @@
-import json
 import pandas as pd
 from datetime import datetime
 import uuid
 import random
 import psycopg2
-from databases.connection import get_connection
+from databases.connection import db_connection
+from services.user_stats import bump_status, move_status
+
+# Các câu SQL ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+USER_FLASHCARDS_SQL = """
+    SELECT test_id, name, status, score, date_updated
+    FROM flashcards
+    WHERE user_id = %s
+    ORDER BY date_updated DESC
+"""
+# the unique index on (user_id, name) rejects duplicates
+CREATE_FLASHCARD_SQL = """
+    INSERT INTO flashcards (test_id, user_id, name, status, score, date_updated)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT DO NOTHING
+    RETURNING test_id
+"""
+# all cards in one statement; ids that are not the user's vocabulary are ignored
+CREATE_FLASHCARD_ITEMS_SQL = """
+    INSERT INTO flashcard_items (test_id, vocab_id, position)
+    SELECT %s, v.vocab_id, d.ordinality - 1
+    FROM unnest(%s::text[]) WITH ORDINALITY AS d(vocab_id, ordinality)
+    JOIN vocabulary v ON v.vocab_id = d.vocab_id AND v.user_id = %s
+    ON CONFLICT DO NOTHING
+"""
+DELETE_FLASHCARD_SQL = "DELETE FROM flashcards WHERE test_id = %s RETURNING user_id, status"
+FLASHCARD_TEST_SQL = """
+    SELECT f.name, card.vocab_id, card.en, card.vi
+    FROM flashcards f
+    LEFT JOIN (
+        SELECT i.test_id, i.position, v.vocab_id, v.en, v.vi
+        FROM flashcard_items i JOIN vocabulary v ON v.vocab_id = i.vocab_id
+    ) card ON card.test_id = f.test_id
+    WHERE f.test_id = %s
+    ORDER BY card.position
+"""
+# old.status là trạng thái trước khi cập nhật, dùng để chuyển bộ đếm
+UPDATE_FLASHCARD_SCORE_SQL = """
+    UPDATE flashcards f
+    SET score = %s, status = %s, date_updated = %s
+    FROM (SELECT test_id, status FROM flashcards WHERE test_id = %s FOR UPDATE) old
+    WHERE f.test_id = old.test_id
+    RETURNING f.user_id, old.status AS old_status
+"""
+INSERT_FLASHCARD_HISTORY_SQL = """
+    INSERT INTO flashcard_history (history_id, user_id, flashcard_name, score, time_updated)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+UPDATE_FLASHCARD_ITEMS_SQL = """
+    UPDATE flashcard_items i
+    SET last_result = r.remembered,
+        times_seen = i.times_seen + 1,
+        times_missed = i.times_missed + (NOT r.remembered)::int,
+        last_reviewed = %s
+    FROM unnest(%s::text[], %s::boolean[]) AS r(vocab_id, remembered)
+    WHERE i.test_id = %s AND i.vocab_id = r.vocab_id
+"""
+FLASHCARD_CARDS_SQL = """
+    SELECT i.position, v.vocab_id, v.en, v.vi, i.last_result, i.times_seen, i.times_missed
+    FROM flashcard_items i JOIN vocabulary v ON v.vocab_id = i.vocab_id
+    WHERE i.test_id = %s AND i.position > %s
+    ORDER BY i.position
+    LIMIT %s
+"""
+WEAKEST_CARDS_SQL = """
+    SELECT i.position, v.vocab_id, v.en, v.vi, i.last_result, i.times_seen, i.times_missed
+    FROM flashcard_items i JOIN vocabulary v ON v.vocab_id = i.vocab_id
+    WHERE i.test_id = %s AND i.times_missed > 0
+    ORDER BY i.times_missed DESC, i.position
+    LIMIT %s
+"""
 
 def get_user_flashcards(user_id: int) -> pd.DataFrame:
     """
@@ -16,20 +85,13 @@ def get_user_flashcards(user_id: int) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame chứa thông tin flashcards.
     """
-    conn = None
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        query = """
-            SELECT test_id, name, status, score, date_updated
-            FROM flashcards
-            WHERE user_id = %s
-            ORDER BY date_updated DESC
-        """
-        cur.execute(query, (user_id,))
-        rows = cur.fetchall()
-        colnames = [desc[0] for desc in cur.description]
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            cur.execute(USER_FLASHCARDS_SQL, (user_id,))
+            rows = cur.fetchall()
+            colnames = [desc[0] for desc in cur.description]
 
         df = pd.DataFrame(rows, columns=colnames)
         return df
@@ -37,18 +99,15 @@ def get_user_flashcards(user_id: int) -> pd.DataFrame:
     except Exception as e:
         print(f"[get_user_flashcards] Lỗi: {e}")
         return pd.DataFrame()
-    finally:
-        if conn:
-            conn.close()
     
 
-def create_flashcard(user_id: int, test_name: str, vocabs_json: str):
+def create_flashcard(user_id: int, test_name: str, vocab_ids: list):
     """
     Creates a new test with the given parameters.
     Args:
         user_id (int): The ID of the user creating the test.
         test_name (str): The name of the test.
-        vocab_json (str): A JSON string containing the list of vocabulary words for the test.
+        vocab_ids (list): The IDs of the user's vocabulary in the test, in deck order.
     """
 
     # init test_id, date_updated, status, score
@@ -57,31 +116,23 @@ def create_flashcard(user_id: int, test_name: str, vocabs_json: str):
     status = 'Chưa làm'
     score = 0.0
 
-    # connect to the database and insert the new test
-    conn = get_connection()
-    c = conn.cursor()
-
-    # check if the test name already exists for the user
-    c.execute("SELECT * FROM flashcards WHERE user_id = %s AND name = %s", (user_id, test_name))
-    existing_flashcard = c.fetchone()
+    # insert the new test in one round trip
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute(CREATE_FLASHCARD_SQL, (test_id, user_id, test_name, status, score, date_updated))
+            inserted = c.fetchone()
+            if inserted is not None:
+                c.execute(CREATE_FLASHCARD_ITEMS_SQL, (test_id, list(vocab_ids), user_id))
+                bump_status(c, user_id, "flashcard", status)
+        except psycopg2.IntegrityError as e:
+            print(f"[LOG] Error creating flashcard: {e}")
+            return False, str(e)
+        conn.commit()
 
-    if existing_flashcard:
-        conn.close()
+    if inserted is None:
         print(f"[LOG] Flashcard '{test_name}' already exists for user {user_id}.")
         return False, "Tên flashcard đã tồn tại. Vui lòng chọn tên khác."
-    
-    try:
-        c.execute("""
-            INSERT INTO flashcards (test_id, user_id, name, status, score, date_updated, vocabs)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (test_id, user_id, test_name, status, score, date_updated, vocabs_json))
-    except psycopg2.IntegrityError as e:
-        print(f"[LOG] Error creating flashcard: {e}")
-        conn.close()
-        return False, str(e)
-    
-    conn.commit()
-    conn.close()    
     return True, test_id
 
 def delete_flashcard(test_id: int):
@@ -91,17 +142,17 @@ def delete_flashcard(test_id: int):
     Args:
         test_id (int): The ID of the test to be deleted.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    try: 
-        c.execute("DELETE FROM flashcards WHERE test_id = %s", (test_id,))
-    except psycopg2.Error as e:
-        print(f"[LOG] Error deleting flashcard: {e}")
-        conn.close()
-        return False, str(e)
-    
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try: 
+            c.execute(DELETE_FLASHCARD_SQL, (test_id,))
+            deleted = c.fetchone()
+            if deleted:
+                bump_status(c, deleted["user_id"], "flashcard", deleted["status"], -1)
+        except psycopg2.Error as e:
+            print(f"[LOG] Error deleting flashcard: {e}")
+            return False, str(e)
+        conn.commit()
     return True, "Đã xóa flashcard thành công!"
     
 def get_flashcard_test(test_id: str):
@@ -114,117 +165,92 @@ def get_flashcard_test(test_id: str):
     Returns:
         dict: Test details including words
     """
-    conn = get_connection()
-    c = conn.cursor()
     try:
-        c.execute("SELECT name, vocabs FROM flashcards WHERE test_id = %s", (test_id,))
-        result = c.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute(FLASHCARD_TEST_SQL, (test_id,))
+            rows = c.fetchall()
         
-        if result:
-            test_name, vocabs_json = result["name"], result["vocabs"]
+        if rows:
             return {
                 "test_id": test_id,
-                "name": test_name,
-                "words": json.loads(vocabs_json)
+                "name": rows[0]["name"],
+                "words": [
+                    {"vocab_id": row["vocab_id"], "en": row["en"], "vi": row["vi"]}
+                    for row in rows if row["vocab_id"] is not None
+                ]
             }
         return None
     except Exception as e:
         print(f"[LOG] Error getting flashcard test: {e}")
-        conn.close()
         return None
 
-def update_flashcard_score(test_id: str, score: float, user_id: str, flashcard_name: str):
+def update_flashcard_score(test_id: str, score: float, user_id: str, flashcard_name: str, outcomes: list = None):
     """
     Update the score for a flashcard test
     
     Args:
         test_id (str): The ID of the test
         score (float): The new score (percentage correct)
+        outcomes (list): Per-card results of the session, dicts with vocab_id and remembered;
+            written to flashcard_items in one statement
         
     Returns:
         bool: True if successful, False otherwise
     """
-    conn = get_connection()
-    c = conn.cursor()
     date_updated = datetime.now()
     status = 'Đã làm'
     history_id = str(uuid.uuid4())
     
     try:
-        c.execute("""
-            UPDATE flashcards 
-            SET score = %s, status = %s, date_updated = %s
-            WHERE test_id = %s
-        """, (score, status, date_updated, test_id))
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute(UPDATE_FLASHCARD_SCORE_SQL, (score, status, date_updated, test_id))
+            updated = c.fetchone()
+            if updated:
+                move_status(c, updated["user_id"], "flashcard", updated["old_status"], status)
 
-        c.execute("""
-            INSERT INTO flashcard_history (history_id, user_id, flashcard_name, score, time_updated)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (history_id, user_id, flashcard_name, score, date_updated))
+            c.execute(INSERT_FLASHCARD_HISTORY_SQL, (history_id, user_id, flashcard_name, score, date_updated))
 
-        conn.commit()
-        conn.close()
+            if outcomes:
+                c.execute(UPDATE_FLASHCARD_ITEMS_SQL, (date_updated, [outcome["vocab_id"] for outcome in outcomes],
+                      [bool(outcome["remembered"]) for outcome in outcomes], test_id))
+
+            conn.commit()
         return True
     except Exception as e:
         print(f"[LOG] Error updating flashcard score: {e}")
-        conn.close()
         return False
-    
-# lấy số lượng flashcard đã học/đang học và trả về dataframe
-def get_flashcard_status_count(user_id: str) -> pd.DataFrame:
+
+def get_flashcard_cards(test_id: str, after_position: int = -1, limit: int = 50) -> list:
     """
-    Trả về DataFrame gồm 2 cột: status, count – số lượng flashcard theo trạng thái.
+    Get one page of the cards of a test, in deck order (keyset on position)
 
     Args:
-        user_id (str): ID người dùng.
+        test_id (str): The ID of the test
+        after_position (int): Position of the last card of the previous page, -1 for the first page
+        limit (int): Number of cards
 
     Returns:
-        pd.DataFrame: Cột 'status' là str, 'count' là int.
+        list: Dicts with position, vocab_id, en, vi, last_result, times_seen and times_missed
     """
-    conn = get_connection()
-    c = conn.cursor()
-
-    # Query: lấy số lượng flashcard theo trạng thái
-    c.execute("""
-        SELECT status, COUNT(*) AS count 
-        FROM flashcards 
-        WHERE user_id = %s 
-        GROUP BY status
-    """, (user_id,))
-
-    rows = c.fetchall()
-    conn.close()
-
-    # Chuyển thành DataFrame
-    df = pd.DataFrame(rows, columns=["status", "count"])
-    return df
-
-# lấy lịch sử điểm số flashcard của người dùng
-def get_flashcard_hisrory(user_id: str) -> pd.DataFrame:
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(FLASHCARD_CARDS_SQL, (test_id, after_position, limit))
+        return c.fetchall()
+
+def get_weakest_cards(test_id: str, limit: int = 20) -> list:
     """
-    Trả về DataFrame gồm 3 cột: date_taken, score, flashcard_name – lịch sử điểm số flashcard.
+    Get the cards of a test that were missed most often
 
     Args:
-        user_id (str): ID người dùng.
+        test_id (str): The ID of the test
+        limit (int): Number of cards
 
     Returns:
-        pd.DataFrame: Cột 'date_taken' là datetime, 'score' là int, 'flashcard_name' là str.
+        list: Dicts with position, vocab_id, en, vi, last_result, times_seen and times_missed
     """
-    conn = get_connection()
-    c = conn.cursor()
-
-    # Query: lấy lịch sử điểm số flashcard
-    c.execute("""
-        SELECT flashcard_name, score, time_updated
-        FROM flashcard_history 
-        WHERE user_id = %s 
-        ORDER BY time_updated DESC
-    """, (user_id,))
-
-    rows = c.fetchall()
-    conn.close()
-
-    # Chuyển thành DataFrame
-    df = pd.DataFrame(rows, columns=["flashcard_name", "score", "time_updated"])
-    return df
\ No newline at end of file
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(WEAKEST_CARDS_SQL, (test_id, limit))
+        return c.fetchall()
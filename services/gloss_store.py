@@ -0,0 +1,243 @@
+"""
+Kho bản dịch định nghĩa WordNet được tính trước (offline).
+
+File kho có thể memory-map, gồm:
+    header | metadata JSON | khóa (uint64, đã sắp xếp) | offset giá trị (uint32) | bản dịch UTF-8
+Khóa của mỗi synset là offset * 8 + mã loại từ, tra cứu bằng tìm kiếm nhị phân trực tiếp trên mmap.
+Tên file chứa commit của mô hình (revision đã phân giải), chế độ suy luận và phiên bản WordNet
+nên mỗi phiên bản có kho riêng.
+
+Xây dựng kho (có thể dừng và chạy lại, các shard đã xong sẽ được bỏ qua):
+    python -m services.gloss_store --workers 4
+"""
+import os
+import mmap
+import json
+import time
+import struct
+import bisect
+import argparse
+import multiprocessing
+import streamlit as st
+from utils.config import get_setting
+
+MAGIC = b"ENVGLOSS"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")  # magic, phiên bản định dạng, độ dài metadata
+POS_CODES = {"n": 1, "v": 2, "a": 3, "s": 4, "r": 5}
+SHARD_SIZE = 2000
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "glosses")
+
+def synset_key(pos: str, offset: int) -> int:
+    """
+    Returns the integer store key of a synset.
+    """
+    return offset * 8 + POS_CODES[pos]
+
+def store_filename(model_revision: str, precision: str, wordnet_version: str) -> str:
+    safe_revision = model_revision.replace("/", "_")
+    return f"glosses-{safe_revision}-{precision}-wn{wordnet_version}.bin"
+
+class GlossStore:
+    """
+    Read-only, memory-mapped key -> Vietnamese gloss store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a gloss store (version {FORMAT_VERSION})")
+        position = _HEADER.size
+        self.metadata = json.loads(self._mmap[position:position + meta_length].decode("utf-8"))
+        position += meta_length
+
+        count = self.metadata["count"]
+        view = memoryview(self._mmap)
+        self._keys = view[position:position + 8 * count].cast("Q")
+        position += 8 * count
+        self._offsets = view[position:position + 4 * (count + 1)].cast("I")
+        position += 4 * (count + 1)
+        self._values_start = position
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, key: int):
+        """
+        Returns the gloss stored for key, or None.
+        """
+        idx = bisect.bisect_left(self._keys, key)
+        if idx == len(self._keys) or self._keys[idx] != key:
+            return None
+        start = self._values_start + self._offsets[idx]
+        end = self._values_start + self._offsets[idx + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    def get_many(self, keys: list) -> list:
+        """
+        Returns the gloss of each key (None when missing), in the same order.
+        """
+        return [self.get(key) for key in keys]
+
+def write_store(path: str, glosses: dict, metadata: dict):
+    """
+    Writes a gloss store atomically.
+    Args:
+        path (str): The destination file.
+        glosses (dict): A mapping key (int) -> gloss (str).
+        metadata (dict): Version information stored in the header.
+    """
+    keys = sorted(glosses)
+    values = [glosses[key].encode("utf-8") for key in keys]
+    offsets = [0]
+    for value in values:
+        offsets.append(offsets[-1] + len(value))
+    meta = json.dumps(dict(metadata, count=len(keys)), ensure_ascii=False).encode("utf-8")
+    meta += b" " * (-(_HEADER.size + len(meta)) % 8)  # Căn lề 8 byte cho mảng khóa
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta)))
+        f.write(meta)
+        f.write(struct.pack(f"<{len(keys)}Q", *keys))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for value in values:
+            f.write(value)
+    os.replace(tmp_path, path)
+
+def current_versions() -> tuple:
+    """
+    Returns (model_revision, precision, wordnet_version) that the store must match. The revision is
+    the model commit hash the translation cache keys on (get_model_revision: resolved from the model
+    config or asked from the model server, never by loading the weights), so a moving branch such as
+    "main" never serves glosses of an older model.
+    """
+    from services.translate import TRANSLATION_PRECISION, get_model_revision, resolve_precision
+    from services.wordnet_snapshot import wordnet_version
+    return get_model_revision(), resolve_precision(TRANSLATION_PRECISION), wordnet_version()
+
+def _has_store_files(store_dir: str) -> bool:
+    try:
+        return any(name.startswith("glosses-") and name.endswith(".bin") for name in os.listdir(store_dir))
+    except OSError:
+        return False
+
+@st.cache_resource
+def get_gloss_store():
+    """
+    Opens the gloss store matching the current model commit, precision and WordNet version,
+    or returns None when it has not been built.
+    """
+    store_dir = get_setting("GLOSS_STORE_DIR", DEFAULT_STORE_DIR)
+    # Chưa dựng kho nào: không cần phân giải phiên bản mô hình
+    if not _has_store_files(store_dir):
+        return None
+    versions = current_versions()
+    path = os.path.join(store_dir, store_filename(*versions))
+    if not os.path.exists(path):
+        return None
+    try:
+        store = GlossStore(path)
+    except (OSError, ValueError) as e:
+        print(f"[LOG] Cannot open gloss store {path}: {e}")
+        return None
+    if store.metadata.get("model_revision") != versions[0]:
+        print(f"[LOG] Gloss store {path} was built for another model commit, ignoring it.")
+        return None
+    return store
+
+# ---------------------------- Build job ----------------------------
+
+def _init_worker(threads: int, model_commit: str):
+    import torch
+    import services.translate
+    torch.set_num_threads(threads)
+    # Mọi process con dịch bằng đúng commit đã ghi vào kho, kể cả khi nhánh được cập nhật giữa chừng
+    services.translate.MODEL_REVISION = model_commit
+
+def _translate_shard(job: tuple) -> int:
+    # Chạy trong process con: dịch một shard và ghi kết quả ra file (ghi nguyên tử)
+    shard_path, items = job
+    from services.translate import _generate_translations
+    translations = _generate_translations([definition for _, definition in items])
+    tmp_path = f"{shard_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump([[key, translation] for (key, _), translation in zip(items, translations)], f, ensure_ascii=False)
+    os.replace(tmp_path, shard_path)
+    return len(items)
+
+def build(store_dir: str, workers: int):
+    """
+    Translates every WordNet definition and writes the gloss store. Finished shards are kept in a
+    work directory, so an interrupted build resumes where it stopped.
+    """
+    from utils import nltk_config
+    from nltk.corpus import wordnet
+    from services.word_info import standardize_definition_for_translation
+
+    from services.translate import (
+        MODEL_PATH, MODEL_REVISION, TRANSLATION_PRECISION, resolve_model_commit, resolve_precision,
+    )
+    from services.wordnet_snapshot import wordnet_version
+
+    model_commit = resolve_model_commit()
+    if not model_commit:
+        raise RuntimeError(
+            f"Cannot resolve the commit of {MODEL_PATH}@{MODEL_REVISION}; "
+            "pin TRANSLATION_MODEL_REVISION to a commit hash to build the gloss store."
+        )
+    versions = (model_commit, resolve_precision(TRANSLATION_PRECISION), wordnet_version())
+    path = os.path.join(store_dir, store_filename(*versions))
+    work_dir = f"{path}.work"
+    os.makedirs(work_dir, exist_ok=True)
+
+    items = [
+        (synset_key(synset.pos(), synset.offset()), standardize_definition_for_translation(synset.definition()))
+        for synset in wordnet.all_synsets()
+    ]
+    items.sort()
+    jobs = []
+    for shard, start in enumerate(range(0, len(items), SHARD_SIZE)):
+        shard_path = os.path.join(work_dir, f"shard-{shard:05d}.json")
+        if not os.path.exists(shard_path):
+            jobs.append((shard_path, items[start:start + SHARD_SIZE]))
+    print(f"[LOG] {len(items)} synsets, {len(jobs)} shards left to translate with {workers} workers "
+          f"(model commit {model_commit}).")
+
+    started = time.perf_counter()
+    done = 0
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(threads, model_commit)) as pool:
+        for count in pool.imap_unordered(_translate_shard, jobs):
+            done += count
+            rate = done / (time.perf_counter() - started)
+            print(f"[LOG] {done} definitions translated ({rate:.1f}/s)")
+
+    glosses = {}
+    for name in sorted(os.listdir(work_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(work_dir, name), encoding="utf-8") as f:
+                glosses.update((key, translation) for key, translation in json.load(f))
+
+    model_revision, precision, wordnet_version = versions
+    write_store(path, glosses, {
+        "model_revision": model_revision,
+        "precision": precision,
+        "wordnet_version": wordnet_version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    print(f"[LOG] Wrote {len(glosses)} glosses to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed Vietnamese WordNet gloss store.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--out", default=get_setting("GLOSS_STORE_DIR", DEFAULT_STORE_DIR))
+    args = parser.parse_args()
+    try:
+        build(args.out, args.workers)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
@@ -0,0 +1,157 @@
+import bisect
+import numpy as np
+from collections import defaultdict
+
+# Truy vấn ngắn hơn hoặc bằng ngưỡng này chỉ chấp nhận khoảng cách sửa 1
+SHORT_QUERY = 4
+# Mỗi phép sửa làm mất tối đa 3 trigram (thay thế, xóa, chèn); hoán đổi hai ký tự liền kề làm mất tối đa 4
+TRIGRAMS_LOST_PER_EDIT = 4
+
+def _trigrams(word: str) -> set:
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _deletions(word: str) -> set:
+    """
+    The word itself and every string obtained by deleting one of its characters.
+    Two strings within edit distance 1 (a transposition included) always share one of these.
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance between a and b.
+    Only the diagonal band of width 2 * limit + 1 is computed, and limit + 1 is returned
+    as soon as the distance is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            # Hoán đổi hai ký tự liền kề (ví dụ: "teh" -> "the")
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = min(value, over)
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[-1]
+
+class LemmaIndex:
+    """
+    In-memory lemma index for lookup suggestions: a sorted list searched with bisect for
+    prefixes, and a trigram inverted index (numpy posting arrays) re-ranked by edit distance
+    for typos. Short words, whose typos may share no trigram at all ("teh" and "the"), also
+    go into a one-deletion index.
+    """
+
+    def __init__(self, lemmas):
+        self.words = sorted({lemma.replace("_", " ").lower() for lemma in lemmas})
+        postings = defaultdict(list)
+        deletions = defaultdict(list)
+        for idx, word in enumerate(self.words):
+            for trigram in _trigrams(word):
+                postings[trigram].append(idx)
+            if len(word) <= SHORT_QUERY + 1:
+                for variant in _deletions(word):
+                    deletions[variant].append(idx)
+        self._postings = {trigram: np.array(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        self._deletions = {variant: np.array(ids, dtype=np.int32) for variant, ids in deletions.items()}
+        self._lengths = np.array([len(word) for word in self.words], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        word = word.lower()
+        idx = bisect.bisect_left(self.words, word)
+        return idx < len(self.words) and self.words[idx] == word
+
+    def prefix(self, prefix: str, k: int = 5, scan: int = 200) -> list:
+        """
+        Returns up to k lemmas starting with prefix, shortest first.
+        Args:
+            prefix (str): The typed prefix.
+            k (int): The number of suggestions.
+            scan (int): How many alphabetical matches are considered before ranking.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.words, prefix)
+        matches = []
+        for word in self.words[start:start + scan]:
+            if not word.startswith(prefix):
+                break
+            matches.append(word)
+        return sorted(matches, key=lambda word: (len(word), word))[:k]
+
+    def fuzzy(self, query: str, k: int = 5, candidates: int = 20) -> list:
+        """
+        Returns up to k lemmas close to query. Short queries take their candidates from the
+        one-deletion index; longer ones from the lemmas sharing the most trigrams with them.
+        Candidates are re-ranked by edit distance.
+        Args:
+            query (str): The (possibly misspelled) word.
+            k (int): The number of suggestions.
+            candidates (int): How many trigram matches are re-ranked by edit distance.
+        """
+        query = query.lower()
+        if len(query) <= SHORT_QUERY:
+            limit = 1
+            found = [self._deletions[v] for v in _deletions(query) if v in self._deletions]
+            if not found:
+                return []
+            ids = np.unique(np.concatenate(found))
+            query_trigrams = _trigrams(query)
+            shared = np.array([len(query_trigrams & _trigrams(self.words[idx])) for idx in ids.tolist()])
+            score = shared * 4 - np.abs(self._lengths[ids] - len(query))
+        else:
+            limit = 2
+            query_trigrams = _trigrams(query)
+            trigrams = [self._postings[t] for t in query_trigrams if t in self._postings]
+            if not trigrams:
+                return []
+            ids, shared = np.unique(np.concatenate(trigrams), return_counts=True)
+            # Loại trước các từ chắc chắn vượt ngưỡng khoảng cách
+            keep = shared >= len(query_trigrams) - TRIGRAMS_LOST_PER_EDIT * limit
+            ids, shared = ids[keep], shared[keep]
+            # Ưu tiên từ có nhiều trigram chung và độ dài gần với từ cần tìm
+            score = shared * 4 - np.abs(self._lengths[ids] - len(query))
+            if len(ids) > candidates:
+                top = np.argpartition(-score, candidates)[:candidates]
+                ids, score = ids[top], score[top]
+
+        ranked = []
+        letters = sorted(query)
+        for idx, s in zip(ids.tolist(), score.tolist()):
+            word = self.words[idx]
+            distance = edit_distance(query, word, limit)
+            if distance <= limit:
+                # Cùng khoảng cách thì ưu tiên từ chỉ khác do gõ đảo ký tự
+                ranked.append((distance, sorted(word) != letters, -s, word))
+        ranked.sort()
+        return [word for *_, word in ranked[:k]]
+
+    def suggest(self, query: str, k: int = 5) -> list:
+        """
+        Returns up to k suggestions for query: prefix matches first, then fuzzy matches.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        suggestions = self.prefix(query, k)
+        if len(suggestions) < k:
+            for word in self.fuzzy(query, k):
+                if word not in suggestions:
+                    suggestions.append(word)
+        return suggestions[:k]
@@ -0,0 +1,62 @@
+import unicodedata
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+CHRF_MAX_ORDER = 6
+CHRF_BETA = 2.0
+
+# Hệ số của hàm băm đa thức cho n-gram ký tự (tính theo modulo 2^64)
+_HASH_BASE = 1_114_111
+_HASH_POWERS = np.array([pow(_HASH_BASE, i, 2 ** 64) for i in range(CHRF_MAX_ORDER)], dtype=np.uint64)
+
+def _prepare(text: str) -> np.ndarray:
+    # Chuẩn hóa NFC để dấu tiếng Việt dựng sẵn và tổ hợp được coi là như nhau,
+    # bỏ khoảng trắng và không phân biệt hoa thường
+    text = "".join(unicodedata.normalize("NFC", text).lower().split())
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+def _ngram_counts(codes: np.ndarray, n: int):
+    """
+    Counts the character n-grams of a code point array: every n-gram is hashed to one
+    uint64 in a single vectorized pass, then counted with np.unique.
+    """
+    if len(codes) < n:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    ids = (sliding_window_view(codes, n) * _HASH_POWERS[:n]).sum(axis=1, dtype=np.uint64)
+    return np.unique(ids, return_counts=True)
+
+def chrf_score(hypothesis: str, reference: str, max_order: int = CHRF_MAX_ORDER, beta: float = CHRF_BETA) -> float:
+    """
+    Character n-gram F-score (chrF) between a hypothesis and a reference.
+
+    Precision and recall are averaged over the n-gram orders 1..max_order that exist in
+    both texts, then combined with F-beta (recall weighted beta times as much as precision).
+
+    Args:
+        hypothesis (str): The candidate translation.
+        reference (str): The reference translation.
+        max_order (int): The largest character n-gram order.
+        beta (float): The recall weight.
+
+    Returns:
+        float: The chrF score, from 0 to 100.
+    """
+    hyp, ref = _prepare(hypothesis), _prepare(reference)
+    if len(hyp) == 0 or len(ref) == 0:
+        return 100.0 if len(hyp) == len(ref) else 0.0
+
+    precisions, recalls = [], []
+    for n in range(1, max_order + 1):
+        hyp_ids, hyp_counts = _ngram_counts(hyp, n)
+        ref_ids, ref_counts = _ngram_counts(ref, n)
+        if len(hyp_ids) == 0 or len(ref_ids) == 0:
+            break
+        _, hyp_idx, ref_idx = np.intersect1d(hyp_ids, ref_ids, assume_unique=True, return_indices=True)
+        overlap = np.minimum(hyp_counts[hyp_idx], ref_counts[ref_idx]).sum()
+        precisions.append(overlap / hyp_counts.sum())
+        recalls.append(overlap / ref_counts.sum())
+
+    precision, recall = np.mean(precisions), np.mean(recalls)
+    if precision + recall == 0:
+        return 0.0
+    return float(100 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall))
@@ -0,0 +1,205 @@
+"""
+Máy chủ mô hình dùng chung cho mọi process Streamlit trên cùng một máy.
+
+Khi MODEL_SERVER_ADDRESS được cấu hình, các hàm được đánh dấu @served (translate_batch,
+translate_long_text, evaluate_translation, ...) không tải mô hình trong process web mà
+chuyển lời gọi tới máy chủ qua Unix socket hoặc localhost. Máy chủ giữ một bản duy nhất
+của mỗi mô hình, nên bộ nhớ tăng theo số mô hình thay vì số worker.
+
+Chạy máy chủ từ thư mục gốc của project:
+    MODEL_SERVER_ADDRESS=/tmp/envichan-models.sock MODEL_SERVER_AUTHKEY=<khóa bí mật> python -m services.model_server
+
+Máy chủ unpickle mọi yêu cầu nhận được, nên chỉ lắng nghe trên Unix socket hoặc địa chỉ loopback
+và bắt buộc phải có MODEL_SERVER_AUTHKEY.
+"""
+import os
+import functools
+import ipaddress
+import threading
+import importlib
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from utils.config import get_setting
+
+# Các module chứa hàm @served, được import khi máy chủ khởi động
+SERVED_MODULES = ["services.translate"]
+
+_REGISTRY = {}
+_serving = False
+
+def _is_loopback(host: str) -> bool:
+    # multiprocessing.connection chỉ hỗ trợ TCP qua IPv4
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.IPv4Address(host).is_loopback
+    except ValueError:
+        return False
+
+def parse_address(address: str):
+    """
+    Parses MODEL_SERVER_ADDRESS: "host:port" for TCP on localhost, anything else is a Unix socket path.
+    Returns:
+        tuple: (address, family) for multiprocessing.connection.
+    Raises:
+        ValueError: If the TCP host is not a loopback address. Requests are unpickled by the
+            server, so it must never be reachable from another machine.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and not address.startswith("/"):
+        host = host or "127.0.0.1"
+        if not _is_loopback(host):
+            raise ValueError(f"MODEL_SERVER_ADDRESS must be a Unix socket or an IPv4 loopback address, got '{host}'")
+        return (host, int(port)), "AF_INET"
+    return address, "AF_UNIX"
+
+def _authkey() -> bytes:
+    """
+    Returns MODEL_SERVER_AUTHKEY.
+    Raises:
+        RuntimeError: If it is not set; there is deliberately no default key.
+    """
+    key = get_setting("MODEL_SERVER_AUTHKEY")
+    if not key:
+        raise RuntimeError("MODEL_SERVER_AUTHKEY must be set to use the model server.")
+    return str(key).encode("utf-8")
+
+class ModelServerClient:
+    """
+    Thin client for the model server. Each thread keeps its own connection, which is
+    re-opened once if the server was restarted.
+    """
+
+    def __init__(self, address: str, timeout: float = 300.0):
+        self.address, self.family = parse_address(address)
+        self.authkey = _authkey()
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self, fresh: bool = False):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            conn = Client(self.address, family=self.family, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def call(self, name: str, *args, **kwargs):
+        """
+        Runs a registered function on the server and returns its result.
+        Raises:
+            RuntimeError: If the function raised on the server.
+            TimeoutError: If the server did not answer within the timeout.
+        """
+        for attempt in range(2):
+            try:
+                conn = self._connection(fresh=attempt > 0)
+                conn.send((name, args, kwargs))
+                if not conn.poll(self.timeout):
+                    self._local.conn = None
+                    conn.close()
+                    raise TimeoutError(f"Model server did not answer '{name}' within {self.timeout}s")
+                status, payload = conn.recv()
+                break
+            except TimeoutError:
+                raise
+            except (EOFError, ConnectionError, OSError):
+                if attempt:
+                    raise
+        if status == "error":
+            raise RuntimeError(f"Model server failed on '{name}': {payload}")
+        return payload
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_model_client():
+    """
+    Returns the model server client, or None when no server is configured
+    (or when called inside the server itself).
+    """
+    global _client
+    if _serving:
+        return None
+    address = get_setting("MODEL_SERVER_ADDRESS")
+    if not address:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = ModelServerClient(address, timeout=float(get_setting("MODEL_SERVER_TIMEOUT", 300)))
+    return _client
+
+def served(func):
+    """
+    Decorator: runs the function on the model server when one is configured, locally otherwise.
+    Arguments and results must be picklable.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    _REGISTRY[name] = func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        client = get_model_client()
+        if client is None:
+            return func(*args, **kwargs)
+        return client.call(name, *args, **kwargs)
+    return wrapper
+
+def _handle(conn):
+    # Mỗi kết nối (một luồng của một worker web) được phục vụ bởi một luồng riêng;
+    # các yêu cầu dịch đồng thời được scheduler gom thành batch
+    with conn:
+        while True:
+            try:
+                name, args, kwargs = conn.recv()
+            except (EOFError, ConnectionError, OSError):
+                return
+            try:
+                conn.send(("ok", _REGISTRY[name](*args, **kwargs)))
+            except Exception as e:
+                print(f"[LOG] Model server error in {name}: {e}")
+                conn.send(("error", repr(e)))
+
+def serve(address: str):
+    """
+    Loads the served modules and answers requests until interrupted.
+    """
+    global _serving
+    # Kiểm tra cấu hình trước khi tải mô hình
+    address, family = parse_address(address)
+    authkey = _authkey()
+    _serving = True
+    for module in SERVED_MODULES:
+        importlib.import_module(module)
+
+    from services.translate import warm_up_translation_model
+    warm_up_translation_model()
+
+    if family == "AF_UNIX" and os.path.exists(address):
+        os.remove(address)  # Socket cũ từ lần chạy trước
+    with Listener(address, family=family, authkey=authkey) as listener:
+        if family == "AF_UNIX":
+            os.chmod(address, 0o600)  # Chỉ user chạy máy chủ mới kết nối được
+        print(f"[LOG] Model server listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                # Ví dụ: client sai authkey
+                print(f"[LOG] Model server rejected a connection: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+if __name__ == "__main__":
+    address = get_setting("MODEL_SERVER_ADDRESS")
+    if not address:
+        raise SystemExit("MODEL_SERVER_ADDRESS chưa được cấu hình.")
+    try:
+        # Dùng module services.model_server (không phải __main__) để các hàm @served
+        # và máy chủ chia sẻ cùng một registry
+        importlib.import_module("services.model_server").serve(address)
+    except (ValueError, RuntimeError) as e:
+        raise SystemExit(str(e))
+    except KeyboardInterrupt:
+        pass
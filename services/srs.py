@@ -0,0 +1,185 @@
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from databases.connection import db_connection
+
+DUE_CARDS_LIMIT = 50
+# Số câu trả lời được gom lại trước khi ghi lịch ôn xuống cơ sở dữ liệu
+REVIEW_FLUSH_EVERY = 20
+# Thẻ bị quên được hỏi lại trong cùng phiên sau khoảng thời gian này
+RELEARN_STEP = timedelta(minutes=1)
+
+MIN_EASE = 1.3
+# Mức đánh giá của người học theo thang SM-2 (0-5)
+QUALITY_AGAIN = 1
+QUALITY_HARD = 3
+QUALITY_GOOD = 4
+QUALITY_EASY = 5
+
+# Các câu SQL ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+DUE_CARDS_SQL = """
+    SELECT vocab_id, en, vi, srs_interval, srs_ease, srs_repetitions, due_at
+    FROM vocabulary
+    WHERE user_id = %s AND due_at <= %s
+    ORDER BY due_at
+    LIMIT %s
+"""
+COUNT_DUE_CARDS_SQL = """
+    SELECT COUNT(*) AS count FROM (
+        SELECT 1 FROM vocabulary WHERE user_id = %s AND due_at <= %s LIMIT %s
+    ) due
+"""
+SAVE_REVIEWS_SQL = """
+    UPDATE vocabulary v
+    SET srs_interval = r.interval, srs_ease = r.ease, srs_repetitions = r.repetitions, due_at = r.due_at
+    FROM unnest(%s::text[], %s::float8[], %s::float8[], %s::int[], %s::timestamp[])
+         AS r(vocab_id, interval, ease, repetitions, due_at)
+    WHERE v.vocab_id = r.vocab_id AND v.user_id = %s
+"""
+
+class Schedule(NamedTuple):
+    interval: float
+    ease: float
+    repetitions: int
+    due_at: datetime
+
+def schedule(interval: float, ease: float, repetitions: int, quality: int, now: datetime) -> Schedule:
+    """
+    Computes the next SM-2 schedule of a card after a review.
+
+    Args:
+        interval (float): The current interval in days.
+        ease (float): The current ease factor.
+        repetitions (int): The number of consecutive successful reviews.
+        quality (int): The answer quality, 0 (forgot) to 5 (perfect); below 3 is a lapse.
+        now (datetime): The time of the review.
+
+    Returns:
+        Schedule: The new interval, ease, repetitions and due time.
+    """
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        repetitions, interval = 0, 1.0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = interval * ease
+    return Schedule(interval, ease, repetitions, now + timedelta(days=interval))
+
+def get_due_cards(user_id: str, limit: int = DUE_CARDS_LIMIT, now: datetime = None) -> list:
+    """
+    Returns the user's cards that are due, most overdue first. The (user_id, due_at) index
+    serves the filter, the order and the limit, so the cost does not depend on the dictionary size.
+
+    Returns:
+        list: Dicts with vocab_id, en, vi, srs_interval, srs_ease, srs_repetitions and due_at.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(DUE_CARDS_SQL, (user_id, now or datetime.now(), limit))
+        return c.fetchall()
+
+def count_due_cards(user_id: str, now: datetime = None, cap: int = 1000) -> int:
+    """
+    Counts the user's due cards, up to cap (an index-only count that stops early).
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(COUNT_DUE_CARDS_SQL, (user_id, now or datetime.now(), cap))
+        return c.fetchone()["count"]
+
+def save_reviews(user_id: str, schedules: dict):
+    """
+    Writes new schedules in one statement.
+
+    Args:
+        user_id (str): The ID of the user; rows of other users are never touched.
+        schedules (dict): vocab_id -> Schedule.
+    """
+    if not schedules:
+        return
+    ids = list(schedules)
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(SAVE_REVIEWS_SQL, (
+            ids,
+            [schedules[i].interval for i in ids],
+            [schedules[i].ease for i in ids],
+            [schedules[i].repetitions for i in ids],
+            [schedules[i].due_at for i in ids],
+            user_id,
+        ))
+        conn.commit()
+
+class ReviewSession:
+    """
+    An active review session: due cards in a heap ordered by due time. Forgotten cards go back
+    into the heap RELEARN_STEP later, so they come again after the cards already waiting. Only the
+    first answer to a card is scheduled with SM-2 (one ease update per card per review); answers
+    while relearning are in-session practice and do not change the saved schedule. New schedules
+    are collected and written with save_reviews every REVIEW_FLUSH_EVERY answers and when the
+    session is flushed.
+    """
+
+    def __init__(self, user_id: str, cards: list, flush_every: int = REVIEW_FLUSH_EVERY):
+        self.user_id = user_id
+        self.flush_every = flush_every
+        self._seq = itertools.count()
+        self._heap = [(card["due_at"], next(self._seq), card) for card in cards]
+        heapq.heapify(self._heap)
+        self.pending = {}
+        # vocab_id -> lịch ôn của câu trả lời đầu tiên trong phiên
+        self.scheduled = {}
+        self.reviewed = 0
+        self.lapses = 0
+
+    @classmethod
+    def start(cls, user_id: str, limit: int = DUE_CARDS_LIMIT, now: datetime = None):
+        """
+        Starts a session with the user's due cards.
+        """
+        return cls(user_id, get_due_cards(user_id, limit=limit, now=now))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def current(self):
+        """
+        Returns the card to show next, or None when the session is finished.
+        """
+        return self._heap[0][2] if self._heap else None
+
+    def answer(self, quality: int, now: datetime = None) -> Schedule:
+        """
+        Grades the current card and moves on to the next one. The first answer to a card sets its
+        schedule; a card being relearned only comes back again while it is still forgotten.
+        Returns:
+            Schedule: The schedule saved for the card.
+        """
+        now = now or datetime.now()
+        _, _, card = heapq.heappop(self._heap)
+        new = self.scheduled.get(card["vocab_id"])
+        if new is None:
+            new = schedule(card["srs_interval"], card["srs_ease"], card["srs_repetitions"], quality, now)
+            self.scheduled[card["vocab_id"]] = new
+            self.pending[card["vocab_id"]] = new
+        self.reviewed += 1
+        if quality < 3:
+            self.lapses += 1
+            heapq.heappush(self._heap, (now + RELEARN_STEP, next(self._seq), card))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+        return new
+
+    def flush(self):
+        """
+        Writes the pending schedules in one batch.
+        """
+        if self.pending:
+            save_reviews(self.user_id, self.pending)
+            self.pending = {}
@@ -1,30 +1,236 @@
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM
+import re
 import torch
 import streamlit as st
-from bert_score import score
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from bert_score import BERTScorer
+from bert_score.utils import get_bert_embedding
+from collections import defaultdict
 import nltk
 from utils import nltk_config
 from nltk.corpus import wordnet
+from utils.config import get_setting
+from utils.lru_cache import LRUCache
+from services.translation_cache import get_translation_cache, normalize_text
+from services.translation_scheduler import TranslationScheduler
+from services.model_server import served, get_model_client
+from services.metrics import chrf_score
+
+MODEL_PATH = "alpaca3000/en-vi-translation-model"
+MODEL_REVISION = get_setting("TRANSLATION_MODEL_REVISION", "main")
+
+# Tham số giải mã, cũng là một phần của khóa cache dịch thuật
+MAX_INPUT_LENGTH = 64
+GENERATION_KWARGS = {"max_length": 64, "num_beams": 3, "early_stopping": True}  # Giảm beams
+
+# Chế độ suy luận trên CPU: "fp32" (mặc định), "int8" (lượng tử hóa động) hoặc "bf16"
+PRECISIONS = ("fp32", "int8", "bf16")
+TRANSLATION_PRECISION = str(get_setting("TRANSLATION_PRECISION", "fp32")).lower()
+
+@lru_cache(maxsize=None)
+def resolve_precision(precision: str) -> str:
+    """
+    Returns the precision that will actually be used on this machine: unknown values fall back
+    to fp32, and bf16 falls back to fp32 when the CPU has no native bf16 support.
+    """
+    if precision not in PRECISIONS:
+        print(f"[LOG] Unknown translation precision '{precision}', using fp32.")
+        return "fp32"
+    if precision == "bf16":
+        is_supported = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+        if is_supported is None or not is_supported():
+            print("[LOG] bf16 is not supported on this CPU, using fp32.")
+            return "fp32"
+    return precision
+
+@st.cache_resource(show_spinner=False)
+def resolve_model_commit():
+    """
+    Resolves MODEL_REVISION to a commit hash by downloading the model config only, so the
+    commit is known without loading the weights. Returns None when it cannot be resolved
+    (e.g. a local model directory).
+    """
+    try:
+        config = AutoConfig.from_pretrained(MODEL_PATH, revision=MODEL_REVISION)
+    except Exception as e:
+        print(f"[LOG] Cannot resolve the commit of {MODEL_PATH}@{MODEL_REVISION}: {e}")
+        return None
+    return getattr(config, "_commit_hash", None)
 
 @st.cache_resource(show_spinner="Đang tải mô hình dịch thuật...")
-def load_translation_model():
+def load_translation_model(precision: str = TRANSLATION_PRECISION):
     """
     Loads a pre-trained translation model and tokenizer from a specified directory.
+    Parameters:
+        precision (str): "fp32", "int8" (dynamic quantization of the Linear layers) or "bf16".
     Returns:
         tokenizer: The tokenizer for the translation model.
         model: The pre-trained translation model.
     """
-    model_path = "alpaca3000/en-vi-translation-model"  
+    model_path = MODEL_PATH
     # model_path = "models/my_en_vi_translation_model_archive"
+    # Tải đúng commit dùng làm khóa cache, kể cả khi nhánh được cập nhật sau khi phân giải
+    revision = get_model_revision()
     try:
-        tokenizer = AutoTokenizer.from_pretrained(model_path)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+        tokenizer = AutoTokenizer.from_pretrained(model_path, revision=revision)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path, revision=revision)
         model.eval()  # Set the model to evaluation mode
+        precision = resolve_precision(precision)
+        if precision == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif precision == "bf16":
+            model = model.to(torch.bfloat16)
         return tokenizer, model
     except Exception as e:
         st.error(f"Error loading model from {model_path}: {e}. Please ensure the model is accessible (e.g., online or downloaded).")
         st.stop()
 
+def warm_up_translation_model():
+    """
+    Loads the translation model ahead of the first request, unless a model server owns it.
+    """
+    if get_model_client() is None:
+        load_translation_model()
+
+@served
+def get_model_revision() -> str:
+    """
+    Returns the revision (commit hash when available) of the translation model, the version key of
+    the translation cache and the gloss store. Resolved from the config without loading the weights;
+    answered by the model server when one is configured, so it matches the model that translates.
+    """
+    return resolve_model_commit() or MODEL_REVISION
+
+# Số câu tối đa được đưa vào một lần model.generate
+TRANSLATION_BATCH_SIZE = 16
+# Giới hạn bộ nhớ cho một batch: tổng số token (đã padding) của đầu vào
+MAX_BATCH_TOKENS = int(get_setting("TRANSLATION_MAX_BATCH_TOKENS", 1024))
+# Số batch được dịch song song
+TRANSLATION_WORKERS = int(get_setting("TRANSLATION_WORKERS", 1))
+
+def _plan_batches(lengths: list, batch_size: int, max_batch_tokens: int) -> list:
+    """
+    Groups text indices into length-sorted batches of at most batch_size texts
+    whose padded size (count x longest) stays within max_batch_tokens.
+    """
+    batches = []
+    current = []
+    for idx in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Vì đã sắp xếp tăng dần, câu hiện tại là câu dài nhất của batch
+        if current and (len(current) >= batch_size or (len(current) + 1) * lengths[idx] > max_batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        batches.append(current)
+    return batches
+
+def _generate_translations(texts: list, batch_size: int = TRANSLATION_BATCH_SIZE,
+                           max_batch_tokens: int = MAX_BATCH_TOKENS, max_workers: int = 1) -> list:
+    """
+    Runs the model over non-empty texts in length-sorted, padded batches, using a single
+    model.generate call per batch. Batches run on up to max_workers threads.
+    Returns the translations in the same order as the input.
+    """
+    tokenizer, model = load_translation_model()
+    lengths = [len(ids) for ids in tokenizer(texts, truncation=True, max_length=MAX_INPUT_LENGTH)["input_ids"]]
+    batches = _plan_batches(lengths, batch_size, max_batch_tokens)
+
+    def run(chunk):
+        inputs = tokenizer([texts[idx] for idx in chunk], return_tensors="pt", padding=True, truncation=True, max_length=MAX_INPUT_LENGTH).to(model.device)
+        with torch.no_grad():
+            outputs = model.generate(**inputs, **GENERATION_KWARGS)
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    results = [None] * len(texts)
+    if max_workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outputs = list(executor.map(run, batches))
+    else:
+        outputs = [run(chunk) for chunk in batches]
+    for chunk, translations in zip(batches, outputs):
+        for idx, translated_text in zip(chunk, translations):
+            results[idx] = translated_text
+    return results
+
+@st.cache_resource
+def get_translation_scheduler():
+    """
+    Returns the process-wide micro-batching scheduler, or None when TRANSLATION_SCHEDULER is "0".
+    """
+    if str(get_setting("TRANSLATION_SCHEDULER", "1")) == "0":
+        return None
+    return TranslationScheduler(
+        _generate_translations,
+        max_batch_size=int(get_setting("TRANSLATION_SCHEDULER_MAX_BATCH", TRANSLATION_BATCH_SIZE)),
+        max_wait_ms=float(get_setting("TRANSLATION_SCHEDULER_MAX_WAIT_MS", 20)),
+    )
+
+# Yêu cầu có nhiều hơn chừng này văn bản (ví dụ văn bản dài) không đi qua scheduler
+SCHEDULER_MAX_TEXTS = int(get_setting("TRANSLATION_SCHEDULER_MAX_TEXTS", 4))
+
+def _run_model(texts: list, batch_size: int, max_batch_tokens: int, max_workers: int, use_scheduler: bool) -> list:
+    # Yêu cầu ngắn đi qua scheduler để gom batch với các phiên khác. Yêu cầu lớn (văn bản dài)
+    # và dịch song song nhiều luồng chạy trực tiếp: giữ batch_size, max_batch_tokens và việc sắp xếp
+    # theo độ dài trên toàn bộ phân đoạn, và không chiếm hàng đợi chung của các phiên khác
+    use_scheduler = use_scheduler and max_workers == 1 and len(texts) <= SCHEDULER_MAX_TEXTS
+    scheduler = get_translation_scheduler() if use_scheduler else None
+    if scheduler is None:
+        return _generate_translations(texts, batch_size, max_batch_tokens, max_workers)
+    return [future.result() for future in scheduler.submit_many(texts)]
+
+@served
+def translate_batch(texts: list, batch_size: int = TRANSLATION_BATCH_SIZE, use_cache: bool = True,
+                    max_batch_tokens: int = MAX_BATCH_TOKENS, max_workers: int = 1, use_scheduler: bool = True) -> list:
+    """
+    Translates a list of English texts to Vietnamese, padding each batch and running it
+    through a single model.generate call. Translations are read from and written to the
+    shared translation cache.
+    Parameters:
+        texts (list): The English texts to be translated.
+        batch_size (int): The maximum number of texts per generate call.
+        use_cache (bool): Whether to use the shared translation cache.
+        max_batch_tokens (int): The maximum padded input tokens per generate call.
+        max_workers (int): The number of batches translated in parallel.
+        use_scheduler (bool): Whether to batch together with other sessions through the shared
+            scheduler (ignored when max_workers > 1 or for more than SCHEDULER_MAX_TEXTS texts
+            to translate; batch_size is otherwise set by the scheduler).
+    Returns:
+        list: The translated texts, in the same order as the input.
+    """
+    results = ["Không có văn bản để dịch."] * len(texts)
+    pending = [idx for idx, text in enumerate(texts) if text and text.strip()]
+    if not pending:
+        return results
+
+    cache = get_translation_cache() if use_cache else None
+    if cache is None:
+        translations = _run_model([texts[idx] for idx in pending], batch_size, max_batch_tokens, max_workers, use_scheduler)
+        for idx, translated_text in zip(pending, translations):
+            results[idx] = translated_text
+        return results
+
+    revision = get_model_revision()
+    decoding = dict(GENERATION_KWARGS, max_input_length=MAX_INPUT_LENGTH, precision=resolve_precision(TRANSLATION_PRECISION))
+    keys = {idx: cache.make_key(texts[idx], revision, decoding) for idx in pending}
+    cached = cache.get_many(list(keys.values()))
+
+    # Văn bản trùng nhau chỉ dịch một lần
+    missing = {}
+    for idx in pending:
+        if keys[idx] not in cached:
+            missing.setdefault(keys[idx], texts[idx])
+    if missing:
+        translations = _run_model(list(missing.values()), batch_size, max_batch_tokens, max_workers, use_scheduler)
+        fresh = dict(zip(missing.keys(), translations))
+        cache.set_many(fresh)
+        cached.update(fresh)
+
+    for idx in pending:
+        results[idx] = cached[keys[idx]]
+    return results
+
 def translate_text(text: str) -> str:
     """
     Translates English text to Vietnamese using a pre-trained translation model.
@@ -36,31 +242,259 @@ def translate_text(text: str) -> str:
     if not text or not text.strip():
         return "Không có văn bản để dịch."
     
-    tokenizer, model = load_translation_model()
-    inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=64).to(model.device)
-    with torch.no_grad():
-        outputs = model.generate(**inputs, max_length=64, num_beams=3, early_stopping=True)  # Giảm beams
-    translated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    return translated_text
+    return translate_batch([text])[0]
+
+# Các từ viết tắt thường gặp, không được coi là kết thúc câu
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "u.s.", "u.k.", "no.", "approx."}
+_SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["”\')\]]))\s+(?=["“\'(\[]?[A-Z0-9])')
+_CLAUSE_BOUNDARY = re.compile(r'(?<=[;:,])\s+')
+
+def split_sentences(paragraph: str) -> list:
+    """
+    Splits an English paragraph into sentences.
+    Parameters:
+        paragraph (str): A paragraph of English text.
+    Returns:
+        list: The sentences, in order.
+    """
+    sentences = []
+    for piece in _SENTENCE_BOUNDARY.split(paragraph.strip()):
+        piece = piece.strip()
+        if not piece:
+            continue
+        # Ghép lại nếu câu trước kết thúc bằng từ viết tắt (Mr., e.g., ...)
+        if sentences and sentences[-1].split()[-1].lower() in _ABBREVIATIONS:
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return sentences
+
+def _split_to_token_limit(sentence: str, tokenizer, max_tokens: int) -> list:
+    """
+    Splits a sentence that is longer than max_tokens at clause boundaries, then at word
+    boundaries, so that no segment is truncated by the tokenizer.
+    """
+    if len(tokenizer(sentence)["input_ids"]) <= max_tokens:
+        return [sentence]
+
+    segments = []
+    for clause in _CLAUSE_BOUNDARY.split(sentence):
+        if len(tokenizer(clause)["input_ids"]) <= max_tokens:
+            segments.append(clause)
+            continue
+        # Mệnh đề vẫn quá dài: cắt theo từ
+        current = []
+        for word in clause.split():
+            if current and len(tokenizer(" ".join(current + [word]))["input_ids"]) > max_tokens:
+                segments.append(" ".join(current))
+                current = []
+            current.append(word)
+        if current:
+            segments.append(" ".join(current))
+
+    # Gộp các mệnh đề ngắn liền kề miễn là vẫn nằm trong giới hạn
+    merged = [segments[0]]
+    for segment in segments[1:]:
+        candidate = f"{merged[-1]} {segment}"
+        if len(tokenizer(candidate)["input_ids"]) <= max_tokens:
+            merged[-1] = candidate
+        else:
+            merged.append(segment)
+    return merged
+
+@served
+def translate_long_text(text: str, batch_size: int = TRANSLATION_BATCH_SIZE, max_batch_tokens: int = MAX_BATCH_TOKENS,
+                        max_workers: int = TRANSLATION_WORKERS, use_cache: bool = True, use_scheduler: bool = True) -> str:
+    """
+    Translates an English document of any length to Vietnamese. The text is segmented into
+    sentences (long sentences are split further so nothing is truncated), the segments are
+    translated in length-sorted batches and reassembled in their original order.
+    Parameters:
+        text (str): The English document.
+        batch_size (int): The maximum number of segments per generate call.
+        max_batch_tokens (int): Memory cap: the maximum padded input tokens per generate call.
+        max_workers (int): The number of batches translated in parallel.
+        use_cache (bool): Whether to use the shared translation cache.
+        use_scheduler (bool): Whether to go through the shared micro-batching scheduler
+            (only used when at most SCHEDULER_MAX_TEXTS segments need the model).
+    Returns:
+        str: The translated document; paragraphs are kept on separate lines.
+    """
+    if not text or not text.strip():
+        return "Không có văn bản để dịch."
+
+    tokenizer, _ = load_translation_model()
+    # Mỗi đoạn văn là một danh sách các phân đoạn cần dịch
+    paragraphs = []
+    for paragraph in text.splitlines():
+        if not paragraph.strip():
+            paragraphs.append([])
+            continue
+        segments = []
+        for sentence in split_sentences(paragraph):
+            segments.extend(_split_to_token_limit(sentence, tokenizer, MAX_INPUT_LENGTH - 1))  # chừa chỗ cho token </s>
+        paragraphs.append(segments)
+
+    flat = [segment for segments in paragraphs for segment in segments]
+    translations = iter(translate_batch(flat, batch_size=batch_size, use_cache=use_cache, max_batch_tokens=max_batch_tokens,
+                                        max_workers=max_workers, use_scheduler=use_scheduler))
+    lines = [" ".join(next(translations) for _ in segments) for segments in paragraphs]
+    return "\n".join(lines).strip()
+
+BERT_SCORE_MODEL = "distilbert-base-multilingual-cased"
+BERT_SCORE_BATCH_SIZE = 64
+
+@st.cache_resource(show_spinner="Đang tải mô hình đánh giá bản dịch...")
+def load_bert_scorer():
+    """
+    Loads the BERTScore scorer (model and tokenizer) once per process.
+    Returns:
+        BERTScorer: The scorer used by evaluate_translation.
+    """
+    return BERTScorer(model_type=BERT_SCORE_MODEL, lang="vi")
+
+def _embed_sentences(sentences: list, batch_size: int = BERT_SCORE_BATCH_SIZE) -> dict:
+    """
+    Encodes unique sentences with the BERTScore model in length-sorted, padded batches.
+    Returns a mapping sentence -> (token embeddings, idf weights) without padding.
+    """
+    scorer = load_bert_scorer()
+    tokenizer = scorer._tokenizer
+    # Trọng số idf mặc định của BERTScore khi idf=False: 1 cho mọi token, 0 cho [CLS] và [SEP]
+    idf_dict = defaultdict(lambda: 1.0)
+    idf_dict[tokenizer.sep_token_id] = 0
+    idf_dict[tokenizer.cls_token_id] = 0
+
+    unique = sorted(set(sentences), key=len)
+    stats = {}
+    for start in range(0, len(unique), batch_size):
+        batch = unique[start:start + batch_size]
+        with torch.no_grad():
+            embeddings, masks, idf = get_bert_embedding(batch, scorer._model, tokenizer, idf_dict, device=scorer.device)
+        for i, sentence in enumerate(batch):
+            length = int(masks[i].sum().item())
+            stats[sentence] = (embeddings[i, :length].cpu(), idf[i, :length].cpu())
+    return stats
 
-def evaluate_translation(original_text: str, user_translated_text: str):
+def _greedy_f1(candidate: tuple, reference: tuple) -> float:
     """
-    Evaluates the quality of a translation using BERTScore.
+    BERTScore F1 of one pair from precomputed (embeddings, idf) stats, by greedy cosine matching.
+    """
+    cand_emb, cand_idf = candidate
+    ref_emb, ref_idf = reference
+    similarity = torch.nn.functional.normalize(cand_emb, dim=-1) @ torch.nn.functional.normalize(ref_emb, dim=-1).T
+    precision = (similarity.max(dim=1).values * cand_idf).sum() / cand_idf.sum()
+    recall = (similarity.max(dim=0).values * ref_idf).sum() / ref_idf.sum()
+    if precision + recall == 0:
+        return 0.0
+    return (2 * precision * recall / (precision + recall)).item()
+
+@served
+def score_translations(candidates: list, references: list, batch_size: int = BERT_SCORE_BATCH_SIZE) -> list:
+    """
+    Scores candidate translations against reference translations with BERTScore.
+    Args:
+        candidates (list): The candidate translations.
+        references (list): The reference translations, one per candidate.
+        batch_size (int): The number of sentences encoded per forward pass.
+    Returns:
+        list: The BERTScore F1 of each pair, as a percentage.
+    """
+    if not candidates:
+        return []
+    stats = _embed_sentences(list(candidates) + list(references), batch_size)
+    return [_greedy_f1(stats[cand], stats[ref]) * 100 for cand, ref in zip(candidates, references)]
+
+@st.cache_resource
+def get_reference_cache():
+    """
+    In-process LRU cache of machine reference translations and their BERTScore embeddings.
+    """
+    return LRUCache(maxsize=int(get_setting("REFERENCE_CACHE_SIZE", 512)))
+
+def _reference_key(original_text: str) -> tuple:
+    # Khóa gồm câu gốc và các mô hình: đổi câu gốc hoặc mô hình sẽ không dùng lại kết quả cũ
+    return (normalize_text(original_text), get_model_revision(), resolve_precision(TRANSLATION_PRECISION), BERT_SCORE_MODEL)
+
+def get_references(original_texts: list, batch_size: int = TRANSLATION_BATCH_SIZE) -> dict:
+    """
+    Returns the cached machine reference of each source text, translating the missing ones in one batched pass.
+    Args:
+        original_texts (list): The original texts in English.
+        batch_size (int): The maximum number of texts per generate call.
+    Returns:
+        dict: A mapping source text -> {"translation": str, "stats": BERTScore embeddings or None until first needed}.
+    """
+    cache = get_reference_cache()
+    keys = {text: _reference_key(text) for text in original_texts}
+    references = {text: cache.get(key) for text, key in keys.items()}
+
+    missing = [text for text, reference in references.items() if reference is None]
+    for text, translation in zip(missing, translate_batch(missing, batch_size=batch_size)):
+        references[text] = {"translation": translation, "stats": None}
+        cache.set(keys[text], references[text])
+    return references
+
+# Đánh giá hai tầng: chrF tính tức thì; BERTScore chỉ chạy khi chrF nằm trong vùng chưa chắc chắn
+CHRF_LOW = float(get_setting("EVAL_CHRF_LOW", 15))
+CHRF_HIGH = float(get_setting("EVAL_CHRF_HIGH", 90))
+
+@served
+def evaluate_translation(original_text: str, user_translated_text: str, force_bertscore: bool = False):
+    """
+    Evaluates the quality of a translation. A fast chrF score is computed first; BERTScore only
+    runs when chrF lands in the ambiguous band [EVAL_CHRF_LOW, EVAL_CHRF_HIGH) or when requested.
+    The machine reference and its embeddings are cached per source text, so a retry only
+    encodes the user's translation.
     Args:
         original_text (str): The original text in English.
         user_translated_text (str): The translated text in Vietnamese by user.
+        force_bertscore (bool): Always run the BERTScore tier.
+    Returns:
+        tuple: (percentage_correct, machine_translation, details) where details holds the tier
+            used ("chrf" or "bertscore") and both scores (bertscore is None when it did not run).
+    """
+    return evaluate_translations([(original_text, user_translated_text)], force_bertscore=force_bertscore)[0]
+
+@served
+def evaluate_translations(pairs: list, batch_size: int = BERT_SCORE_BATCH_SIZE, force_bertscore: bool = False) -> list:
+    """
+    Evaluates many translations at once. Sources are deduplicated, the missing machine
+    references are translated in one batched pass, every pair gets a chrF score, and the
+    pairs that need BERTScore are encoded together in padded batches.
+    Args:
+        pairs (list): (original_text, user_translated_text) pairs.
+        batch_size (int): The number of sentences encoded per forward pass.
+        force_bertscore (bool): Run the BERTScore tier for every pair.
     Returns:
-        tuple: (percentage_correct, machine_translation)
+        list: One (percentage_correct, machine_translation, details) tuple per pair, in the same order.
     """
-    if not original_text or not user_translated_text or not original_text.strip() or not user_translated_text.strip():
-        return 0.0, "Không có văn bản để so sánh.", "No comparison available."
+    results = [(0.0, "Không có văn bản để so sánh.", {"tier": None, "chrf": None, "bertscore": None})] * len(pairs)
+    valid = [idx for idx, (source, candidate) in enumerate(pairs)
+             if source and candidate and source.strip() and candidate.strip()]
+    if not valid:
+        return results
 
-    machine_translation = translate_text(original_text)
+    references = get_references(list(dict.fromkeys(pairs[idx][0] for idx in valid)), batch_size=TRANSLATION_BATCH_SIZE)
+    chrf = {idx: chrf_score(pairs[idx][1], references[pairs[idx][0]]["translation"]) for idx in valid}
+    needs_bertscore = [idx for idx in valid if force_bertscore or CHRF_LOW <= chrf[idx] < CHRF_HIGH]
 
-    P, R, F1 = score([user_translated_text], [machine_translation], lang="vi", model_type="distilbert-base-multilingual-cased")
-    percent = F1.mean().item() * 100
+    bertscore = {}
+    if needs_bertscore:
+        # Chỉ mã hóa bản dịch của người dùng và các bản tham chiếu chưa có embedding
+        pending = [references[pairs[idx][0]] for idx in needs_bertscore if references[pairs[idx][0]]["stats"] is None]
+        stats = _embed_sentences([reference["translation"] for reference in pending] + [pairs[idx][1] for idx in needs_bertscore], batch_size)
+        for reference in pending:
+            reference["stats"] = stats[reference["translation"]]
+        for idx in needs_bertscore:
+            bertscore[idx] = _greedy_f1(stats[pairs[idx][1]], references[pairs[idx][0]]["stats"]) * 100
 
-    return percent, machine_translation
+    for idx in valid:
+        details = {"tier": "bertscore" if idx in bertscore else "chrf", "chrf": chrf[idx], "bertscore": bertscore.get(idx)}
+        percent = bertscore.get(idx, chrf[idx])
+        print(f"[LOG] Evaluation tier={details['tier']} chrf={chrf[idx]:.2f} bertscore={details['bertscore']}")
+        results[idx] = (percent, references[pairs[idx][0]]["translation"], details)
+    return results
 
 # Hàm lấy thông tin từ WordNet (nếu là từ đơn)
 @st.cache_data(show_spinner=False)
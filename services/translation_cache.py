@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import streamlit as st
+from utils.config import get_setting
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "envichan", "translations.sqlite3")
+DEFAULT_MAX_ENTRIES = 200_000
+# Lượt truy cập (last_used, hits/misses) được gom lại rồi ghi một lần: sau chừng này khóa hoặc chừng này giây
+TOUCH_FLUSH_EVERY = 256
+TOUCH_FLUSH_INTERVAL = 5.0
+
+def normalize_text(text: str) -> str:
+    """
+    Chuẩn hóa văn bản trước khi tạo khóa cache: NFC unicode và gộp khoảng trắng.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class TranslationCache:
+    """
+    Disk-backed translation cache stored in a SQLite file, shared by every process on the node.
+
+    Entries are keyed by the normalized source text, the model revision and the decoding
+    parameters, so a new model revision never reads translations made by an older one.
+    The least recently used entries are evicted once the cache holds more than max_entries rows.
+    Reads never write: the LRU timestamps of hits and the shared hit/miss counters are buffered
+    and written in one transaction every TOUCH_FLUSH_EVERY keys or TOUCH_FLUSH_INTERVAL seconds,
+    and the row count is kept in the counters table instead of being recounted on each write.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._touches = {}
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    translation TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # Số dòng được đếm một lần khi tạo bộ đếm, sau đó cập nhật cùng transaction với mỗi lần ghi
+            conn.execute("INSERT OR IGNORE INTO counters (name, value) SELECT 'entries', COUNT(*) FROM translations")
+        atexit.register(self.flush)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Mỗi thread dùng một kết nối SQLite riêng
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(text: str, model_revision: str, decoding_params: dict) -> str:
+        """
+        Builds the cache key for a source text.
+        Args:
+            text (str): The source text.
+            model_revision (str): The revision of the translation model.
+            decoding_params (dict): The generation parameters used for decoding.
+        Returns:
+            str: A SHA-256 hex digest.
+        """
+        payload = "\0".join([
+            normalize_text(text),
+            model_revision,
+            json.dumps(decoding_params, sort_keys=True),
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Looks up several keys at once and refreshes the LRU timestamp of the hits.
+        Args:
+            keys (list): Cache keys from make_key.
+        Returns:
+            dict: A mapping key -> translation for the keys found.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        conn = self._connection()
+        found = {}
+        try:
+            # Giới hạn số tham số của SQLite
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk).fetchall()
+                found.update(rows)
+        except sqlite3.Error as e:
+            print(f"[LOG] Translation cache read failed: {e}")
+            return found
+
+        now = time.time()
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self._touches.update((key, now) for key in found)
+            self._pending_counts["hits"] += len(found)
+            self._pending_counts["misses"] += len(keys) - len(found)
+            due = len(self._touches) >= TOUCH_FLUSH_EVERY or time.monotonic() - self._last_flush >= TOUCH_FLUSH_INTERVAL
+        if due:
+            self.flush()
+        return found
+
+    def _take_pending(self) -> tuple:
+        with self._lock:
+            touches, counts = self._touches, self._pending_counts
+            self._touches, self._pending_counts = {}, {"hits": 0, "misses": 0}
+            self._last_flush = time.monotonic()
+        return touches, counts
+
+    def _write_pending(self, conn: sqlite3.Connection, touches: dict, counts: dict):
+        if touches:
+            conn.executemany("UPDATE translations SET last_used = max(last_used, ?) WHERE key = ?",
+                             [(used, key) for key, used in touches.items()])
+        self._bump_counters(conn, **counts)
+
+    def flush(self):
+        """
+        Writes the buffered LRU timestamps and hit/miss counters in one transaction.
+        """
+        touches, counts = self._take_pending()
+        if not touches and not any(counts.values()):
+            return
+        conn = self._connection()
+        try:
+            with conn:
+                self._write_pending(conn, touches, counts)
+        except sqlite3.Error as e:
+            print(f"[LOG] Translation cache flush failed: {e}")
+
+    def set_many(self, items: dict):
+        """
+        Stores several translations and evicts the least recently used rows above max_entries.
+        Args:
+            items (dict): A mapping key -> translation.
+        """
+        if not items:
+            return
+        conn = self._connection()
+        now = time.time()
+        touches, counts = self._take_pending()
+        evicted = 0
+        try:
+            with conn:
+                # Lượt truy cập đang chờ được ghi trước, để thứ tự LRU khi xóa là mới nhất
+                self._write_pending(conn, touches, counts)
+                # Khóa đã gồm revision và tham số giải mã nên bản dịch của một khóa không đổi
+                added = conn.executemany(
+                    "INSERT OR IGNORE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                    [(key, translation, now) for key, translation in items.items()]
+                ).rowcount
+                entries = conn.execute("SELECT value FROM counters WHERE name = 'entries'").fetchone()[0] + added
+                overflow = entries - self.max_entries
+                if overflow > 0:
+                    evicted = conn.execute("""
+                        DELETE FROM translations WHERE key IN (
+                            SELECT key FROM translations ORDER BY last_used ASC LIMIT ?
+                        )
+                    """, (overflow,)).rowcount
+                self._bump_counters(conn, entries=added - evicted, evictions=evicted)
+        except sqlite3.Error as e:
+            print(f"[LOG] Translation cache write failed: {e}")
+            return
+
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def _bump_counters(self, conn: sqlite3.Connection, **deltas):
+        # Bộ đếm dùng chung giữa các process
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, value) for name, value in deltas.items() if value]
+        )
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters of this process and of every process sharing the file.
+        """
+        self.flush()
+        conn = self._connection()
+        shared = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        with self._lock:
+            process = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+        lookups = process["hits"] + process["misses"]
+        return {
+            "entries": shared.get("entries", 0),
+            "max_entries": self.max_entries,
+            "process": process,
+            "process_hit_rate": process["hits"] / lookups if lookups else 0.0,
+            "shared": {name: shared.get(name, 0) for name in ("hits", "misses", "evictions")},
+        }
+
+@st.cache_resource
+def get_translation_cache():
+    """
+    Returns the node-wide translation cache, or None when TRANSLATION_CACHE_PATH is set to an empty string.
+    """
+    path = get_setting("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+    max_entries = int(get_setting("TRANSLATION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    try:
+        return TranslationCache(path, max_entries=max_entries)
+    except sqlite3.Error as e:
+        print(f"[ERROR] Không thể mở cache dịch thuật tại {path}: {e}")
+        return None
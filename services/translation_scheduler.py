@@ -0,0 +1,109 @@
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+class TranslationScheduler:
+    """
+    Dynamic micro-batching scheduler shared by every Streamlit session of the process.
+
+    Requests from all sessions go into one queue. A dedicated worker thread takes the oldest
+    request, waits at most max_wait_ms for more to arrive (up to max_batch_size), runs the whole
+    micro-batch through translate_fn in one call and resolves each request's future.
+    """
+
+    def __init__(self, translate_fn, max_batch_size: int = 16, max_wait_ms: float = 20.0,
+                 log_every: int = 100, history: int = 1000):
+        self.translate_fn = translate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.log_every = log_every
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=history)
+        self._wait_times = deque(maxlen=history)
+        self._total_batches = 0
+        self._total_requests = 0
+
+        self._worker = threading.Thread(target=self._run, name="translation-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queues one text for translation.
+        Args:
+            text (str): The English text.
+        Returns:
+            Future: Resolves to the translated text.
+        """
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def submit_many(self, texts: list) -> list:
+        """
+        Queues several texts for translation.
+        Args:
+            texts (list): The English texts.
+        Returns:
+            list: One future per text, in the same order.
+        """
+        return [self.submit(text) for text in texts]
+
+    def _collect(self) -> list:
+        # Chờ request đầu tiên, sau đó gom thêm cho tới khi đủ batch hoặc hết thời gian chờ
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(block=timeout > 0, timeout=max(timeout, 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            with self._lock:
+                self._batch_sizes.append(len(batch))
+                self._wait_times.extend(started - enqueued for _, _, enqueued in batch)
+                self._total_batches += 1
+                self._total_requests += len(batch)
+                total_batches = self._total_batches
+
+            try:
+                translations = self.translate_fn([text for text, _, _ in batch])
+            except Exception as e:
+                print(f"[LOG] Translation batch failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), translated_text in zip(batch, translations):
+                future.set_result(translated_text)
+
+            if self.log_every and total_batches % self.log_every == 0:
+                print(f"[LOG] Translation scheduler: {self.stats()}")
+
+    def stats(self) -> dict:
+        """
+        Returns the current queue depth and batch size / wait time figures over recent batches.
+        """
+        with self._lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._wait_times)
+            total_batches = self._total_batches
+            total_requests = self._total_requests
+        return {
+            "queue_depth": self._queue.qsize(),
+            "total_batches": total_batches,
+            "total_requests": total_requests,
+            "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "max_batch_size": max(sizes, default=0),
+            "avg_wait_ms": 1000 * sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait_ms": 1000 * waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+        }
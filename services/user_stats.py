@@ -0,0 +1,98 @@
+import pandas as pd
+from datetime import datetime, date, timedelta
+from databases.connection import db_connection
+
+# Số lần làm flashcard gần nhất hiển thị trên biểu đồ điểm số
+DASHBOARD_HISTORY_LIMIT = 200
+DASHBOARD_DAYS = 7
+
+# Các câu SQL ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+BUMP_STATUS_SQL = """
+    INSERT INTO user_stats (user_id, kind, status, count)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (user_id, kind, status) DO UPDATE SET count = user_stats.count + EXCLUDED.count
+"""
+BUMP_VOCAB_ADDED_SQL = """
+    INSERT INTO user_daily_stats (user_id, day, vocab_added)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (user_id, day) DO UPDATE SET vocab_added = user_daily_stats.vocab_added + EXCLUDED.vocab_added
+"""
+DASHBOARD_STATS_SQL = """
+    SELECT
+        (SELECT COALESCE(json_agg(json_build_object('kind', kind, 'status', status, 'count', count)
+                                  ORDER BY kind, status), '[]')
+         FROM user_stats WHERE user_id = %(user_id)s AND count > 0) AS statuses,
+        (SELECT COALESCE(json_agg(json_build_object('day', day, 'count', vocab_added)), '[]')
+         FROM user_daily_stats WHERE user_id = %(user_id)s AND day >= %(start)s) AS daily,
+        (SELECT COALESCE(json_agg(json_build_object('flashcard_name', flashcard_name, 'score', score,
+                                                    'time_updated', time_updated)
+                                  ORDER BY time_updated DESC), '[]')
+         FROM (SELECT flashcard_name, score, time_updated FROM flashcard_history
+               WHERE user_id = %(user_id)s ORDER BY time_updated DESC LIMIT %(limit)s) latest) AS history
+"""
+
+def bump_status(cur, user_id: str, kind: str, status: str, delta: int = 1):
+    """
+    Adds delta to the counter of items of kind ("vocab" or "flashcard") with the given status.
+    Runs on the caller's cursor so the counter changes in the same transaction as the write.
+    """
+    if not delta:
+        return
+    cur.execute(BUMP_STATUS_SQL, (user_id, kind, status, delta))
+
+def move_status(cur, user_id: str, kind: str, old_status: str, new_status: str):
+    """
+    Moves one item of kind from old_status to new_status in the counters.
+    """
+    if old_status != new_status:
+        bump_status(cur, user_id, kind, old_status, -1)
+        bump_status(cur, user_id, kind, new_status, 1)
+
+def bump_vocab_added(cur, user_id: str, day: date, delta: int = 1):
+    """
+    Adds delta to the number of words the user added on day.
+    """
+    if not delta:
+        return
+    cur.execute(BUMP_VOCAB_ADDED_SQL, (user_id, day, delta))
+
+def get_dashboard_stats(user_id: str, history_limit: int = DASHBOARD_HISTORY_LIMIT) -> dict:
+    """
+    Reads everything the account dashboard shows in one query: status counters, the words added
+    over the last DASHBOARD_DAYS days and the latest flashcard scores. Each part is an index lookup
+    bounded by a constant, so the cost does not grow with the number of words or attempts.
+
+    Args:
+        user_id (str): ID người dùng.
+        history_limit (int): Số lần làm flashcard gần nhất được lấy.
+
+    Returns:
+        dict: DataFrame "vocab_daily" (date, count), "vocab_status" (status, count),
+            "flashcard_status" (status, count) và "history" (flashcard_name, score, time_updated).
+    """
+    today = datetime.now().date()
+    start_date = today - timedelta(days=DASHBOARD_DAYS - 1)
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(DASHBOARD_STATS_SQL, {"user_id": user_id, "start": start_date, "limit": history_limit})
+        row = c.fetchone()
+
+    # Điền 0 cho những ngày không thêm từ nào
+    raw_counts = {date.fromisoformat(item["day"]): item["count"] for item in row["daily"]}
+    date_list = [start_date + timedelta(days=i) for i in range(DASHBOARD_DAYS)]
+    vocab_daily = pd.DataFrame({"date": date_list, "count": [raw_counts.get(day, 0) for day in date_list]})
+
+    def status_frame(kind):
+        items = [item for item in row["statuses"] if item["kind"] == kind]
+        return pd.DataFrame(items, columns=["status", "count"])
+
+    history = pd.DataFrame(row["history"], columns=["flashcard_name", "score", "time_updated"])
+    history["time_updated"] = pd.to_datetime(history["time_updated"])
+
+    return {
+        "vocab_daily": vocab_daily,
+        "vocab_status": status_frame("vocab"),
+        "flashcard_status": status_frame("flashcard"),
+        "history": history,
+    }
@@ -3,8 +3,28 @@ import psycopg2
 import streamlit as st
 import uuid
 import pandas as pd
-from datetime import datetime, timedelta
-from databases.connection import get_connection
+from datetime import datetime
+from databases.connection import db_connection
+from services.vocab_cache import get_vocab_cache, vocab_added, vocab_deleted, vocab_status_updated
+from services.user_stats import bump_status, bump_vocab_added, move_status
+
+# Các câu SQL ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+ADD_VOCAB_SQL = """
+    INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT DO NOTHING
+    RETURNING vocab_id
+"""
+USER_VOCABULARY_SQL = "SELECT vocab_id, en, vi, class, examples, synonyms, status, date_added FROM vocabulary WHERE user_id = %s"
+GET_VOCAB_SQL = "SELECT vocab_id, en, vi, class, examples, synonyms, status, date_added FROM vocabulary WHERE vocab_id = %s"
+DELETE_VOCAB_SQL = "DELETE FROM vocabulary WHERE vocab_id = %s RETURNING user_id, status, date_added"
+# old.status là trạng thái trước khi cập nhật, dùng để chuyển bộ đếm
+UPDATE_VOCAB_STATUS_SQL = """
+    UPDATE vocabulary v SET status = %s
+    FROM (SELECT vocab_id, status FROM vocabulary WHERE vocab_id = %s FOR UPDATE) old
+    WHERE v.vocab_id = old.vocab_id
+    RETURNING v.user_id, old.status AS old_status
+"""
 
 # add new vocabulary to user's vocabulary list
 def add_vocab(user_id: str, vocab: str, definition: str, word_class: str, examples: list, synonyms: str):
@@ -21,65 +41,149 @@ def add_vocab(user_id: str, vocab: str, definition: str, word_class: str, exampl
     
     # init vocab_id and date_created
     vocab_id = str(uuid.uuid4())
-    date_created = datetime.now().date().isoformat()
+    date_created = datetime.now().date()
     status = "Đang học"
     examples_json = json.dumps(examples or [])
     
-    # connect to the database
-    conn = get_connection()
-    c = conn.cursor()
-
     result = True
     message = vocab_id
 
-    # check if this word already exists in the user's vocabulary by en and vi
-    c.execute("SELECT * FROM vocabulary WHERE user_id = %s AND en = %s AND vi = %s", (user_id, vocab, definition))
-    existing_vocab = c.fetchone()
-
-    if existing_vocab:
-        conn.close()
-        result = False
-        message = "Từ vựng đã tồn tại trong từ điển của bạn."
-        print(f"[LOG] Vocabulary '{vocab}' already exists for user {user_id}.")
-    else:
-        # insert new vocabulary into the database
+    with db_connection() as conn:
+        c = conn.cursor()
+        # insert in one round trip; the unique index on (user_id, en, md5(vi)) rejects duplicates
         try:
-            c.execute("""
-                INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (vocab_id, user_id, vocab, definition, word_class, examples_json, synonyms, status, date_created))
+            c.execute(ADD_VOCAB_SQL, (vocab_id, user_id, vocab, definition, word_class, examples_json, synonyms, status, date_created))
+            inserted = c.fetchone()
+            if inserted is not None:
+                bump_status(c, user_id, "vocab", status)
+                bump_vocab_added(c, user_id, date_created)
+            conn.commit()
         except Exception as e:
             message = e
             result = False
             print(f"[LOG] Error adding vocabulary: {e}")
-        finally:
-            conn.commit()
-            conn.close()
+        else:
+            if inserted is None:
+                result = False
+                message = "Từ vựng đã tồn tại trong từ điển của bạn."
+                print(f"[LOG] Vocabulary '{vocab}' already exists for user {user_id}.")
+            else:
+                vocab_added(user_id, {
+                    "vocab_id": vocab_id, "en": vocab, "vi": definition, "class": word_class,
+                    "examples": examples or [], "synonyms": synonyms, "status": status, "date_added": date_created,
+                })
 
     return result, message
 
 # get all vocabulary of a user
-st.cache_data(show_spinner=False)  # Cache the function for 1 hour
 def get_user_vocabulary(user_id: str):
     """
-    Retrieves all vocabulary for a specific user.
+    Retrieves all vocabulary for a specific user, through the per-user vocabulary cache.
     
     Args:
         user_id (str): The ID of the user whose vocabulary is to be retrieved.
     
     Returns:
-        list: A list of vocabulary entries for the user.
+        list: A list of vocabulary entries for the user (shared with the cache, do not modify).
     """
     
-    conn = get_connection()
-    c = conn.cursor()
+    def load():
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute(USER_VOCABULARY_SQL, (user_id,))
+            return c.fetchall()
     
-    c.execute("SELECT vocab_id, en, vi, class, examples, synonyms, status, date_added FROM vocabulary WHERE user_id = %s", (user_id,))
-    results = c.fetchall()
-    
-    conn.close()
-    
-    return results
+    return get_vocab_cache().get_rows(user_id, load)
+
+# columns shown in the dictionary grid and the sort orders it supports
+VOCAB_PAGE_COLUMNS = ["vocab_id", "en", "vi", "class", "status", "date_added"]
+VOCAB_SORT_COLUMNS = {"date_added": "date_added", "en": "en"}
+
+# get one page of a user's vocabulary (keyset pagination)
+def get_vocabulary_page(user_id: str, page_size: int = 20, sort_by: str = "date_added", descending: bool = True,
+                        status: str = None, word_class: str = None, search: str = None, after: tuple = None):
+    """
+    Retrieves one page of a user's vocabulary with keyset pagination: the page starts right
+    after the (sort value, vocab_id) key of the previous page's last row, so every page costs
+    the same whatever the size of the dictionary. Only the grid columns are selected.
+
+    Args:
+        user_id (str): The ID of the user.
+        page_size (int): The number of rows per page.
+        sort_by (str): "date_added" or "en".
+        descending (bool): Sort direction.
+        status (str): Only rows with this status, if given.
+        word_class (str): Only rows with this word class, if given.
+        search (str): Only words starting with this text (case-insensitive), if given.
+        after (tuple): The "next" key returned for the previous page, or None for the first page.
+
+    Returns:
+        dict: "rows" (list of dicts with VOCAB_PAGE_COLUMNS) and "next" (key of the next page, or None).
+    """
+    cache_params = (page_size, sort_by, descending, status, word_class, search, after)
+    return get_vocab_cache().get_page(user_id, cache_params, lambda: _load_vocabulary_page(
+        user_id, page_size, sort_by, descending, status, word_class, search, after))
+
+def vocabulary_page_query(user_id, page_size, sort_by, descending, status, word_class, search, after) -> tuple:
+    """
+    Builds the SQL and parameters of one grid page (see get_vocabulary_page).
+    Returns:
+        tuple: (sql, params).
+    """
+    sort_column = VOCAB_SORT_COLUMNS[sort_by]
+    conditions, params = ["user_id = %s"], [user_id]
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    if word_class:
+        conditions.append("class = %s")
+        params.append(word_class)
+    if search:
+        escaped = search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append("lower(en) LIKE %s")
+        params.append(escaped + "%")
+    if after is not None:
+        conditions.append(f"({sort_column}, vocab_id) {'<' if descending else '>'} (%s, %s)")
+        params.extend(after)
+    direction = "DESC" if descending else "ASC"
+    return f"""
+        SELECT {', '.join(VOCAB_PAGE_COLUMNS)}
+        FROM vocabulary
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {sort_column} {direction}, vocab_id {direction}
+        LIMIT %s
+    """, (*params, page_size + 1)
+
+def _load_vocabulary_page(user_id, page_size, sort_by, descending, status, word_class, search, after):
+    sort_column = VOCAB_SORT_COLUMNS[sort_by]
+    query, params = vocabulary_page_query(user_id, page_size, sort_by, descending, status, word_class, search, after)
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        rows = c.fetchall()
+
+    # Lấy thêm một dòng để biết còn trang sau hay không
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_key = (rows[-1][sort_column], rows[-1]["vocab_id"])
+    return {"rows": rows, "next": next_key}
+
+# get every column of a single vocabulary entry
+def get_vocab(vocab_id: str):
+    """
+    Retrieves a single vocabulary entry, including its examples and synonyms.
+
+    Args:
+        vocab_id (str): The ID of the vocabulary.
+
+    Returns:
+        dict: The vocabulary entry, or None if it does not exist.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(GET_VOCAB_SQL, (vocab_id,))
+        return c.fetchone()
 
 # delete a vocabulary by its ID
 def delete_vocab(vocab_id: str):
@@ -90,17 +194,21 @@ def delete_vocab(vocab_id: str):
         vocab_id (str): The ID of the vocabulary to be deleted.
     """
     
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute("DELETE FROM vocabulary WHERE vocab_id = %s", (vocab_id,))
-    except psycopg2.Error as e:
-        print(f"[LOG] Error deleting vocabulary: {e}")
-        conn.close()
-        return False, str(e)
-    
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute(DELETE_VOCAB_SQL, (vocab_id,))
+            deleted = c.fetchone()
+            if deleted:
+                bump_status(c, deleted["user_id"], "vocab", deleted["status"], -1)
+                bump_vocab_added(c, deleted["user_id"], deleted["date_added"], -1)
+        except psycopg2.Error as e:
+            print(f"[LOG] Error deleting vocabulary: {e}")
+            return False, str(e)
+        conn.commit()
+
+    if deleted:
+        vocab_deleted(deleted["user_id"], vocab_id)
     
     # log to check if the vocabulary was deleted successfully
     print(f"[LOG] Vocabulary with ID {vocab_id} deleted successfully.")
@@ -116,91 +224,21 @@ def update_vocab_status(vocab_id: str, new_status: str):
         status (str): The new status to set for the vocabulary.
     """
     
-    conn = get_connection()
-    c = conn.cursor()
-    try: 
-        c.execute("UPDATE vocabulary SET status = %s WHERE vocab_id = %s", (new_status, vocab_id))
-
-    except psycopg2.Error as e:
-        print(f"[LOG] Error updating vocabulary status: {e}")
-        conn.close()
-        return False, str(e)
-    
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try: 
+            c.execute(UPDATE_VOCAB_STATUS_SQL, (new_status, vocab_id))
+            updated = c.fetchone()
+            if updated:
+                move_status(c, updated["user_id"], "vocab", updated["old_status"], new_status)
+        except psycopg2.Error as e:
+            print(f"[LOG] Error updating vocabulary status: {e}")
+            return False, str(e)
+        conn.commit()
+
+    if updated:
+        vocab_status_updated(updated["user_id"], vocab_id, new_status)
     
     # log to check if the vocabulary status was updated successfully
     print(f"[LOG] Vocabulary with ID {vocab_id} updated successfully to status '{new_status}'.")
     return True, "Cập nhật trạng thái từ vựng thành công!"
-
-# Lấy số lượng từ vựng được thêm vào trong 7 ngày gần đây và trả về dict dạng {ngày: số từ}, fill 0 nếu ngày không có
-def get_vocab_count_last_7_days(user_id: str) -> pd.DataFrame:
-    """
-    Trả về DataFrame gồm 2 cột: date, count – số từ thêm mỗi ngày trong 7 ngày gần đây.
-
-    Args:
-        user_id (str): ID người dùng.
-
-    Returns:
-        pd.DataFrame: Cột 'date' là datetime.date, 'count' là int.
-    """
-    conn = get_connection()
-    c = conn.cursor()
-
-    today = datetime.now().date()
-    start_date = today - timedelta(days=6)
-
-    # Query: lấy số từ mỗi ngày gần đây
-    c.execute("""
-        SELECT date_added::date AS date, COUNT(*) AS count 
-        FROM vocabulary 
-        WHERE user_id = %s AND date_added >= %s 
-        GROUP BY date
-        ORDER BY date ASC
-    """, (user_id, start_date))
-
-    rows = c.fetchall()
-    conn.close()
-
-    # Chuyển thành dict tạm {ngày: count}
-    raw_counts = {row["date"]: row["count"] for row in rows}
-
-    # Tạo dataframe với đầy đủ 7 ngày, fill thiếu bằng 0
-    date_list = [start_date + timedelta(days=i) for i in range(7)]
-    data = {
-        "date": date_list,
-        "count": [raw_counts.get(day, 0) for day in date_list]
-    }
-
-    df = pd.DataFrame(data)
-    return df
-
-# lấy số lượng tử vựng đã nhớ/đang học và trả về dataframe
-def get_vocab_status_count(user_id: str) -> pd.DataFrame:
-    """
-    Trả về DataFrame gồm 2 cột: status, count – số lượng từ theo trạng thái.
-
-    Args:
-        user_id (str): ID người dùng.
-
-    Returns:
-        pd.DataFrame: Cột 'status' là str, 'count' là int.
-    """
-    conn = get_connection()
-    c = conn.cursor()
-
-    # Query: lấy số lượng từ theo trạng thái
-    c.execute("""
-        SELECT status, COUNT(*) AS count 
-        FROM vocabulary 
-        WHERE user_id = %s 
-        GROUP BY status
-    """, (user_id,))
-
-    rows = c.fetchall()
-    conn.close()
-
-    # Chuyển thành DataFrame
-    df = pd.DataFrame(rows, columns=["status", "count"])
-    return df
-
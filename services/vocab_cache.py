@@ -0,0 +1,107 @@
+import threading
+import streamlit as st
+from utils.config import get_setting
+from utils.lru_cache import LRUCache
+
+VOCAB_CACHE_USERS = int(get_setting("VOCAB_CACHE_USERS", 256))
+VOCAB_CACHE_TTL = float(get_setting("VOCAB_CACHE_TTL", 300))
+# Số trang được giữ cho mỗi người dùng (tính trung bình)
+VOCAB_CACHE_PAGES_PER_USER = 8
+
+class VocabularyCache:
+    """
+    Per-user, in-process cache of vocabulary reads: the full word list of a user and the
+    grid pages computed from it, both bounded in size and by a time-to-live.
+
+    Every write bumps the user's version. The full list is patched in place (added, deleted or
+    re-statused row), cached pages of that user become unreachable, and a read that started
+    before the write does not store its now-stale result.
+
+    Versions come from one counter shared by all users and are kept in a bounded LRU cache. A
+    user whose version was evicted gets the current counter value, which is at least as new as
+    any write of that user: a read that started before an evicted write is still rejected.
+    """
+
+    def __init__(self, max_users: int = 256, ttl: float = 300):
+        self.rows = LRUCache(maxsize=max_users, ttl=ttl)
+        self.pages = LRUCache(maxsize=max_users * VOCAB_CACHE_PAGES_PER_USER, ttl=ttl)
+        # Cùng kích thước với cache trang để trang đã lưu không mất khóa phiên bản sớm hơn chính nó
+        self._versions = LRUCache(maxsize=max_users * VOCAB_CACHE_PAGES_PER_USER, ttl=ttl)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def _current_version(self, user_id: str) -> int:
+        # Gọi khi đang giữ self._lock
+        version = self._versions.get(user_id)
+        if version is None:
+            version = self._clock
+            self._versions.set(user_id, version)
+        return version
+
+    def _version(self, user_id: str) -> int:
+        with self._lock:
+            return self._current_version(user_id)
+
+    def get_rows(self, user_id: str, loader):
+        """
+        Returns the cached word list of user_id, or loads it with loader() and caches it.
+        """
+        rows = self.rows.get(user_id)
+        if rows is not None:
+            return rows
+        version = self._version(user_id)
+        rows = loader()
+        with self._lock:
+            if self._current_version(user_id) == version:
+                self.rows.set(user_id, rows)
+        return rows
+
+    def get_page(self, user_id: str, params: tuple, loader):
+        """
+        Returns a cached grid page of user_id for params, or loads it with loader() and caches it.
+        """
+        version = self._version(user_id)
+        key = (user_id, version, params)
+        page = self.pages.get(key)
+        if page is None:
+            page = loader()
+            with self._lock:
+                if self._current_version(user_id) == version:
+                    self.pages.set(key, page)
+        return page
+
+    def patch(self, user_id: str, update=None):
+        """
+        Applies a write of user_id: update(rows) -> new rows patches the cached word list;
+        without update the list is dropped and reloaded on the next read.
+        """
+        with self._lock:
+            self._clock += 1
+            self._versions.set(user_id, self._clock)
+            rows = self.rows.pop(user_id)
+            if rows is not None and update is not None:
+                self.rows.set(user_id, update(rows))
+
+    def stats(self) -> dict:
+        """
+        Returns the size and hit/miss counters of the word list and page caches.
+        """
+        return {"rows": self.rows.stats(), "pages": self.pages.stats()}
+
+@st.cache_resource
+def get_vocab_cache() -> VocabularyCache:
+    return VocabularyCache(max_users=VOCAB_CACHE_USERS, ttl=VOCAB_CACHE_TTL)
+
+def vocab_added(user_id: str, row: dict):
+    get_vocab_cache().patch(user_id, lambda rows: rows + [row])
+
+def vocab_deleted(user_id: str, vocab_id: str):
+    get_vocab_cache().patch(user_id, lambda rows: [row for row in rows if row["vocab_id"] != vocab_id])
+
+def vocab_status_updated(user_id: str, vocab_id: str, status: str):
+    get_vocab_cache().patch(user_id, lambda rows: [
+        dict(row, status=status) if row["vocab_id"] == vocab_id else row for row in rows
+    ])
+
+def vocab_invalidated(user_id: str):
+    get_vocab_cache().patch(user_id)
@@ -0,0 +1,114 @@
+import io
+import csv
+import json
+import uuid
+import tempfile
+import psycopg2.extensions
+from databases.connection import db_connection
+from utils.config import get_setting
+
+EXPORT_ITERSIZE = 2000
+# File xuất được giữ trong RAM tới kích thước này, lớn hơn thì chuyển sang file tạm trên đĩa
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+# st.download_button giữ toàn bộ file trong RAM của server: giới hạn kích thước file tải xuống
+EXPORT_MAX_BYTES = int(get_setting("VOCAB_EXPORT_MAX_MB", 50)) * 1024 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "anki": ("txt", "text/plain"),
+}
+EXPORT_COLUMNS = ["en", "vi", "class", "examples", "synonyms", "status", "date_added"]
+
+# Ở mức module để benchmarks/check_query_plans kiểm tra đúng câu lệnh đang chạy
+ITER_VOCABULARY_SQL = f"""
+    SELECT {', '.join(EXPORT_COLUMNS)}
+    FROM vocabulary
+    WHERE user_id = %s
+    ORDER BY date_added, vocab_id
+"""
+
+def iter_user_vocabulary(user_id: str, itersize: int = EXPORT_ITERSIZE):
+    """
+    Streams a user's vocabulary through a named (server-side) cursor, itersize rows per round trip,
+    so memory does not grow with the size of the dictionary.
+    Returns:
+        iterator: Tuples in EXPORT_COLUMNS order.
+    """
+    with db_connection() as conn:
+        # Cursor thường (tuple) thay vì RealDictCursor để không tạo dict cho mỗi dòng
+        with conn.cursor(name=f"vocab_export_{uuid.uuid4().hex}", cursor_factory=psycopg2.extensions.cursor) as cur:
+            cur.itersize = itersize
+            cur.execute(ITER_VOCABULARY_SQL, (user_id,))
+            yield from cur
+
+def write_csv(rows, out):
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    for en, vi, word_class, examples, synonyms, status, date_added in rows:
+        writer.writerow([en, vi, word_class, " | ".join(examples or []), synonyms, status, date_added])
+
+def write_jsonl(rows, out):
+    for en, vi, word_class, examples, synonyms, status, date_added in rows:
+        out.write(json.dumps({
+            "en": en, "vi": vi, "class": word_class, "examples": examples or [],
+            "synonyms": synonyms, "status": status, "date_added": date_added.isoformat() if date_added else None,
+        }, ensure_ascii=False))
+        out.write("\n")
+
+def write_anki(rows, out):
+    # Định dạng "Notes in Plain Text" của Anki: mặt trước là từ, mặt sau là nghĩa (kèm loại từ)
+    out.write("#separator:tab\n#html:false\n#columns:Front\tBack\n")
+    writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+    for en, vi, word_class, *_ in rows:
+        writer.writerow([en, f"{vi} ({word_class})" if word_class else vi])
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "anki": write_anki}
+
+def export_to_file(user_id: str, fmt: str = "csv"):
+    """
+    Exports a user's vocabulary, streaming rows from the database straight into a temporary file
+    (kept in memory up to EXPORT_SPOOL_SIZE, on disk above), so memory does not grow with the
+    size of the dictionary. The caller must close the file.
+    Args:
+        user_id (str): The ID of the user.
+        fmt (str): csv, jsonl or anki.
+    Returns:
+        file: A binary file object positioned at the start.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE, mode="w+b")
+    try:
+        text = io.TextIOWrapper(spooled, encoding="utf-8", newline="")
+        WRITERS[fmt](iter_user_vocabulary(user_id), text)
+        text.flush()
+        text.detach()
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+def export_vocabulary(user_id: str, fmt: str = "csv", max_bytes: int = EXPORT_MAX_BYTES):
+    """
+    Exports a user's vocabulary for st.download_button. Rows are streamed into a temporary file
+    (export_to_file), but the download itself is fully buffered: Streamlit keeps the whole file in
+    server memory, so the result is returned as bytes and files above max_bytes are refused.
+    Args:
+        user_id (str): The ID of the user.
+        fmt (str): csv, jsonl or anki.
+        max_bytes (int): The largest file that may be returned.
+    Returns:
+        tuple: (file content as bytes, file name, MIME type).
+    Raises:
+        ValueError: When the file is larger than max_bytes.
+    """
+    extension, mime = EXPORT_FORMATS[fmt]
+    with export_to_file(user_id, fmt) as exported:
+        size = exported.seek(0, io.SEEK_END)
+        if size > max_bytes:
+            raise ValueError(
+                f"File xuất ({size / 2**20:.1f} MB) vượt quá giới hạn tải xuống {max_bytes / 2**20:.0f} MB."
+            )
+        exported.seek(0)
+        data = exported.read()
+    return data, f"envichan-vocabulary.{extension}", mime
@@ -0,0 +1,259 @@
+import io
+import re
+import csv
+import html
+import json
+import uuid
+import itertools
+from datetime import datetime
+from databases.connection import db_connection
+from services.vocab_cache import vocab_invalidated
+from services.user_stats import bump_status, bump_vocab_added
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_STATUS = "Đang học"
+
+# Tên cột được chấp nhận trong file CSV/TSV (không phân biệt hoa thường)
+COLUMN_ALIASES = {
+    "en": {"en", "english", "word", "term", "front", "tiếng anh", "từ"},
+    "vi": {"vi", "vietnamese", "definition", "meaning", "back", "tiếng việt", "nghĩa", "định nghĩa"},
+    "class": {"class", "word_class", "pos", "part_of_speech", "loại từ"},
+    "examples": {"examples", "example", "ví dụ"},
+    "synonyms": {"synonyms", "synonym", "từ đồng nghĩa"},
+}
+ANKI_SEPARATORS = {"tab": "\t", "comma": ",", "semicolon": ";", "pipe": "|", "space": " ", "colon": ":"}
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+def detect_format(filename: str, first_line: str) -> str:
+    """
+    Guesses the import format from the file name and its first line: csv, tsv, anki or words.
+    """
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith(".tsv"):
+        return "tsv"
+    if first_line.startswith("#separator:") or first_line.startswith("#html:") or "\t" in first_line:
+        return "anki"
+    return "words"
+
+def _map_header(fields: list):
+    mapping = {}
+    for idx, field in enumerate(fields):
+        name = field.strip().lower()
+        for column, aliases in COLUMN_ALIASES.items():
+            if name in aliases and column not in mapping:
+                mapping[column] = idx
+    return mapping if "en" in mapping else None
+
+def _parse_examples(value: str) -> list:
+    value = (value or "").strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        try:
+            return [str(example) for example in json.loads(value)]
+        except ValueError:
+            pass
+    return [example.strip() for example in value.split("|") if example.strip()]
+
+def _clean_anki(value: str, is_html: bool) -> str:
+    if is_html:
+        value = html.unescape(_HTML_TAG.sub(" ", value.replace("<br>", " ")))
+    return " ".join(value.split())
+
+def _make_row(fields: list, mapping: dict) -> dict:
+    def get(column):
+        idx = mapping.get(column)
+        return fields[idx].strip() if idx is not None and idx < len(fields) else ""
+    return {
+        "en": get("en"),
+        "vi": get("vi"),
+        "class": get("class") or None,
+        "examples": _parse_examples(get("examples")),
+        "synonyms": get("synonyms") or None,
+    }
+
+def iter_delimited(lines, delimiter: str):
+    """
+    Streams rows from CSV/TSV lines. A header naming the columns (en/english/word, vi/definition, ...)
+    is used when present; otherwise the columns are taken as en, vi, class, examples, synonyms.
+    """
+    reader = csv.reader(lines, delimiter=delimiter)
+    first = next(reader, None)
+    if first is None:
+        return
+    mapping = _map_header(first)
+    if mapping is None:
+        mapping = {column: idx for idx, column in enumerate(COLUMN_ALIASES)}
+        yield _make_row(first, mapping)
+    for fields in reader:
+        if fields:
+            yield _make_row(fields, mapping)
+
+def iter_anki(lines):
+    """
+    Streams rows from an Anki "Notes in Plain Text" export: front -> en, back -> vi. The #separator,
+    #html, #columns and "#... column" headers of recent Anki versions are honoured. Column numbers
+    in the headers are 1-based and count every column of the file, the guid/notetype/deck/tags
+    columns included, so fields are mapped by their index in the full row.
+    """
+    delimiter, is_html = "\t", False
+    skipped_columns, columns = set(), None
+    data_lines = []
+
+    lines = iter(lines)
+    for line in lines:
+        if not line.startswith("#"):
+            data_lines = [line]
+            break
+        key, _, value = line[1:].rstrip("\r\n").partition(":")
+        key = key.strip().lower()
+        if key == "separator":
+            value = value.strip()
+            delimiter = ANKI_SEPARATORS.get(value.lower(), value[:1] or "\t")
+        elif key == "html":
+            is_html = value.strip().lower() == "true"
+        elif key.endswith(" column") and value.strip().isdigit():
+            skipped_columns.add(int(value) - 1)
+        elif key == "columns":
+            columns = value
+
+    # #columns có thể đứng trước #separator: chỉ tách tên cột khi đã đọc hết phần header
+    mapping = _map_header(next(csv.reader([columns], delimiter=delimiter), [])) if columns is not None else None
+    if mapping is None:
+        # Không có tên cột: hai cột đầu tiên không phải guid/notetype/deck/tags là mặt trước và mặt sau
+        note_columns = (idx for idx in itertools.count() if idx not in skipped_columns)
+        mapping = {"en": next(note_columns), "vi": next(note_columns)}
+
+    def chained():
+        yield from data_lines
+        yield from lines
+
+    for fields in csv.reader(chained(), delimiter=delimiter):
+        if fields:
+            yield _make_row([_clean_anki(field, is_html) for field in fields], mapping)
+
+def iter_words(lines):
+    """
+    Streams rows from a plain word list, one English word per line (definitions are left empty).
+    """
+    for line in lines:
+        word = line.strip()
+        if word and not word.startswith("#"):
+            yield {"en": word, "vi": "", "class": None, "examples": [], "synonyms": None}
+
+def iter_import_rows(file, filename: str, fmt: str = None):
+    """
+    Streams vocabulary rows from an uploaded file without reading it into memory.
+    Args:
+        file: A binary file object (e.g. from st.file_uploader).
+        filename (str): The original file name, used to detect the format.
+        fmt (str): csv, tsv, anki or words; detected when None.
+    Returns:
+        iterator: Dicts with en, vi, class, examples and synonyms.
+    """
+    lines = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    first_line = next(lines, "")
+    fmt = fmt or detect_format(filename, first_line)
+
+    def chained():
+        yield first_line
+        yield from lines
+
+    if fmt == "csv":
+        return iter_delimited(chained(), ",")
+    if fmt == "tsv":
+        return iter_delimited(chained(), "\t")
+    if fmt == "anki":
+        return iter_anki(chained())
+    return iter_words(chained())
+
+def _copy_batch(cur, batch: list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([
+            str(uuid.uuid4()), row["en"], row["vi"], row["class"],
+            json.dumps(row["examples"], ensure_ascii=False), row["synonyms"],
+        ])
+    buffer.seek(0)
+    cur.copy_expert("COPY vocab_import (vocab_id, en, vi, class, examples, synonyms) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def _fill_definitions(batch: list) -> int:
+    from services.translate import translate_batch
+    missing = [row for row in batch if not row["vi"]]
+    if missing:
+        for row, translation in zip(missing, translate_batch([row["en"] for row in missing])):
+            row["vi"] = translation
+    return len(missing)
+
+def import_vocabulary(user_id: str, rows, fill_missing: bool = False, batch_size: int = IMPORT_BATCH_SIZE,
+                      progress=None):
+    """
+    Bulk-imports vocabulary rows for a user in one transaction.
+
+    Rows are streamed in batches into a temporary table with COPY, then inserted into vocabulary
+    with a single INSERT ... ON CONFLICT DO NOTHING, so words already in the dictionary (same en
+    and vi) and duplicates inside the file are skipped.
+
+    Args:
+        user_id (str): The ID of the user.
+        rows (iterable): Dicts with en, vi, class, examples and synonyms (see iter_import_rows).
+        fill_missing (bool): Translate the English word when the definition is empty;
+            otherwise such rows are skipped.
+        batch_size (int): The number of rows per COPY batch.
+        progress (callable): Called as progress(rows_read) after each batch.
+
+    Returns:
+        tuple: (True, summary dict with read/inserted/duplicates/skipped/translated) or (False, error message).
+    """
+    summary = {"read": 0, "inserted": 0, "duplicates": 0, "skipped": 0, "translated": 0}
+    today = datetime.now().date()
+    try:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TEMP TABLE vocab_import (
+                        vocab_id TEXT, en TEXT, vi TEXT, class TEXT, examples JSONB, synonyms TEXT
+                    ) ON COMMIT DROP
+                """)
+
+                def flush(batch):
+                    if fill_missing:
+                        summary["translated"] += _fill_definitions(batch)
+                    valid = [row for row in batch if row["en"] and row["vi"]]
+                    summary["skipped"] += len(batch) - len(valid)
+                    if valid:
+                        _copy_batch(cur, valid)
+                    if progress:
+                        progress(summary["read"])
+
+                batch = []
+                for row in rows:
+                    summary["read"] += 1
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        flush(batch)
+                        batch = []
+                if batch:
+                    flush(batch)
+
+                cur.execute("""
+                    INSERT INTO vocabulary (vocab_id, user_id, en, vi, class, examples, synonyms, status, date_added)
+                    SELECT vocab_id, %s, en, vi, class, examples, synonyms, %s, %s
+                    FROM vocab_import
+                    ON CONFLICT DO NOTHING
+                """, (user_id, IMPORT_STATUS, today))
+                summary["inserted"] = cur.rowcount
+                bump_status(cur, user_id, "vocab", IMPORT_STATUS, summary["inserted"])
+                bump_vocab_added(cur, user_id, today, summary["inserted"])
+            conn.commit()
+    except Exception as e:
+        print(f"[LOG] Error importing vocabulary: {e}")
+        return False, str(e)
+
+    vocab_invalidated(user_id)
+    summary["duplicates"] = summary["read"] - summary["skipped"] - summary["inserted"]
+    print(f"[LOG] Imported vocabulary for user {user_id}: {summary}")
+    return True, summary
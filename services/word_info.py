@@ -3,9 +3,13 @@ from utils import nltk_config
 from nltk.corpus import wordnet
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from services.translate import translate_text, load_translation_model
+from services.translate import translate_batch, load_translation_model
+from services.gloss_store import get_gloss_store, synset_key
+from services.lemma_index import LemmaIndex
+from services.wordnet_snapshot import synset_records, all_lemma_names
 import streamlit as st
 import re
+import time
 
 # nltk.download('wordnet')
 
@@ -41,39 +45,74 @@ def standardize_definition_for_translation(definition):
     definition = re.sub(r'\b[Bb]\.?\s*[Cc]\.?\b', 'before Christ', definition)
 
     return definition
+
+@st.cache_resource(show_spinner=False)
+def get_lemma_index():
+    """
+    Builds the in-memory index of every WordNet lemma once per process.
+    """
+    start = time.perf_counter()
+    index = LemmaIndex(all_lemma_names())
+    print(f"[LOG] Lemma index built: {len(index)} lemmas in {time.perf_counter() - start:.1f}s")
+    return index
+
+def suggest_words(query, k=5):
+    """
+    Suggests WordNet lemmas for a lookup query: prefix matches first, then close spellings.
+    Args:
+        query (str): The text typed by the user.
+        k (int): The maximum number of suggestions.
+    Returns:
+        list: The suggested lemmas, best first.
+    """
+    return get_lemma_index().suggest(query, k)
+
 # Get information of a word
 @st.cache_data(show_spinner=False)
 def get_word_info(word):
-    synsets = wordnet.synsets(word)
+    # Lemma nhiều từ trong WordNet nối bằng "_" ("ice cream" -> "ice_cream"), gợi ý thì hiển thị bằng dấu cách
+    lemma = "_".join(word.split())
+    # Bản ghi synset từ snapshot WordNet dựng sẵn (hoặc NLTK nếu chưa có snapshot)
+    synsets = synset_records(lemma)
     if not synsets:
         return []
     
+    # Đọc bản dịch định nghĩa từ kho tính trước; chỉ dùng mô hình cho các synset còn thiếu
+    store = get_gloss_store()
+    if store is not None:
+        translations = store.get_many([synset_key(synset.pos, synset.offset) for synset in synsets])
+    else:
+        translations = [None] * len(synsets)
+
+    # Dịch toàn bộ định nghĩa còn thiếu trong cùng một lượt (theo batch)
+    missing = [idx for idx, translation in enumerate(translations) if translation is None]
+    if missing:
+        definitions = [standardize_definition_for_translation(synsets[idx].definition) for idx in missing]
+        for idx, translation in zip(missing, translate_batch(definitions)):
+            translations[idx] = translation
+
     result = []
-    for synset in synsets:
+    for synset, translation in zip(synsets, translations):
         # Get definitions
         info = {}
-        definition = synset.definition()
-        definition = standardize_definition_for_translation(definition)
-        translation = translate_text(definition)
-        translation = upper_first_letter(translation)
-        info['definition'] = translation
+        info['definition'] = upper_first_letter(translation)
         
         # Get examples
         info['examples'] = []
-        if synset.examples():
-            for example in synset.examples():
+        if synset.examples:
+            for example in synset.examples:
                 if word.lower() in example.lower(): 
                     example = upper_first_letter(example)
                     info['examples'].append(example)
         
         # Get synonyms
-        synonyms = [lemma.name() for lemma in synset.lemmas() if lemma.name().lower() != word.lower()]
+        synonyms = [name for name in synset.lemmas if name.lower() != lemma.lower()]
         if synonyms:
             synonyms = [synonym.replace("_", " ") for synonym in synonyms]
             info['synonyms'] = synonyms
         
         # Get part of speech
-        info['part_of_speech'] = transfer_part_of_speech(synset.pos())
+        info['part_of_speech'] = transfer_part_of_speech(synset.pos)
         result.append(info)
     
     return result
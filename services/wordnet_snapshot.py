@@ -0,0 +1,227 @@
+"""
+Snapshot WordNet dựng sẵn để khởi động nhanh.
+
+Lần gọi wordnet.synsets đầu tiên trong một process mới phải đọc toàn bộ index của NLTK.
+Snapshot chỉ chứa dữ liệu ứng dụng dùng (loại từ, định nghĩa, ví dụ, lemma của từng synset,
+bảng lemma -> synset và bảng ngoại lệ của morphy), được pickle thành một file và nạp lại
+trong một lần đọc. Snapshot lưu dấu vân tay của dữ liệu WordNet đã cài; nếu không khớp,
+ứng dụng quay lại dùng NLTK.
+
+Dựng snapshot (chạy lại sau mỗi lần cập nhật dữ liệu WordNet):
+    python -m services.wordnet_snapshot
+"""
+import os
+import gc
+import time
+import pickle
+import hashlib
+import nltk
+import streamlit as st
+from typing import NamedTuple
+from utils import nltk_config
+from utils.config import get_setting
+
+FORMAT_VERSION = 1
+POS_LIST = ["n", "v", "a", "r"]
+_FINGERPRINT_SAMPLE = 64 * 1024
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "wordnet", "wordnet-snapshot.pkl"
+)
+
+class SynsetRecord(NamedTuple):
+    pos: str
+    offset: int
+    definition: str
+    examples: tuple
+    lemmas: tuple
+
+def record_from_synset(synset) -> SynsetRecord:
+    return SynsetRecord(
+        synset.pos(),
+        synset.offset(),
+        synset.definition(),
+        tuple(synset.examples()),
+        tuple(lemma.name() for lemma in synset.lemmas()),
+    )
+
+def wordnet_fingerprint():
+    """
+    Fingerprints the installed WordNet corpus without loading it: the name and size of
+    every file plus a hash of its first and last 64 KB. Returns None when WordNet is not installed.
+    """
+    try:
+        pointer = nltk.data.find("corpora/wordnet")
+    except LookupError:
+        try:
+            pointer = nltk.data.find("corpora/wordnet.zip")
+        except LookupError:
+            return None
+    root = getattr(pointer, "path", None)
+    if root is None:
+        root = pointer.zipfile.filename
+    paths = [root] if os.path.isfile(root) else sorted(
+        os.path.join(root, name) for name in os.listdir(root) if os.path.isfile(os.path.join(root, name))
+    )
+
+    digest = hashlib.sha256()
+    for path in paths:
+        size = os.path.getsize(path)
+        digest.update(f"{os.path.basename(path)}:{size};".encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read(_FINGERPRINT_SAMPLE))
+            if size > _FINGERPRINT_SAMPLE:
+                f.seek(max(_FINGERPRINT_SAMPLE, size - _FINGERPRINT_SAMPLE))
+                digest.update(f.read())
+    return digest.hexdigest()
+
+class WordNetSnapshot:
+    """
+    Read-only lemma -> synset lookup over a snapshot, mirroring wordnet.synsets (including morphy).
+    """
+
+    def __init__(self, data: dict):
+        self.version = data["wordnet_version"]
+        self.fingerprint = data["fingerprint"]
+        self._records = data["records"]
+        self._index = data["index"]
+        self._exceptions = data["exceptions"]
+        self._substitutions = data["substitutions"]
+
+    def __len__(self):
+        return len(self._records)
+
+    def lemma_names(self):
+        return self._index.keys()
+
+    def _morphy(self, form: str, pos: str) -> list:
+        # Giống hệt WordNetCorpusReader._morphy của NLTK 3.9.1: tra bảng ngoại lệ, nếu không có
+        # thì áp dụng luật bỏ hậu tố đúng một lần ("dogss" không được rút gọn thành "dog")
+        substitutions = self._substitutions[pos]
+
+        def apply_rules(forms):
+            return [form[:-len(old)] + new for form in forms for old, new in substitutions if form.endswith(old)]
+
+        def filter_forms(forms):
+            result = []
+            for form in forms:
+                if pos in self._index.get(form, ()) and form not in result:
+                    result.append(form)
+            return result
+
+        exceptions = self._exceptions[pos]
+        if form in exceptions:
+            return filter_forms([form] + exceptions[form])
+        forms = apply_rules([form])
+        return filter_forms([form] + forms)
+
+    def synsets(self, word: str) -> list:
+        """
+        Returns the SynsetRecord of every synset of word, in the order of wordnet.synsets.
+        """
+        word = word.lower()
+        return [
+            SynsetRecord(*self._records[idx])
+            for pos in POS_LIST
+            for form in self._morphy(word, pos)
+            for idx in self._index[form][pos]
+        ]
+
+def build_snapshot(path: str):
+    """
+    Reads the installed WordNet through NLTK and writes the snapshot atomically.
+    """
+    from nltk.corpus import wordnet
+
+    ids, records = {}, []
+    for synset in wordnet.all_synsets():
+        # Tính từ vệ tinh ("s") nằm trong file dữ liệu tính từ ("a")
+        data_pos = "a" if synset.pos() == "s" else synset.pos()
+        ids[(data_pos, synset.offset())] = len(records)
+        records.append(tuple(record_from_synset(synset)))
+
+    index = {}
+    for lemma, offsets_by_pos in wordnet._lemma_pos_offset_map.items():
+        index[lemma] = {
+            pos: tuple(ids[(pos, offset)] for offset in offsets_by_pos[pos])
+            for pos in POS_LIST if pos in offsets_by_pos
+        }
+
+    data = {
+        "format": FORMAT_VERSION,
+        "wordnet_version": wordnet.get_version(),
+        "fingerprint": wordnet_fingerprint(),
+        "records": records,
+        "index": index,
+        "exceptions": {pos: dict(wordnet._exception_map[pos]) for pos in POS_LIST},
+        "substitutions": {pos: list(wordnet.MORPHOLOGICAL_SUBSTITUTIONS[pos]) for pos in POS_LIST},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    print(f"[LOG] Wrote WordNet snapshot ({len(records)} synsets, {len(index)} lemmas) to {path}")
+
+def load_snapshot(path: str):
+    """
+    Loads the snapshot at path, or returns None when it is missing, unreadable or does not
+    match the installed WordNet data.
+    """
+    if not os.path.exists(path):
+        return None
+    # Tạm tắt GC khi nạp hàng triệu object nhỏ, nhanh hơn đáng kể
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        print(f"[LOG] Cannot read WordNet snapshot {path}: {e}")
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if data.get("format") != FORMAT_VERSION or data.get("fingerprint") != wordnet_fingerprint():
+        print(f"[LOG] WordNet snapshot {path} does not match the installed WordNet, falling back to NLTK.")
+        return None
+    return WordNetSnapshot(data)
+
+@st.cache_resource(show_spinner=False)
+def get_wordnet_snapshot():
+    """
+    Returns the WordNet snapshot for this process, or None when NLTK must be used instead.
+    """
+    path = get_setting("WORDNET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+    start = time.perf_counter()
+    snapshot = load_snapshot(path)
+    if snapshot is not None:
+        print(f"[LOG] WordNet snapshot loaded: {len(snapshot)} synsets in {time.perf_counter() - start:.2f}s")
+    return snapshot
+
+def synset_records(word: str) -> list:
+    """
+    Returns the synsets of word as SynsetRecord, from the snapshot when available.
+    """
+    snapshot = get_wordnet_snapshot()
+    if snapshot is not None:
+        return snapshot.synsets(word)
+    from nltk.corpus import wordnet
+    return [record_from_synset(synset) for synset in wordnet.synsets(word)]
+
+def all_lemma_names():
+    snapshot = get_wordnet_snapshot()
+    if snapshot is not None:
+        return snapshot.lemma_names()
+    from nltk.corpus import wordnet
+    return wordnet.all_lemma_names()
+
+def wordnet_version() -> str:
+    snapshot = get_wordnet_snapshot()
+    if snapshot is not None:
+        return snapshot.version
+    from nltk.corpus import wordnet
+    return wordnet.get_version()
+
+if __name__ == "__main__":
+    build_snapshot(get_setting("WORDNET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
@@ -0,0 +1,21 @@
+import os
+import streamlit as st
+
+def get_setting(name: str, default=None):
+    """
+    Đọc một giá trị cấu hình: ưu tiên st.secrets, sau đó tới biến môi trường.
+
+    Args:
+        name (str): Tên cấu hình (ví dụ: "DATABASE_URL").
+        default: Giá trị mặc định nếu không tìm thấy.
+
+    Returns:
+        Giá trị cấu hình hoặc default.
+    """
+    try:
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        # Không có secrets.toml (ví dụ khi chạy script ngoài Streamlit)
+        pass
+    return os.getenv(name, default)